@@ -1,17 +1,21 @@
 from __future__ import annotations
 
+import datetime
 import json
 from collections.abc import Iterable
 
 from django import urls
-from django.contrib import admin
-from django.db.models import QuerySet
-from django.http import HttpRequest
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
 from django.utils.html import SafeString, format_html
 
 from .models import (
     BotSetting,
     DeletedMessage,
+    DeletionLogArchive,
     DocumentationLink,
     Filter,
     FilterList,
@@ -122,6 +126,31 @@ class InfractionAdmin(admin.ModelAdmin):
         return False
 
 
+class DeletedMessageSentFilter(admin.SimpleListFilter):
+    """Sent time Filter for Deleted Message Admin list page, which only scans the matching partitions."""
+
+    title = "Sent"
+    parameter_name = "sent"
+
+    PERIODS = {
+        "day": ("Past day", datetime.timedelta(days=1)),
+        "week": ("Past week", datetime.timedelta(weeks=1)),
+        "month": ("Past 30 days", datetime.timedelta(days=30)),
+        "year": ("Past year", datetime.timedelta(days=365)),
+    }
+
+    def lookups(self, request: HttpRequest, model: DeletedMessageAdmin) -> Iterable[tuple[str, str]]:
+        """Selectable values for viewer to filter by."""
+        return ((key, label) for key, (label, _period) in self.PERIODS.items())
+
+    def queryset(self, request: HttpRequest, queryset: QuerySet) -> QuerySet | None:
+        """Query to filter the list of Deleted Messages against."""
+        if self.value() not in self.PERIODS:
+            return None
+        _label, period = self.PERIODS[self.value()]
+        return queryset.sent_between(after=timezone.now() - period)
+
+
 @admin.register(DeletedMessage)
 class DeletedMessageAdmin(admin.ModelAdmin):
     """Admin formatting for the DeletedMessage model."""
@@ -149,6 +178,44 @@ class DeletedMessageAdmin(admin.ModelAdmin):
 
     list_display = ("id", "author", "channel_id")
 
+    list_filter = (DeletedMessageSentFilter,)
+
+    # The maximum number of archived deletion contexts linked to when searching.
+    archived_context_links = 10
+
+    def changelist_view(self, request: HttpRequest, extra_context: dict | None = None) -> HttpResponse:
+        """
+        Link to the logs of archived deletion contexts whose actor matches the search term.
+
+        The messages of archived contexts are no longer in this table, so they would
+        otherwise silently be missing from the search results.
+        """
+        term = request.GET.get(SEARCH_VAR, "").strip()
+        if term:
+            actor = Q(actor__name__icontains=term)
+            if term.isdigit():
+                actor |= Q(actor__id=int(term))
+            contexts = (
+                MessageDeletionContext.objects
+                .filter(actor, archive__isnull=False)
+                .select_related("actor", "archive")
+                .order_by("-creation")[:self.archived_context_links]
+            )
+            for context in contexts:
+                self.message_user(
+                    request,
+                    format_html(
+                        "The {0} messages deleted by {1} at {2} are archived. "
+                        "<a href='{3}'>Click to view full context log</a>",
+                        context.archive.message_count,
+                        context.actor,
+                        context.creation,
+                        context.log_url,
+                    ),
+                    messages.INFO,
+                )
+        return super().changelist_view(request, extra_context)
+
     def embed_data(self, message: DeletedMessage) -> str | None:
         """Format embed data in a code block for better readability."""
         if message.embeds:
@@ -211,10 +278,26 @@ class FilterAdmin(admin.ModelAdmin):
 class MessageDeletionContextAdmin(admin.ModelAdmin):
     """Admin formatting for the MessageDeletionContext model."""
 
-    fields = ("actor", "creation")
+    fields = ("actor", "creation", "archived_messages", "view_full_log")
     list_display = ("id", "creation", "actor")
     inlines = (DeletedMessageInline,)
 
+    @staticmethod
+    def archived_messages(context: MessageDeletionContext) -> int:
+        """Show how many messages of the context were moved to its archive."""
+        try:
+            return context.archive.message_count
+        except DeletionLogArchive.DoesNotExist:
+            return 0
+
+    @staticmethod
+    def view_full_log(context: MessageDeletionContext) -> str:
+        """Provide a link to the message logs of the context, including archived messages."""
+        return format_html(
+            "<a href='{0}'>Click to view full context log</a>",
+            context.log_url
+        )
+
     def has_add_permission(self, *args) -> bool:
         """Prevent adding from django admin."""
         return False
@@ -428,7 +511,7 @@ class UserRoleFilter(admin.SimpleListFilter):
 
     def lookups(self, request: HttpRequest, model: UserAdmin) -> Iterable[tuple[str, str]]:
         """Selectable values for viewer to filter by."""
-        roles = Role.objects.all()
+        roles = Role.cached().values()
         return ((r.name, r.name) for r in roles)
 
     def queryset(self, request: HttpRequest, queryset: QuerySet) -> QuerySet | None:
@@ -445,17 +528,18 @@ class UserAdmin(admin.ModelAdmin):
 
     def top_role_coloured(self, user: User) -> SafeString:
         """Returns the top role of the user with html style matching role colour."""
+        top_role = user.top_role
         return format_html(
             '<span style="color: {0}; font-weight: bold;">{1}</span>',
-            f"#{user.top_role.colour:06X}",
-            user.top_role.name
+            f"#{top_role.colour:06X}",
+            top_role.name
         )
 
     top_role_coloured.short_description = "Top Role"
 
     def all_roles_coloured(self, user: User) -> SafeString:
         """Returns all user roles with html style matching role colours."""
-        roles = Role.objects.filter(id__in=user.roles)
+        roles = [role for role in Role.cached().values() if role.id in user.roles]
         return format_html(
             "</br>".join(
                 f'<span style="color: #{r.colour:06X}; font-weight: bold;">{r.name}</span>'
@@ -471,6 +555,18 @@ class UserAdmin(admin.ModelAdmin):
     fields = ("username", "id", "in_guild", "all_roles_coloured")
     sortable_by = ("username",)
 
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet, search_term: str
+    ) -> tuple[QuerySet, bool]:
+        """Search users by name using the trigram indexes, and numeric terms by user or role ID too."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        users = queryset.matching(search_term)
+        if search_term.isdigit():
+            users |= queryset.filter(Q(id=search_term) | Q(roles__contains=[search_term]))
+        return users, False
+
     def has_add_permission(self, *args) -> bool:
         """Prevent adding from django admin."""
         return False
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from pydis_site.apps.api.models import DeletedMessage, DeletionLogArchive, MessageDeletionContext
+
+
+class Command(BaseCommand):
+    """Move the deleted messages of old deletion contexts into compressed archives."""
+
+    help = (
+        "Move the deleted messages of deletion contexts older than `--days` days out of the "
+        "deleted messages table, into one compressed archive per context. Archived logs are "
+        "still shown by the log view."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the option for how old deletion contexts must be to be archived."""
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Minimum age in days of the deletion contexts to archive.",
+        )
+
+    def handle(self, *args, days: int, **options) -> None:
+        """Archive the messages of every old deletion context which still has messages."""
+        cutoff = timezone.now() - timedelta(days=days)
+        contexts = (
+            MessageDeletionContext.objects
+            .filter(
+                Exists(DeletedMessage.objects.filter(deletion_context=OuterRef("pk"))),
+                creation__lt=cutoff,
+                archive__isnull=True,
+            )
+            .order_by("creation")
+        )
+
+        archived_contexts = archived_messages = 0
+        for context in contexts.iterator():
+            archived_messages += self._archive(context)
+            archived_contexts += 1
+
+        self.stdout.write(
+            f"Archived {archived_messages} messages of {archived_contexts} deletion contexts "
+            f"created before {cutoff:%Y-%m-%d}."
+        )
+
+    @staticmethod
+    def _archive(context: MessageDeletionContext) -> int:
+        """Atomically replace the messages of the deletion context with an archive of them."""
+        with transaction.atomic():
+            messages = DeletedMessage.objects.filter(deletion_context=context).order_by("id")
+            archive = DeletionLogArchive.create_from_messages(context, messages.select_for_update())
+            messages.delete()
+        return archive.message_count
@@ -0,0 +1,89 @@
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from prometheus_client.parser import text_string_to_metric_families
+
+# The counter of connections opened per database alias, exported by django_prometheus.
+NEW_CONNECTIONS_METRIC = "django_db_new_connections"
+
+
+class Command(BaseCommand):
+    """Measure the latency of an endpoint of a running site, and the database connections it opens."""
+
+    help = (
+        "Send sequential GET requests to an endpoint of a running site, such as "
+        "http://localhost:8000/bot/users/<id>/metricity_data, and report their latency "
+        "percentiles along with the database connections opened per alias meanwhile, taken "
+        "from the site's Prometheus metrics. Run it against the site served by gunicorn with "
+        "DATABASE_CONN_MAX_AGE=0 and with the default to compare reusing connections to not."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the endpoint to benchmark and the options of the benchmark."""
+        parser.add_argument("url", help="The URL of the endpoint to request.")
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="The number of requests to send. Defaults to 500.",
+        )
+        parser.add_argument("--token", help="The API token to authenticate the requests with.")
+        parser.add_argument(
+            "--metrics-url",
+            help="The URL of the site's Prometheus metrics. Defaults to /metrics on the endpoint's host.",
+        )
+
+    def handle(
+        self,
+        *args,
+        url: str,
+        requests: int,
+        token: str | None,
+        metrics_url: str | None,
+        **options
+    ) -> None:
+        """Request the endpoint and report the latencies and new connections."""
+        if requests < 2:
+            raise CommandError("At least 2 requests are needed to compute percentiles.")
+
+        metrics_url = metrics_url or str(httpx.URL(url).copy_with(path="/metrics", query=None))
+        headers = {"Authorization": f"Token {token}"} if token else {}
+
+        with httpx.Client(headers=headers) as client:
+            connections_before = self._new_connections(client, metrics_url)
+            latencies = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.is_error:
+                    raise CommandError(f"{url} returned status {response.status_code}.")
+            connections_after = self._new_connections(client, metrics_url)
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{requests} requests: p50 {percentiles[49]:.1f}ms, p95 {percentiles[94]:.1f}ms, "
+            f"max {max(latencies):.1f}ms"
+        )
+        for alias in sorted(connections_after):
+            opened = connections_after[alias] - connections_before.get(alias, 0)
+            self.stdout.write(f"New connections to {alias}: {opened:.0f}")
+
+    @staticmethod
+    def _new_connections(client: httpx.Client, metrics_url: str) -> dict[str, float]:
+        """Return the number of connections opened so far per database alias."""
+        response = client.get(metrics_url)
+        if response.is_error:
+            raise CommandError(f"{metrics_url} returned status {response.status_code}.")
+
+        connections = {}
+        for family in text_string_to_metric_families(response.text):
+            if family.name != NEW_CONNECTIONS_METRIC:
+                continue
+            for sample in family.samples:
+                if sample.name.endswith("_total"):
+                    alias = sample.labels["alias"]
+                    connections[alias] = connections.get(alias, 0) + sample.value
+        return connections
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from pydis_site.apps.api.models import DeletedMessage
+
+
+class Command(BaseCommand):
+    """Create the monthly partitions of deleted messages up to the upcoming months."""
+
+    help = (
+        "Create the monthly partitions of deleted messages from the month of the oldest message in "
+        "the default partition, or the current month, up to `--months` months ahead. Messages which "
+        "were stored in the default partition are moved to the new partitions, one month per "
+        "transaction. This is meant to be run daily. Its first run moves all messages stored before "
+        "the table was partitioned, and should be made outside of busy hours."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the option for how many months ahead partitions should be created."""
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=3,
+            help="Number of months after the current one to create partitions for.",
+        )
+
+    def handle(self, *args, months: int, **options) -> None:
+        """Create the partitions which do not exist yet."""
+        today = timezone.now().date().replace(day=1)
+        first_month = min(DeletedMessage.oldest_unpartitioned_month() or today, today)
+        last_month = today.year * 12 + today.month - 1 + months
+
+        for month_number in range(first_month.year * 12 + first_month.month - 1, last_month + 1):
+            year, month_index = divmod(month_number, 12)
+            month = today.replace(year=year, month=month_index + 1)
+            if DeletedMessage.create_partition(month):
+                self.stdout.write(f"Created the partition for {month:%Y-%m}.")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from pydis_site.apps.api.models import FilterDeletion, InfractionDeletion
+
+
+class Command(BaseCommand):
+    """Delete the records of deleted objects which are older than the retention period."""
+
+    help = (
+        "Delete the records of deleted filters, filter lists and infractions which are older than "
+        "`DELETION_RETENTION_DAYS`, except for the newest of them, which marks the oldest version "
+        "clients can still sync incrementally from. Clients syncing from an older version are "
+        "told to list all objects again. This is meant to be run daily."
+    )
+
+    def handle(self, *args, **options) -> None:
+        """Prune the expired records of deletions."""
+        pruned = FilterDeletion.objects.prune()
+        self.stdout.write(f"Pruned {pruned} records of deleted filters and filter lists.")
+        pruned = InfractionDeletion.objects.prune()
+        self.stdout.write(f"Pruned {pruned} records of deleted infractions.")
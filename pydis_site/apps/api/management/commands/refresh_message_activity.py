@@ -0,0 +1,98 @@
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from pydis_site.apps.api.models import DailyMessageActivity
+from pydis_site.apps.api.models.bot.metricity import Metricity
+
+# Maximum number of days rolled up per metricity query and transaction.
+WINDOW_DAYS = 30
+
+
+class Command(BaseCommand):
+    """Roll up the daily message activity of all users from metricity."""
+
+    help = (
+        "Roll up the daily message activity of all users from metricity, up to and excluding today. "
+        "Days that were rolled up before are only rolled up again if their message count or checksum "
+        "changed in metricity, for example because messages were deleted or backfilled. "
+        "This is meant to be run daily, shortly after midnight UTC."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the option to recompute the whole rollup."""
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute the whole rollup, starting from the first message in metricity.",
+        )
+
+    def handle(self, *args, full: bool, **options) -> None:
+        """Roll up all days which are new or changed since they were last rolled up."""
+        today = timezone.now().date()
+
+        with Metricity() as metricity:
+            if full or not DailyMessageActivity.objects.exists():
+                first_day = metricity.first_message_day() or today
+                days = [first_day + timedelta(days=n) for n in range((today - first_day).days)]
+            else:
+                days = self._changed_days(metricity, today)
+
+            for since, until in self._windows(days):
+                rows = metricity.daily_activity(since, until)
+                self._replace_window(since, until, rows)
+
+        self.stdout.write(f"Rolled up the message activity of {len(days)} days until {today}.")
+
+    @staticmethod
+    def _changed_days(metricity: Metricity, until: date) -> list[date]:
+        """Find the days before `until` whose messages in metricity do not match the rollup."""
+        checksums = metricity.daily_checksums(until)
+        rolled_up = {
+            day: (total_messages, checksum)
+            for day, total_messages, checksum in (
+                DailyMessageActivity.objects
+                .filter(day__lt=until)
+                .values("day")
+                .annotate(total_messages=Sum("total_messages"), checksum=Sum("message_checksum"))
+                .values_list("day", "total_messages", "checksum")
+            )
+        }
+        return sorted(
+            day for day in checksums.keys() | rolled_up.keys()
+            if checksums.get(day) != rolled_up.get(day)
+        )
+
+    @staticmethod
+    def _windows(days: Iterable[date]) -> list[tuple[date, date]]:
+        """Group the given sorted days into ranges of consecutive days, at most `WINDOW_DAYS` long."""
+        windows = []
+        for day in days:
+            if windows and windows[-1][1] == day and (day - windows[-1][0]).days < WINDOW_DAYS:
+                windows[-1] = (windows[-1][0], day + timedelta(days=1))
+            else:
+                windows.append((day, day + timedelta(days=1)))
+        return windows
+
+    @staticmethod
+    def _replace_window(since: date, until: date, rows: list[tuple[str, date, int, int, int]]) -> None:
+        """Atomically replace the rolled up activity of the given days."""
+        with transaction.atomic():
+            DailyMessageActivity.objects.filter(day__gte=since, day__lt=until).delete()
+            DailyMessageActivity.objects.bulk_create(
+                (
+                    DailyMessageActivity(
+                        author_id=int(author_id),
+                        day=day,
+                        total_messages=total_messages,
+                        activity_blocks=activity_blocks,
+                        message_checksum=message_checksum,
+                    )
+                    for author_id, day, total_messages, activity_blocks, message_checksum in rows
+                ),
+                batch_size=5000,
+            )
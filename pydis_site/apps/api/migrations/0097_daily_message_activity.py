@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 00:42
+
+import django.core.validators
+import pydis_site.apps.api.models.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0096_merge_0093_user_alts_0095_user_display_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMessageActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('author_id', models.BigIntegerField(help_text='The ID of the user who sent the messages, taken from Discord.', validators=[django.core.validators.MinValueValidator(limit_value=0, message='User IDs cannot be negative.')], verbose_name='Author ID')),
+                ('day', models.DateField(help_text='The UTC day on which the messages were sent.')),
+                ('total_messages', models.PositiveIntegerField(help_text='The number of messages sent by the user on this day.')),
+                ('activity_blocks', models.PositiveIntegerField(help_text='The number of 10 minute blocks during which the user sent messages on this day.')),
+                ('message_checksum', models.BigIntegerField(default=0, help_text='The sum of a 32 bit hash of the IDs of the messages sent by the user on this day, used to find days whose messages changed in metricity since they were rolled up.')),
+            ],
+            options={
+                'verbose_name_plural': 'daily message activities',
+                'indexes': [models.Index(fields=['day'], name='api_dailyme_day_b24dbd_idx')],
+                'constraints': [models.UniqueConstraint(fields=('author_id', 'day'), name='api_dailymessageactivity_unique_author_day')],
+            },
+            bases=(pydis_site.apps.api.models.mixins.ModelReprMixin, models.Model),
+        ),
+    ]
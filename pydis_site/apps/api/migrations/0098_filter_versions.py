@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-17 00:49
+
+import pydis_site.apps.api.models.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0097_daily_message_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilterDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('filter', 'Filter'), ('filter_list', 'Filter List')], help_text='Whether a filter or a filter list was deleted.', max_length=11)),
+                ('object_id', models.BigIntegerField(help_text='The ID of the deleted filter or filter list.')),
+                ('version', models.BigIntegerField(help_text='The filter version taken by the deletion.', unique=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, help_text='When the filter or filter list was deleted.')),
+            ],
+            bases=(pydis_site.apps.api.models.mixins.ModelReprMixin, models.Model),
+        ),
+        migrations.AddField(
+            model_name='filter',
+            name='version',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, help_text='The filter version taken by the latest write to this filter.'),
+        ),
+        migrations.AddField(
+            model_name='filterlist',
+            name='version',
+            field=models.BigIntegerField(default=0, editable=False, help_text='The filter version taken by the latest write to this list.'),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE SEQUENCE api_filter_version_seq;",
+                "UPDATE api_filterlist SET version = nextval('api_filter_version_seq');",
+                "UPDATE api_filter SET version = nextval('api_filter_version_seq');",
+            ),
+            reverse_sql="DROP SEQUENCE api_filter_version_seq;",
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# The constraints and indexes as created by Django for the unpartitioned table.
+CONSTRAINTS = (
+    "ALTER TABLE api_deletedmessage ADD CONSTRAINT api_deletedmessage_pkey PRIMARY KEY (id)",
+    "ALTER TABLE api_deletedmessage ADD CONSTRAINT api_deletedmessage_author_id_45bd50ce_fk_api_user_id "
+    "FOREIGN KEY (author_id) REFERENCES api_user (id) DEFERRABLE INITIALLY DEFERRED",
+    "ALTER TABLE api_deletedmessage ADD CONSTRAINT api_deletedmessage_deletion_context_id_6a78f89e_fk_api_messa "
+    "FOREIGN KEY (deletion_context_id) REFERENCES api_messagedeletioncontext (id) DEFERRABLE INITIALLY DEFERRED",
+    "CREATE INDEX api_deletedmessage_author_id_45bd50ce ON api_deletedmessage (author_id)",
+    "CREATE INDEX api_deletedmessage_deletion_context_id_6a78f89e ON api_deletedmessage (deletion_context_id)",
+)
+
+# Free the names of the indexes of the existing table, which becomes the default partition.
+RENAMES = (
+    "ALTER TABLE api_deletedmessage RENAME TO api_deletedmessage_default",
+    "ALTER INDEX api_deletedmessage_pkey RENAME TO api_deletedmessage_default_pkey",
+    "ALTER INDEX api_deletedmessage_author_id_45bd50ce RENAME TO api_deletedmessage_default_author_id",
+    "ALTER INDEX api_deletedmessage_deletion_context_id_6a78f89e "
+    "RENAME TO api_deletedmessage_default_deletion_context_id",
+)
+
+
+def partition_by_month(apps, schema_editor):
+    """
+    Turn the deleted messages table into the default partition of a table partitioned by month.
+
+    No rows are copied: the existing indexes and constraints of the table are attached to the
+    ones of the partitioned table. `create_deleted_message_partitions` moves the messages into
+    monthly partitions afterwards, one month per transaction.
+    """
+    for statement in RENAMES:
+        schema_editor.execute(statement)
+    schema_editor.execute(
+        "CREATE TABLE api_deletedmessage (LIKE api_deletedmessage_default INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (id)"
+    )
+    for statement in CONSTRAINTS:
+        schema_editor.execute(statement)
+    schema_editor.execute("ALTER TABLE api_deletedmessage ATTACH PARTITION api_deletedmessage_default DEFAULT")
+
+
+def unpartition(apps, schema_editor):
+    """Move the deleted messages back into a single table."""
+    schema_editor.execute(
+        "CREATE TABLE api_deletedmessage_unpartitioned (LIKE api_deletedmessage INCLUDING DEFAULTS)"
+    )
+    schema_editor.execute("INSERT INTO api_deletedmessage_unpartitioned SELECT * FROM api_deletedmessage")
+    schema_editor.execute("DROP TABLE api_deletedmessage")
+    schema_editor.execute("ALTER TABLE api_deletedmessage_unpartitioned RENAME TO api_deletedmessage")
+    for statement in CONSTRAINTS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0098_filter_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_by_month, unpartition),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-17 00:58
+
+import django.db.models.deletion
+import pydis_site.apps.api.models.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0099_partition_deleted_messages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionLogArchive',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, help_text='When the messages were archived.')),
+                ('message_count', models.PositiveIntegerField(help_text='The number of archived messages.')),
+                ('deletion_context', models.OneToOneField(help_text='The deletion context whose messages are archived.', on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='api.messagedeletioncontext')),
+            ],
+            bases=(pydis_site.apps.api.models.mixins.ModelReprMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='DeletionLogArchiveChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_message_id', models.BigIntegerField(help_text='The ID of the first message in this chunk.')),
+                ('last_message_id', models.BigIntegerField(help_text='The ID of the last message in this chunk.')),
+                ('data', models.BinaryField(help_text='The archived messages, as zlib compressed JSON mapping each field to its values.')),
+                ('archive', models.ForeignKey(help_text='The archive this chunk is part of.', on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='api.deletionlogarchive')),
+            ],
+            bases=(pydis_site.apps.api.models.mixins.ModelReprMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='deletionlogarchivechunk',
+            constraint=models.UniqueConstraint(fields=('archive', 'first_message_id'), name='api_deletionlogarchivechunk_unique_archive_first_message'),
+        ),
+    ]
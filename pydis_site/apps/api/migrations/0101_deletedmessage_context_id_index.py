@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-17 01:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0100_deletion_log_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deletedmessage',
+            index=models.Index(fields=['deletion_context', 'id'], name='api_deleted_deletio_0de93f_idx'),
+        ),
+    ]
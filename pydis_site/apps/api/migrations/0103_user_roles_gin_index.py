@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 01:40
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0102_user_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['roles'], name='api_user_roles_gin'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-17 02:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0103_user_roles_gin_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='infraction',
+            name='reason_search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('reason', config='english'), help_text='The reason of the infraction as a text search vector, maintained by the database.', output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='infraction',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['reason_search'], name='api_infraction_reason_search'),
+        ),
+        migrations.AddIndex(
+            model_name='infraction',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('reason', name='gin_trgm_ops'), name='api_infraction_reason_trgm'),
+        ),
+    ]
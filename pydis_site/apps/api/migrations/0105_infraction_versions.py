@@ -0,0 +1,42 @@
+# Generated by Django 5.1 on 2026-10-17 02:30
+
+import pydis_site.apps.api.models.mixins
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0104_infraction_reason_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='infraction',
+            name='version',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, help_text='The infraction version taken by the latest write to this infraction.'),
+        ),
+        migrations.AddField(
+            model_name='infraction',
+            name='expiry_cancelled_version',
+            field=models.BigIntegerField(default=0, editable=False, help_text='The infraction version taken by the latest write which deactivated this infraction or cleared its expiry, while it was pending expiry.'),
+        ),
+        migrations.AddIndex(
+            model_name='infraction',
+            index=models.Index(condition=models.Q(('active', True), ('expires_at__isnull', False)), fields=['expires_at'], name='api_infraction_expiring'),
+        ),
+        migrations.CreateModel(
+            name='InfractionDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('infraction_id', models.BigIntegerField(help_text='The ID of the deleted infraction.')),
+                ('version', models.BigIntegerField(help_text='The infraction version taken by the deletion.', unique=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, help_text='When the infraction was deleted.')),
+            ],
+            bases=(pydis_site.apps.api.models.mixins.ModelReprMixin, models.Model),
+        ),
+        migrations.RunSQL(
+            sql="CREATE SEQUENCE api_infraction_version_seq;",
+            reverse_sql="DROP SEQUENCE api_infraction_version_seq;",
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0105_infraction_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='infraction',
+            index=models.Index(fields=['inserted_at', 'id'], name='api_infraction_inserted'),
+        ),
+        migrations.AddIndex(
+            model_name='infraction',
+            index=models.Index(fields=['user', 'inserted_at', 'id'], name='api_infraction_user_inserted'),
+        ),
+        migrations.AddIndex(
+            model_name='infraction',
+            index=models.Index(fields=['actor', 'inserted_at', 'id'], name='api_infraction_actor_inserted'),
+        ),
+    ]
@@ -2,11 +2,16 @@
 from .bot import (
     FilterList,
     Filter,
+    FilterDeletion,
     BotSetting,
     BumpedThread,
+    DailyMessageActivity,
     DocumentationLink,
     DeletedMessage,
+    DeletionLogArchive,
+    DeletionLogArchiveChunk,
     Infraction,
+    InfractionDeletion,
     MailingList,
     MailingListSeenItem,
     Message,
@@ -1,10 +1,12 @@
 # flake8: noqa
-from .filters import FilterList, Filter
+from .filters import FilterList, Filter, FilterDeletion
 from .bot_setting import BotSetting
 from .bumped_thread import BumpedThread
+from .daily_message_activity import DailyMessageActivity
 from .deleted_message import DeletedMessage
+from .deletion_log_archive import DeletionLogArchive, DeletionLogArchiveChunk
 from .documentation_link import DocumentationLink
-from .infraction import Infraction
+from .infraction import Infraction, InfractionDeletion
 from .message import Message
 from .aoc_completionist_block import AocCompletionistBlock
 from .aoc_link import AocAccountLink
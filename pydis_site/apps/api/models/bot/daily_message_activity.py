@@ -0,0 +1,63 @@
+from django.core.validators import MinValueValidator
+from django.db import models
+
+from pydis_site.apps.api.models.mixins import ModelReprMixin
+
+
+class DailyMessageActivity(ModelReprMixin, models.Model):
+    """
+    The message activity of a user on a single day, rolled up from metricity.
+
+    Only messages that count towards the message totals of the `Metricity`
+    class are included, that is, messages which were not deleted and were not
+    sent in an excluded channel.
+
+    Days are aligned to UTC midnight, and thereby also to the boundaries of
+    the 10 minute activity blocks. The number of activity blocks of a user is
+    therefore the sum of their daily activity blocks.
+
+    Messages of rolled up days may still be deleted or backfilled in metricity.
+    Such days are found by their message count and checksum, and are rolled up
+    again by the next refresh.
+    """
+
+    author_id = models.BigIntegerField(
+        help_text="The ID of the user who sent the messages, taken from Discord.",
+        verbose_name="Author ID",
+        validators=(
+            MinValueValidator(
+                limit_value=0,
+                message="User IDs cannot be negative."
+            ),
+        ),
+    )
+    day = models.DateField(
+        help_text="The UTC day on which the messages were sent.",
+    )
+    total_messages = models.PositiveIntegerField(
+        help_text="The number of messages sent by the user on this day.",
+    )
+    activity_blocks = models.PositiveIntegerField(
+        help_text="The number of 10 minute blocks during which the user sent messages on this day.",
+    )
+    message_checksum = models.BigIntegerField(
+        default=0,
+        help_text=(
+            "The sum of a 32 bit hash of the IDs of the messages sent by the user on this day, "
+            "used to find days whose messages changed in metricity since they were rolled up."
+        ),
+    )
+
+    class Meta:
+        """Allow only a single row per user and day, and look rows up by day."""
+
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_unique_author_day",
+                fields=["author_id", "day"]
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+        verbose_name_plural = "daily message activities"
@@ -1,11 +1,44 @@
-from django.db import models
+from __future__ import annotations
 
-from pydis_site.apps.api.models.bot.message import Message
+import datetime
+
+from django.db import connection, models, transaction
+
+from pydis_site.apps.api.models.bot.message import Message, snowflake_at
 from pydis_site.apps.api.models.bot.message_deletion_context import MessageDeletionContext
 
 
+class DeletedMessageQuerySet(models.QuerySet):
+    """Queries on deleted messages which take advantage of the partitioning of the table."""
+
+    def sent_between(
+        self,
+        after: datetime.datetime | None = None,
+        before: datetime.datetime | None = None,
+    ) -> DeletedMessageQuerySet:
+        """
+        Filter to messages sent at or after `after`, and before `before`.
+
+        The bounds are turned into a range of message IDs, such that only the partitions
+        holding messages sent in that time are scanned.
+        """
+        queryset = self
+        if after is not None:
+            queryset = queryset.filter(id__gte=snowflake_at(after))
+        if before is not None:
+            queryset = queryset.filter(id__lt=snowflake_at(before))
+        return queryset
+
+
 class DeletedMessage(Message):
-    """A deleted message, previously sent somewhere on the Discord server."""
+    """
+    A deleted message, previously sent somewhere on the Discord server.
+
+    The table is partitioned by month on the message ID, and thereby on the time the message
+    was sent. Messages sent in a month without a partition, including all messages stored
+    before the table was partitioned, are stored in a default partition until
+    `create_deleted_message_partitions` creates it.
+    """
 
     deletion_context = models.ForeignKey(
         MessageDeletionContext,
@@ -13,7 +46,57 @@ class DeletedMessage(Message):
         on_delete=models.CASCADE
     )
 
+    objects = DeletedMessageQuerySet.as_manager()
+
     class Meta:
-        """Sets the default ordering for list views to newest first."""
+        """Sets the default ordering for list views to newest first, and index messages by context."""
 
         ordering = ("-id",)
+        indexes = (
+            # Allow fetching the messages of a deletion context in pages ordered by ID.
+            models.Index(fields=("deletion_context", "id")),
+        )
+
+    @classmethod
+    def oldest_unpartitioned_month(cls) -> datetime.date | None:
+        """Return the first day of the month the oldest message in the default partition was sent in."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT min(id) FROM {cls._meta.db_table}_default")  # noqa: S608
+            oldest_id = cursor.fetchone()[0]
+        if oldest_id is None:
+            return None
+        return cls(id=oldest_id).timestamp.date().replace(day=1)
+
+    @classmethod
+    def create_partition(cls, month: datetime.date) -> bool:
+        """
+        Create the partition holding messages sent in the given month, if it does not exist.
+
+        Messages of the month which were stored in the default partition are moved to the new one.
+        Return whether the partition was created.
+        """
+        table = cls._meta.db_table
+        partition = f"{table}_y{month.year}m{month.month:02}"
+        start = datetime.datetime(month.year, month.month, 1, tzinfo=datetime.UTC)
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [partition])
+            if cursor.fetchone()[0]:
+                return False
+
+            cursor.execute(f"CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {table}_default WHERE id >= %s AND id < %s RETURNING *
+                )
+                INSERT INTO {partition} SELECT * FROM moved
+                """,  # noqa: S608
+                [snowflake_at(start), snowflake_at(end)]
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {partition} FOR VALUES FROM (%s) TO (%s)",
+                [snowflake_at(start), snowflake_at(end)]
+            )
+        return True
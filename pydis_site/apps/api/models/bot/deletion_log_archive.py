@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import bisect
+import json
+import zlib
+from collections.abc import Iterable
+
+from django.db import models
+
+from pydis_site.apps.api.models.bot.deleted_message import DeletedMessage
+from pydis_site.apps.api.models.bot.message_deletion_context import MessageDeletionContext
+from pydis_site.apps.api.models.bot.user import User
+from pydis_site.apps.api.models.mixins import ModelReprMixin
+
+# The fields of the deleted messages stored in an archive, one column each.
+ARCHIVED_FIELDS = ("id", "author_id", "channel_id", "content", "embeds", "attachments")
+
+# The number of messages compressed together into one chunk of an archive.
+ARCHIVE_CHUNK_SIZE = 1000
+
+
+class DeletionLogArchive(ModelReprMixin, models.Model):
+    """
+    The deleted messages of an old deletion context, moved out of the deleted messages table.
+
+    The messages are stored in chunks of `ARCHIVE_CHUNK_SIZE` messages, such that a page of
+    messages can be read without decompressing the whole archive.
+    """
+
+    deletion_context = models.OneToOneField(
+        MessageDeletionContext,
+        on_delete=models.CASCADE,
+        related_name="archive",
+        help_text="The deletion context whose messages are archived.",
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the messages were archived.",
+    )
+    message_count = models.PositiveIntegerField(
+        help_text="The number of archived messages.",
+    )
+
+    def __str__(self) -> str:
+        return f"Archive of {self.message_count} messages of deletion context #{self.deletion_context_id}"
+
+    @classmethod
+    def create_from_messages(
+        cls, deletion_context: MessageDeletionContext, messages: Iterable[DeletedMessage]
+    ) -> DeletionLogArchive:
+        """Create an archive of the given messages of the deletion context."""
+        messages = sorted(messages, key=lambda message: message.id)
+        archive = cls.objects.create(deletion_context=deletion_context, message_count=len(messages))
+        DeletionLogArchiveChunk.objects.bulk_create(
+            DeletionLogArchiveChunk.from_messages(archive, messages[start:start + ARCHIVE_CHUNK_SIZE])
+            for start in range(0, len(messages), ARCHIVE_CHUNK_SIZE)
+        )
+        return archive
+
+    def messages(self, after: int = 0, limit: int | None = None) -> list[DeletedMessage]:
+        """
+        Return the archived messages as unsaved `DeletedMessage` instances, ordered by ID.
+
+        Only messages with an ID above `after` are returned, up to `limit` of them. Only the
+        chunks holding these messages are loaded. The authors are loaded with a single query.
+        Authors who no longer exist are represented by unsaved users only carrying their ID.
+        """
+        chunks = self.chunks.filter(last_message_id__gt=after).order_by("first_message_id")
+        if limit is not None:
+            # The first chunk may hold as little as one of the requested messages.
+            chunks = chunks[:limit // ARCHIVE_CHUNK_SIZE + 2]
+
+        rows = []
+        for chunk in chunks:
+            rows.extend(chunk.rows(after))
+        rows = rows[:limit]
+        authors = User.objects.in_bulk({row["author_id"] for row in rows})
+
+        messages = []
+        for row in rows:
+            message = DeletedMessage(deletion_context=self.deletion_context, **row)
+            message.author = authors.get(message.author_id) or User(
+                id=message.author_id, name=str(message.author_id), discriminator=0
+            )
+            messages.append(message)
+        return messages
+
+
+class DeletionLogArchiveChunk(ModelReprMixin, models.Model):
+    """
+    A chunk of consecutive messages of a deletion log archive.
+
+    The messages are stored column by column as compressed JSON, which compresses much better
+    than the rows did, as values of the same field tend to be alike.
+    """
+
+    archive = models.ForeignKey(
+        DeletionLogArchive,
+        on_delete=models.CASCADE,
+        related_name="chunks",
+        help_text="The archive this chunk is part of.",
+    )
+    first_message_id = models.BigIntegerField(help_text="The ID of the first message in this chunk.")
+    last_message_id = models.BigIntegerField(help_text="The ID of the last message in this chunk.")
+    data = models.BinaryField(
+        help_text="The archived messages, as zlib compressed JSON mapping each field to its values.",
+    )
+
+    class Meta:
+        """Look chunks up by their archive and messages."""
+
+        constraints = (
+            models.UniqueConstraint(
+                fields=("archive", "first_message_id"),
+                name="%(app_label)s_%(class)s_unique_archive_first_message",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"Messages {self.first_message_id} to {self.last_message_id} of archive #{self.archive_id}"
+
+    @classmethod
+    def from_messages(cls, archive: DeletionLogArchive, messages: list[DeletedMessage]) -> DeletionLogArchiveChunk:
+        """Return an unsaved chunk of the given messages, ordered by ID, of the archive."""
+        columns = {
+            field: [getattr(message, field) for message in messages]
+            for field in ARCHIVED_FIELDS
+        }
+        return cls(
+            archive=archive,
+            first_message_id=messages[0].id,
+            last_message_id=messages[-1].id,
+            data=zlib.compress(json.dumps(columns, separators=(",", ":")).encode(), level=9),
+        )
+
+    def rows(self, after: int = 0) -> list[dict]:
+        """Return the fields of the messages in this chunk with an ID above `after`, ordered by ID."""
+        columns = json.loads(zlib.decompress(self.data))
+        start = bisect.bisect_right(columns["id"], after)
+        return [
+            dict(zip(ARCHIVED_FIELDS, values, strict=True))
+            for values in zip(*(columns[field][start:] for field in ARCHIVED_FIELDS), strict=True)
+        ]
@@ -1,12 +1,51 @@
 from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connection, models
 from django.db.models import UniqueConstraint
 
 # Must be imported that way to avoid circular imports
-from pydis_site.apps.api.models.mixins import ModelReprMixin, ModelTimestampMixin
+from pydis_site.apps.api.models.mixins import (
+    DeletionQuerySet,
+    ModelReprMixin,
+    ModelTimestampMixin,
+    VersionedQuerySet,
+    next_version,
+)
 from .infraction import Infraction
 
+# The sequence that filter versions are taken from, created in the migrations.
+FILTER_VERSION_SEQUENCE = "api_filter_version_seq"
+# Key of the advisory lock which serialises writes to filters and filter lists.
+FILTER_VERSION_LOCK_KEY = 0x66696c746572
+
+
+def next_filter_version() -> int:
+    """Take the next version for a write to a filter or a filter list."""
+    return next_version(FILTER_VERSION_SEQUENCE, FILTER_VERSION_LOCK_KEY)
+
+
+def current_filter_version() -> int:
+    """Return the version of the latest committed write to any filter or filter list."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT GREATEST(
+                (SELECT max(version) FROM {FilterList._meta.db_table}),
+                (SELECT max(version) FROM {Filter._meta.db_table}),
+                (SELECT max(version) FROM {FilterDeletion._meta.db_table}),
+                0
+            )
+            """  # noqa: S608
+        )
+        return cursor.fetchone()[0]
+
+
+class FilterVersionQuerySet(VersionedQuerySet):
+    """Stamp bulk writes to filters or filter lists with a new filter version."""
+
+    version_sequence = FILTER_VERSION_SEQUENCE
+    version_lock_key = FILTER_VERSION_LOCK_KEY
+
 
 class FilterListType(models.IntegerChoices):
     """Choice between allow or deny for a list type."""
@@ -19,6 +58,11 @@ class FilterList(ModelTimestampMixin, ModelReprMixin, models.Model):
     """Represent a list in its allow or deny form."""
 
     name = models.CharField(max_length=50, help_text="The unique name of this list.")
+    version = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="The filter version taken by the latest write to this list."
+    )
     list_type = models.IntegerField(
         choices=FilterListType.choices,
         help_text="Whether this list is an allowlist or denylist"
@@ -112,6 +156,8 @@ class FilterList(ModelTimestampMixin, ModelReprMixin, models.Model):
         help_text="Categories in which to not run the filter."
     )
 
+    objects = FilterVersionQuerySet.as_manager()
+
     class Meta:
         """Constrain name and list_type unique."""
 
@@ -248,6 +294,15 @@ class Filter(FilterBase):
     and set the unique constraint based on those fields.
     """
 
+    version = models.BigIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text="The filter version taken by the latest write to this filter."
+    )
+
+    objects = FilterVersionQuerySet.as_manager()
+
     class Meta:
         """Metaclass Filter to set the unique constraint."""
 
@@ -259,3 +314,33 @@ class Filter(FilterBase):
                 ),
                 name="unique_filters"),
         )
+
+
+class FilterDeletion(ModelReprMixin, models.Model):
+    """A deleted filter or filter list, kept to let clients sync changes incrementally."""
+
+    class Kind(models.TextChoices):
+        """The kind of object that was deleted."""
+
+        FILTER = "filter"
+        FILTER_LIST = "filter_list"
+
+    kind = models.CharField(
+        max_length=11,
+        choices=Kind.choices,
+        help_text="Whether a filter or a filter list was deleted."
+    )
+    object_id = models.BigIntegerField(help_text="The ID of the deleted filter or filter list.")
+    version = models.BigIntegerField(
+        unique=True,
+        help_text="The filter version taken by the deletion."
+    )
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the filter or filter list was deleted."
+    )
+
+    objects = DeletionQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"Deletion of {self.kind} #{self.object_id} at version {self.version}"
@@ -1,8 +1,66 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.lookups import Exact, IsNull
 from django.utils import timezone
 
 from pydis_site.apps.api.models.bot.user import User
-from pydis_site.apps.api.models.mixins import ModelReprMixin
+from pydis_site.apps.api.models.mixins import (
+    DeletionQuerySet,
+    ModelReprMixin,
+    VersionedQuerySet,
+    next_version,
+)
+
+# The text search configuration the reasons of infractions are indexed and searched with.
+REASON_SEARCH_CONFIG = "english"
+
+# Name of the sequence the versions of writes to infractions are taken from.
+INFRACTION_VERSION_SEQUENCE = "api_infraction_version_seq"
+# Key of the advisory lock which serialises writes to infractions.
+INFRACTION_VERSION_LOCK_KEY = 0x696e667261637469
+
+
+def next_infraction_version() -> int:
+    """Take the next version for a write to an infraction."""
+    return next_version(INFRACTION_VERSION_SEQUENCE, INFRACTION_VERSION_LOCK_KEY)
+
+
+class InfractionQuerySet(VersionedQuerySet):
+    """
+    Stamp bulk writes to infractions with a new infraction version.
+
+    Updates which deactivate infractions or clear their expiry also stamp the infractions whose
+    expiry they cancel, like saves do through the `pre_save` signal.
+    """
+
+    version_sequence = INFRACTION_VERSION_SEQUENCE
+    version_lock_key = INFRACTION_VERSION_LOCK_KEY
+
+    def stamp(self, version: int, fields: dict) -> dict:
+        """Return the fields to update, stamped with the version, and with the cancelled expiries."""
+        fields = super().stamp(version, fields)
+        cancels_expiry = Q()
+        if "active" in fields:
+            cancels_expiry |= Q(Exact(_as_expression(fields["active"], models.BooleanField()), False))
+        if "expires_at" in fields:
+            cancels_expiry |= Q(IsNull(_as_expression(fields["expires_at"], models.DateTimeField()), True))
+        if cancels_expiry:
+            # The conditions on the current columns are evaluated against the rows before the update.
+            fields["expiry_cancelled_version"] = models.Case(
+                models.When(Q(active=True, expires_at__isnull=False) & cancels_expiry, then=version),
+                default=F("expiry_cancelled_version"),
+                output_field=models.BigIntegerField(),
+            )
+        return fields
+
+
+def _as_expression(value: object, output_field: models.Field) -> models.Expression:
+    """Return the value of a field to update as an expression."""
+    if hasattr(value, "resolve_expression"):
+        return value
+    return models.Value(value, output_field=output_field)
 
 
 class Infraction(ModelReprMixin, models.Model):
@@ -60,6 +118,12 @@ class Infraction(ModelReprMixin, models.Model):
         null=True,
         help_text="The reason for the infraction."
     )
+    reason_search = models.GeneratedField(
+        expression=SearchVector("reason", config=REASON_SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        help_text="The reason of the infraction as a text search vector, maintained by the database."
+    )
     hidden = models.BooleanField(
         default=False,
         help_text="Whether the infraction is a shadow infraction."
@@ -69,6 +133,21 @@ class Infraction(ModelReprMixin, models.Model):
         help_text="Whether a DM was sent to the user when infraction was applied."
     )
 
+    version = models.BigIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text="The infraction version taken by the latest write to this infraction."
+    )
+    expiry_cancelled_version = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text=(
+            "The infraction version taken by the latest write which deactivated this infraction "
+            "or cleared its expiry, while it was pending expiry."
+        )
+    )
+
     jump_url = models.URLField(
         default=None,
         null=True,
@@ -78,6 +157,8 @@ class Infraction(ModelReprMixin, models.Model):
         )
     )
 
+    objects = InfractionQuerySet.as_manager()
+
     class Meta:
         """Defines the meta options for the infraction model."""
 
@@ -89,6 +170,24 @@ class Infraction(ModelReprMixin, models.Model):
                 name="unique_active_infraction_per_type_per_user"
             ),
         )
+        indexes = (
+            # Serve pages of infractions by insertion time, of everyone or of a user or an actor.
+            models.Index(fields=("inserted_at", "id"), name="api_infraction_inserted"),
+            models.Index(fields=("user", "inserted_at", "id"), name="api_infraction_user_inserted"),
+            models.Index(
+                fields=("actor", "inserted_at", "id"), name="api_infraction_actor_inserted"
+            ),
+            # Serve the expiration feed, which only lists infractions that will expire.
+            models.Index(
+                fields=("expires_at",),
+                condition=models.Q(active=True, expires_at__isnull=False),
+                name="api_infraction_expiring",
+            ),
+            # Serve full-text searches of reasons.
+            GinIndex(fields=("reason_search",), name="api_infraction_reason_search"),
+            # Serve regular expression searches of reasons, by narrowing them down by trigrams.
+            GinIndex(OpClass("reason", name="gin_trgm_ops"), name="api_infraction_reason_trgm"),
+        )
 
     def __str__(self):
         """Returns some info on the current infraction, for display purposes."""
@@ -98,3 +197,35 @@ class Infraction(ModelReprMixin, models.Model):
         if self.hidden:
             s += " (hidden)"
         return s
+
+    @property
+    def is_expiring(self) -> bool:
+        """Whether this infraction is active and will expire."""
+        return self.active and self.expires_at is not None
+
+    @classmethod
+    def current_version(cls) -> int:
+        """Return the version of the latest committed write to any infraction."""
+        return max(
+            cls.objects.aggregate(version=models.Max("version", default=0))["version"],
+            InfractionDeletion.objects.aggregate(version=models.Max("version", default=0))["version"],
+        )
+
+
+class InfractionDeletion(ModelReprMixin, models.Model):
+    """A deleted infraction, kept to let the expiration feed report it."""
+
+    infraction_id = models.BigIntegerField(help_text="The ID of the deleted infraction.")
+    version = models.BigIntegerField(
+        unique=True,
+        help_text="The infraction version taken by the deletion."
+    )
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the infraction was deleted."
+    )
+
+    objects = DeletionQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"Deletion of infraction #{self.infraction_id} at version {self.version}"
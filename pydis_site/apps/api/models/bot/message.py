@@ -7,6 +7,19 @@ from django.db import models
 from pydis_site.apps.api.models.bot.user import User
 from pydis_site.apps.api.models.mixins import ModelReprMixin
 
+# The first second of 2015, in milliseconds since the Unix epoch, which Discord snowflakes count from.
+DISCORD_EPOCH = 1420070400000
+
+
+def snowflake_at(moment: datetime.datetime) -> int:
+    """
+    Return the lowest snowflake ID that can be created at the given moment.
+
+    As snowflakes start with their creation timestamp, all IDs created before the moment
+    are lower, and all IDs created at or after it are at least as high as the returned one.
+    """
+    return max(int(moment.timestamp() * 1000) - DISCORD_EPOCH, 0) << 22
+
 
 class Message(ModelReprMixin, models.Model):
     """A message, sent somewhere on the Discord server."""
@@ -67,6 +80,6 @@ class Message(ModelReprMixin, models.Model):
     def timestamp(self) -> datetime.datetime:
         """Attribute that represents the message timestamp as derived from the snowflake id."""
         return datetime.datetime.fromtimestamp(
-            ((self.id >> 22) + 1420070400000) / 1000,
+            ((self.id >> 22) + DISCORD_EPOCH) / 1000,
             tz=datetime.UTC,
         )
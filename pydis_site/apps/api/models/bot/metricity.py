@@ -1,8 +1,16 @@
 
+from datetime import date, timedelta
+
 from django.db import connections
+from django.db.models import Max, Sum
+
+from pydis_site.apps.api.models.bot.daily_message_activity import DailyMessageActivity
 
 BLOCK_INTERVAL = 10 * 60  # 10 minute blocks
 
+# A 32 bit hash of a message ID, summed up to detect changes to the messages of a day.
+MESSAGE_CHECKSUM = "('x' || left(md5(id), 8))::bit(32)::int"
+
 # This needs to be a list due to psycopg3 type adaptions.
 EXCLUDE_CHANNELS = [
     "267659945086812160",  # Bot commands
@@ -10,11 +18,6 @@ EXCLUDE_CHANNELS = [
 ]
 
 
-class NotFoundError(Exception):
-    """Raised when an entity cannot be found."""
-
-
-
 class Metricity:
     """Abstraction for a connection to the metricity database."""
 
@@ -27,107 +30,228 @@ class Metricity:
     def __exit__(self, *_):
         self.cursor.close()
 
-    def user(self, user_id: str) -> dict:
-        """Query a user's data."""
-        # TODO: Swap this back to some sort of verified at date
-        query = "SELECT joined_at FROM users WHERE id = '%s'"
-        self.cursor.execute(query, [user_id])
-        values = self.cursor.fetchone()
+    @staticmethod
+    def rolled_up_activity(user_ids: list[str]) -> tuple[date, dict[str, tuple[int, int]]]:
+        """
+        Query the message totals and activity blocks of users from the daily rollup.
+
+        Returns the first day not covered by the rollup, from which on messages
+        have to be counted live, and the rolled up `(total messages, activity blocks)`
+        of every given user with rolled up activity. If the rollup is empty,
+        all messages have to be counted live. Messages backfilled on rolled up
+        days are counted once `refresh_message_activity` ran again.
+        """
+        last_day = DailyMessageActivity.objects.aggregate(last_day=Max('day'))['last_day']
+        if last_day is None:
+            return date.min, {}
+
+        totals = (
+            DailyMessageActivity.objects
+            .filter(author_id__in=user_ids, day__lte=last_day)
+            .values('author_id')
+            .annotate(total_messages=Sum('total_messages'), activity_blocks=Sum('activity_blocks'))
+            .values_list('author_id', 'total_messages', 'activity_blocks')
+        )
+        return (
+            last_day + timedelta(days=1),
+            {str(author_id): (messages, blocks) for author_id, messages, blocks in totals}
+        )
+
+    def user_activity(self, user_ids: list[str], *, top_channels: bool = True) -> dict[str, dict]:
+        """
+        Query the join date and message activity of many users in a single round trip.
 
-        if not values:
-            raise NotFoundError
+        For every given user found in metricity, this returns the join date, the total number
+        of messages and activity blocks, and the three channels they are most active in, under
+        the keys `joined_at`, `total_messages`, `activity_blocks` and `top_channel_activity`,
+        mapped by user ID. Users not known to metricity are omitted.
 
-        return {'joined_at': values[0]}
+        Message totals are taken from the daily rollup, except for the days after it and the
+        rolled up days on which messages of the user were deleted, which are counted live.
+        This way, messages deleted after their day was rolled up are never counted. Only the
+        whole message history of the users is scanned if `top_channels` is set. Otherwise,
+        `top_channel_activity` is an empty list.
+        """
+        live_since, rolled_up = self.rolled_up_activity(user_ids)
 
-    def total_messages(self, user_id: str) -> int:
-        """Query total number of messages for a user."""
         self.cursor.execute(
             """
+            WITH
+                stale_days AS (
+                    SELECT DISTINCT author_id, created_at::date AS day
+                    FROM messages
+                    WHERE
+                        author_id = ANY(%s)
+                        AND is_deleted
+                        AND channel_id != ALL(%s)
+                        AND created_at < %s
+                ),
+                counted_messages AS (
+                    SELECT author_id, created_at
+                    FROM messages
+                    WHERE
+                        author_id = ANY(%s)
+                        AND NOT is_deleted
+                        AND channel_id != ALL(%s)
+                        AND created_at >= %s
+                    UNION ALL
+                    SELECT messages.author_id, messages.created_at
+                    FROM
+                        stale_days
+                        JOIN messages ON
+                            messages.author_id = stale_days.author_id
+                            AND messages.created_at >= stale_days.day
+                            AND messages.created_at < stale_days.day + 1
+                    WHERE
+                        NOT messages.is_deleted
+                        AND messages.channel_id != ALL(%s)
+                ),
+                message_totals AS (
+                    SELECT
+                        author_id,
+                        COUNT(*) AS total_messages,
+                        COUNT(DISTINCT floor(extract('epoch' from created_at) / %s)) AS activity_blocks
+                    FROM counted_messages
+                    GROUP BY author_id
+                ),
+                channel_activity AS (
+                    SELECT
+                        author_id,
+                        CASE
+                            WHEN channels.name ILIKE 'help-%%' THEN 'the help channels'
+                            WHEN channels.name ILIKE 'ot%%' THEN 'off-topic'
+                            WHEN channels.name ILIKE '%%voice%%' THEN 'voice chats'
+                            ELSE channels.name
+                        END AS channel,
+                        COUNT(1) AS message_count
+                    FROM
+                        messages
+                        LEFT JOIN channels ON channels.id = messages.channel_id
+                    WHERE
+                        %s
+                        AND author_id = ANY(%s)
+                        AND NOT messages.is_deleted
+                    GROUP BY
+                        1, 2
+                ),
+                top_channels AS (
+                    SELECT
+                        author_id,
+                        json_agg(json_build_array(channel, message_count) ORDER BY message_count DESC)
+                            AS top_channel_activity
+                    FROM (
+                        SELECT
+                            *,
+                            row_number() OVER (PARTITION BY author_id ORDER BY message_count DESC) AS rank
+                        FROM channel_activity
+                    ) ranked_channels
+                    WHERE rank <= 3
+                    GROUP BY author_id
+                )
             SELECT
-                COUNT(*)
-            FROM messages
+                users.id,
+                users.joined_at,
+                COALESCE(message_totals.total_messages, 0),
+                COALESCE(message_totals.activity_blocks, 0),
+                COALESCE(top_channels.top_channel_activity, '[]'::json),
+                ARRAY(SELECT day FROM stale_days WHERE stale_days.author_id = users.id)
+            FROM
+                users
+                LEFT JOIN message_totals ON message_totals.author_id = users.id
+                LEFT JOIN top_channels ON top_channels.author_id = users.id
             WHERE
-                author_id = '%s'
-                AND NOT is_deleted
-                AND channel_id != ALL(%s)
+                users.id = ANY(%s)
             """,
-            [user_id, EXCLUDE_CHANNELS]
+            [
+                user_ids, EXCLUDE_CHANNELS, live_since,
+                user_ids, EXCLUDE_CHANNELS, live_since,
+                EXCLUDE_CHANNELS,
+                BLOCK_INTERVAL,
+                top_channels, user_ids,
+                user_ids,
+            ]
         )
-        values = self.cursor.fetchone()
+        rows = self.cursor.fetchall()
+
+        # The stale days were counted live, so their rolled up activity must not be counted again.
+        stale_days = {user_id: set(days) for user_id, *_, days in rows if days}
+        if stale_days:
+            stale_activity = (
+                DailyMessageActivity.objects
+                .filter(author_id__in=stale_days, day__in=set().union(*stale_days.values()))
+                .values_list('author_id', 'day', 'total_messages', 'activity_blocks')
+            )
+            for author_id, day, messages, blocks in stale_activity:
+                if day in stale_days[str(author_id)]:
+                    rolled_up_messages, rolled_up_blocks = rolled_up[str(author_id)]
+                    rolled_up[str(author_id)] = (rolled_up_messages - messages, rolled_up_blocks - blocks)
 
-        if not values:
-            raise NotFoundError
+        activity = {}
+        for user_id, joined_at, total_messages, activity_blocks, top_channel_activity, _days in rows:
+            rolled_up_messages, rolled_up_blocks = rolled_up.get(user_id, (0, 0))
+            activity[user_id] = {
+                'joined_at': joined_at,
+                'total_messages': rolled_up_messages + total_messages,
+                'activity_blocks': rolled_up_blocks + activity_blocks,
+                'top_channel_activity': top_channel_activity,
+            }
+        return activity
 
-        return values[0]
+    def first_message_day(self) -> date | None:
+        """Query the day on which the first message was sent, if there are any messages."""
+        self.cursor.execute("SELECT min(created_at)::date FROM messages")
+        return self.cursor.fetchone()[0]
 
-    def total_message_blocks(self, user_id: str) -> int:
+    def daily_activity(self, since: date, until: date) -> list[tuple[str, date, int, int, int]]:
         """
-        Query number of 10 minute blocks during which the user has been active.
+        Query the message totals, activity blocks and message checksums of all users per day.
 
-        This metric prevents users from spamming to achieve the message total threshold.
+        Only the days from `since` up to, but excluding, `until` are included. Returns a list of
+        `(user_id, day, total_messages, activity_blocks, message_checksum)` tuples.
         """
         self.cursor.execute(
-            """
+            f"""
             SELECT
-                COUNT(*)
-            FROM (
-                SELECT
-                    (floor((extract('epoch' from created_at) / %s )) * %s) AS interval
-                FROM messages
-                WHERE
-                    author_id='%s'
-                    AND NOT is_deleted
-                    AND channel_id != ALL(%s)
-                GROUP BY interval
-            ) block_query;
+                author_id,
+                created_at::date AS day,
+                COUNT(*),
+                COUNT(DISTINCT floor(extract('epoch' from created_at) / %s)),
+                SUM({MESSAGE_CHECKSUM})
+            FROM messages
+            WHERE
+                NOT is_deleted
+                AND channel_id != ALL(%s)
+                AND created_at >= %s
+                AND created_at < %s
+            GROUP BY 1, 2
             """,
-            [BLOCK_INTERVAL, BLOCK_INTERVAL, user_id, EXCLUDE_CHANNELS]
+            [BLOCK_INTERVAL, EXCLUDE_CHANNELS, since, until]
         )
-        values = self.cursor.fetchone()
-
-        if not values:
-            raise NotFoundError
-
-        return values[0]
+        return self.cursor.fetchall()
 
-    def top_channel_activity(self, user_id: str) -> list[tuple[str, int]]:
+    def daily_checksums(self, until: date) -> dict[date, tuple[int, int]]:
         """
-        Query the top three channels in which the user is most active.
+        Query the message totals and message checksums of all days before `until`.
 
-        Help channels are grouped under "the help channels",
-        and off-topic channels are grouped under "off-topic".
+        Returns a mapping of every day with messages to its `(total messages, message checksum)`.
+        This scans all messages, but is much cheaper than rolling up all days again.
         """
         self.cursor.execute(
-            """
+            f"""
             SELECT
-                CASE
-                    WHEN channels.name ILIKE 'help-%%' THEN 'the help channels'
-                    WHEN channels.name ILIKE 'ot%%' THEN 'off-topic'
-                    WHEN channels.name ILIKE '%%voice%%' THEN 'voice chats'
-                    ELSE channels.name
-                END,
-                COUNT(1)
-            FROM
-                messages
-                LEFT JOIN channels ON channels.id = messages.channel_id
+                created_at::date AS day,
+                COUNT(*),
+                SUM({MESSAGE_CHECKSUM})
+            FROM messages
             WHERE
-                author_id = '%s' AND NOT messages.is_deleted
-            GROUP BY
-                1
-            ORDER BY
-                2 DESC
-            LIMIT
-                3;
+                NOT is_deleted
+                AND channel_id != ALL(%s)
+                AND created_at < %s
+            GROUP BY 1
             """,
-            [user_id]
+            [EXCLUDE_CHANNELS, until]
         )
-
-        values = self.cursor.fetchall()
-
-        if not values:
-            raise NotFoundError
-
-        return values
+        return {day: (total_messages, checksum) for day, total_messages, checksum in self.cursor.fetchall()}
 
     def total_messages_in_past_n_days(
         self,
@@ -156,3 +280,39 @@ class Metricity:
         values = self.cursor.fetchall()
 
         return values
+
+    def message_histogram(
+        self,
+        user_ids: list[str],
+        days: int,
+        bucket_days: int = 1
+    ) -> dict[str, list[int]]:
+        """
+        Query activity by a list of users in the past `days` days, in buckets of `bucket_days` days.
+
+        Returns a mapping of every given user ID to its list of message counts,
+        starting with the bucket of the most recent messages. Messages dated in
+        the future are counted in the most recent bucket.
+        """
+        bucket_count = -(-days // bucket_days)
+        self.cursor.execute(
+            """
+            SELECT
+                author_id,
+                greatest(floor(extract('epoch' from now() - created_at) / %s), 0)::int AS bucket,
+                COUNT(*)
+            FROM messages
+            WHERE
+                author_id = ANY(%s)
+                AND NOT is_deleted
+                AND channel_id != ALL(%s)
+                AND created_at > now() - make_interval(days => %s)
+            GROUP BY 1, 2
+            """,
+            [bucket_days * 24 * 60 * 60, user_ids, EXCLUDE_CHANNELS, days]
+        )
+
+        histograms = {user_id: [0] * bucket_count for user_id in user_ids}
+        for user_id, bucket, count in self.cursor.fetchall():
+            histograms[user_id][bucket] = count
+        return histograms
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Iterable
+
 from django.core.validators import MinValueValidator
 from django.db import models
 
 from pydis_site.apps.api.models.mixins import ModelReprMixin
 
+# Seconds after which the cached roles are reloaded. Role writes only clear the cache of the
+# process making them, so this bounds how long other processes serve outdated roles.
+ROLE_CACHE_TIMEOUT = 60
+
+# The time the roles were loaded at, the roles mapped by ID from the highest to the lowest,
+# and the IDs of required roles which did not exist when the roles were loaded.
+_role_cache: tuple[float, dict[int, Role], set[int]] | None = None
+
 
 class Role(ModelReprMixin, models.Model):
     """
@@ -60,6 +71,38 @@ class Role(ModelReprMixin, models.Model):
         """Returns the name of the current role, for display purposes."""
         return self.name
 
+    @classmethod
+    def cached(cls, *, require: Iterable[int] = (), reload: bool = False) -> dict[int, Role]:
+        """
+        Return all roles mapped by ID, ordered from the highest to the lowest position.
+
+        The roles are cached in memory, and only loaded again when any of the `require`d role IDs
+        is not cached, when `reload` is set, when a role was written, or after
+        `ROLE_CACHE_TIMEOUT` seconds. Required role IDs which still do not exist after loading
+        the roles do not cause them to be loaded again until then. The returned mapping and
+        roles must not be modified.
+        """
+        global _role_cache
+
+        cache = _role_cache
+        if (
+            reload
+            or cache is None
+            or time.monotonic() - cache[0] > ROLE_CACHE_TIMEOUT
+            or any(role_id not in cache[1] and role_id not in cache[2] for role_id in require)
+        ):
+            roles = {role.id: role for role in cls.objects.order_by("-position")}
+            cache = (time.monotonic(), roles, set())
+            _role_cache = cache
+        cache[2].update(role_id for role_id in require if role_id not in cache[1])
+        return cache[1]
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clear the roles cached by `cached`, such that they are loaded again on next use."""
+        global _role_cache
+        _role_cache = None
+
     def __lt__(self, other: Role) -> bool:
         """Compares the roles based on their position in the role hierarchy of the guild."""
         return self.position < other.position
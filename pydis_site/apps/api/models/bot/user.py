@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Case, Prefetch, Q, When
+from django.db.models.functions import Greatest, Upper
 
 from pydis_site.apps.api.models.bot.role import Role
 from pydis_site.apps.api.models.mixins import ModelReprMixin, ModelTimestampMixin
@@ -15,6 +24,66 @@ def _validate_existing_role(value: int) -> None:
         raise ValidationError(f"Role with ID {value} does not exist")
 
 
+class UserQuerySet(models.QuerySet):
+    """Queries on users."""
+
+    def matching(self, query: str) -> UserQuerySet:
+        """
+        Filter to users whose name or display name is or starts with the query, or has a word similar to it.
+
+        Similar words are those whose trigram word similarity reaches pg_trgm's
+        `word_similarity_threshold`, 0.6 by default. All checks are served by the trigram
+        indexes, and the threshold keeps the number of matches small even for common queries.
+        Prefix matches cover queries too short to have similar words, such as a single letter.
+        """
+        return self.filter(
+            Q(TrigramWordSimilar(Upper("name"), query))
+            | Q(TrigramWordSimilar(Upper("display_name"), query))
+            | Q(name__istartswith=query)
+            | Q(display_name__istartswith=query)
+        )
+
+    def search(self, query: str) -> UserQuerySet:
+        """
+        Filter to the users `matching` the query, best first.
+
+        Users whose name or display name is the query come first, followed by those starting with
+        it, and then by how similar the most similar word of their names is to the query.
+        """
+        return (
+            self
+            .matching(query)
+            .annotate(
+                search_rank=Greatest(
+                    TrigramWordSimilarity(query, Upper("name")),
+                    TrigramWordSimilarity(query, Upper("display_name")),
+                ),
+                search_match=Case(
+                    When(Q(name__iexact=query) | Q(display_name__iexact=query), then=2),
+                    When(Q(name__istartswith=query) | Q(display_name__istartswith=query), then=1),
+                    default=0,
+                ),
+            )
+            .order_by("-search_match", "-search_rank", "id")
+        )
+
+    def with_alts(self) -> UserQuerySet:
+        """
+        Prefetch the alternate accounts of the users, as serialized by `UserWithAltsSerializer`.
+
+        This loads the relationships with their targets, and the alts of those targets,
+        with two queries for all users.
+        """
+        return self.prefetch_related(Prefetch(
+            "useraltrelationship_set",
+            queryset=(
+                UserAltRelationship.objects
+                .select_related("target")
+                .prefetch_related("target__useraltrelationship_set")
+            ),
+        ))
+
+
 class User(ModelReprMixin, models.Model):
     """A Discord user."""
 
@@ -74,6 +143,20 @@ class User(ModelReprMixin, models.Model):
         verbose_name="Alternative accounts"
     )
 
+    objects = UserQuerySet.as_manager()
+
+    class Meta:
+        """Index names for searching users, and roles for finding the members of a role."""
+
+        indexes = (
+            GinIndex(fields=("roles",), name="api_user_roles_gin"),
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="api_user_name_trgm"),
+            GinIndex(
+                OpClass(Upper("display_name"), name="gin_trgm_ops"),
+                name="api_user_display_name_trgm",
+            ),
+        )
+
     def __str__(self):
         """Returns the name and discriminator for the current user, for display purposes."""
         return f"{self.name}#{self.discriminator:04d}"
@@ -85,10 +168,67 @@ class User(ModelReprMixin, models.Model):
 
         This will fall back to the Developers role if the user does not have any roles.
         """
-        roles = Role.objects.filter(id__in=self.roles)
-        if not roles:
-            return Role.objects.get(name="Developers")
-        return max(roles)
+        return self.resolve_top_roles([self])[self.id]
+
+    @staticmethod
+    def resolve_top_roles(users: Iterable[User]) -> dict[int, Role]:
+        """
+        Return the top roles of the given users, mapped by user ID, from the cached roles.
+
+        Like `top_role`, this falls back to the Developers role for users without roles.
+        The roles are only queried if they are not cached yet, or if a user has a role
+        which is not cached.
+        """
+        users = list(users)
+        roles = Role.cached(require={role_id for user in users for role_id in user.roles})
+
+        # The cached roles are ordered from the highest to the lowest.
+        rank = {role_id: index for index, role_id in enumerate(roles)}
+        developers = next((role for role in roles.values() if role.name == "Developers"), None)
+
+        top_roles = {}
+        for user in users:
+            top_role_id = min(
+                (role_id for role_id in user.roles if role_id in rank), key=rank.get, default=None
+            )
+            if top_role_id is not None:
+                top_roles[user.id] = roles[top_role_id]
+            elif developers is not None:
+                top_roles[user.id] = developers
+            else:
+                raise Role.DoesNotExist("There is no Developers role to fall back to.")
+        return top_roles
+
+    def alt_cluster(self, max_depth: int) -> tuple[list[User], bool]:
+        """
+        Return the users connected to this user through alt relationships, using a single query.
+
+        Every user reachable within `max_depth` relationships is returned, including this user,
+        with their `distance` from this user set. Users are ordered by distance, then by ID.
+        Also return whether the cluster reaches further than `max_depth` relationships.
+        """
+        users = list(User.objects.raw(
+            f"""
+            WITH RECURSIVE cluster (user_id, distance) AS (
+                SELECT %s::bigint, 0
+                UNION
+                SELECT relationship.target_id, cluster.distance + 1
+                FROM cluster
+                JOIN {UserAltRelationship._meta.db_table} AS relationship
+                    ON relationship.source_id = cluster.user_id
+                WHERE cluster.distance <= %s
+            )
+            SELECT account.*, min(cluster.distance) AS distance
+            FROM cluster
+            JOIN {User._meta.db_table} AS account ON account.id = cluster.user_id
+            GROUP BY account.id
+            ORDER BY distance, account.id
+            """,  # noqa: S608
+            [self.id, max_depth]
+        ))
+        # Users one relationship beyond the limit are only looked up to tell if there are any.
+        cluster = [user for user in users if user.distance <= max_depth]
+        return cluster, len(cluster) < len(users)
 
     @property
     def username(self) -> str:
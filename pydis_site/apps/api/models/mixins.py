@@ -1,6 +1,11 @@
+from __future__ import annotations
+
+import datetime
 from operator import itemgetter
 
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
 
 
 class ModelReprMixin:
@@ -29,3 +34,78 @@ class ModelTimestampMixin(models.Model):
         """Metaconfig for the mixin."""
 
         abstract = True
+
+
+def next_version(sequence: str, lock_key: int) -> int:
+    """
+    Take the next version from the given sequence, for a write to a versioned model.
+
+    Concurrent writers are serialised by the advisory lock with the given key until the end of
+    their transaction, so that versions become visible in the order they were taken. Writes
+    should therefore be made atomically, otherwise a client syncing in between could miss them.
+    Outside of a transaction, the version is taken in a transaction of its own.
+    """
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [lock_key])
+        cursor.execute("SELECT nextval(%s)", [sequence])
+        return cursor.fetchone()[0]
+
+
+class VersionedQuerySet(models.QuerySet):
+    """
+    Stamp bulk writes to a versioned model with a new version.
+
+    Single saves are stamped by `pre_save` signals, which `update`, `bulk_create` and
+    `bulk_update` do not send. Without a new version, clients would not see the changes.
+    `bulk_update` is stamped through `update`. Subclasses set the sequence and the lock key
+    their versions are taken with.
+    """
+
+    version_sequence: str
+    version_lock_key: int
+
+    def update(self, **kwargs) -> int:
+        """Update the objects, stamping them with a new version."""
+        with transaction.atomic(using=self.db):
+            version = next_version(self.version_sequence, self.version_lock_key)
+            return super().update(**self.stamp(version, kwargs))
+
+    def stamp(self, version: int, fields: dict) -> dict:
+        """Return the fields to update the objects with, stamped with the given version."""
+        return {**fields, "version": version}
+
+    def bulk_create(self, objs: list[models.Model], *args, **kwargs) -> list[models.Model]:
+        """Create the objects, stamping them with a new version."""
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            version = next_version(self.version_sequence, self.version_lock_key)
+            for obj in objs:
+                obj.version = version
+            return super().bulk_create(objs, *args, **kwargs)
+
+
+class DeletionQuerySet(models.QuerySet):
+    """
+    Queries on the records of deleted objects of a versioned model, kept for incremental syncs.
+
+    Records are only kept for `settings.DELETION_RETENTION_DAYS`. Clients syncing from a version
+    older than the `horizon` may have missed pruned deletions, and need to sync from scratch.
+    """
+
+    def expired(self) -> DeletionQuerySet:
+        """Filter to the records of deletions older than the retention period."""
+        cutoff = timezone.now() - datetime.timedelta(days=settings.DELETION_RETENTION_DAYS)
+        return self.filter(deleted_at__lt=cutoff)
+
+    def horizon(self) -> int:
+        """Return the oldest version from which clients can still sync incrementally."""
+        return self.expired().aggregate(horizon=models.Max("version", default=0))["horizon"]
+
+    def prune(self) -> int:
+        """
+        Delete the expired records, and return how many were deleted.
+
+        The newest expired record is kept, as it marks the `horizon`.
+        """
+        deleted, _ = self.expired().filter(version__lt=self.horizon()).delete()
+        return deleted
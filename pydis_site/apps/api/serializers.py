@@ -1,8 +1,11 @@
 """Converters from Django models to data interchange formats and back."""
+import contextlib
+from collections import defaultdict
+from collections.abc import Iterable
 from datetime import timedelta
 from typing import Any
 
-from django.db import models
+from django.db import connection, models
 from django.db.models.query import QuerySet
 from django.db.utils import IntegrityError
 from rest_framework.exceptions import NotFound
@@ -15,7 +18,7 @@ from rest_framework.serializers import (
     ValidationError
 )
 from rest_framework.settings import api_settings
-from rest_framework.validators import UniqueTogetherValidator
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 
 from .models import (
     AocAccountLink,
@@ -101,6 +104,76 @@ class BumpedThreadSerializer(ModelSerializer):
         fields = ('thread_id',)
 
 
+def _as_id(value: Any) -> int | None:
+    """Return the given value as an ID if it is an integer or a string of digits, otherwise `None`."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+class DeletedMessageListSerializer(ListSerializer):
+    """List serializer for deleted messages, validating their authors and IDs in bulk."""
+
+    def to_internal_value(self, data: Any) -> list:
+        """
+        Validate the authors and IDs of all messages before the messages themselves.
+
+        Rather than running two queries for each message, all authors are resolved in a
+        single query, and all message IDs are checked to not be taken in another one.
+        """
+        if isinstance(data, list):
+            self._validate_in_bulk(data)
+        return super().to_internal_value(data)
+
+    def _validate_in_bulk(self, data: list) -> None:
+        """Fail if any author does not exist, or any message ID is taken or given multiple times."""
+        items = [item if isinstance(item, dict) else {} for item in data]
+        author_ids = [_as_id(item.get('author')) for item in items]
+        message_ids = [_as_id(item.get('id')) for item in items]
+
+        authors = User.objects.in_bulk({author_id for author_id in author_ids if author_id is not None})
+        taken_ids = set(
+            DeletedMessage.objects
+            .filter(id__in={message_id for message_id in message_ids if message_id is not None})
+            .values_list('id', flat=True)
+        )
+
+        errors = [{} for _ in items]
+        seen = set()
+        for index, (author_id, message_id) in enumerate(zip(author_ids, message_ids, strict=True)):
+            if author_id is not None and author_id not in authors:
+                errors[index]['author'] = [
+                    PrimaryKeyRelatedField.default_error_messages['does_not_exist'].format(
+                        pk_value=author_id
+                    )
+                ]
+            if message_id is None:
+                continue
+            if message_id in taken_ids:
+                errors[index]['id'] = ["Deleted message with this ID already exists."]
+            elif message_id in seen:
+                errors[index]['id'] = [f"Message with ID {message_id} given multiple times."]
+            seen.add(message_id)
+
+        if any(errors):
+            raise ValidationError(errors)
+        self.root._known_authors = authors
+
+
+class DeletedMessageAuthorField(PrimaryKeyRelatedField):
+    """The author of a deleted message, taken from the authors resolved by the list serializer."""
+
+    def to_internal_value(self, data: Any) -> User:
+        """Return the already resolved author, falling back to looking them up."""
+        authors = getattr(self.root, '_known_authors', None)
+        author_id = _as_id(data)
+        if authors is not None and author_id in authors:
+            return authors[author_id]
+        return super().to_internal_value(data)
+
+
 class DeletedMessageSerializer(ModelSerializer):
     """
     A class providing (de-)serialization of `DeletedMessage` instances.
@@ -110,7 +183,7 @@ class DeletedMessageSerializer(ModelSerializer):
     model for more information.
     """
 
-    author = PrimaryKeyRelatedField(
+    author = DeletedMessageAuthorField(
         queryset=User.objects.all()
     )
     deletion_context = PrimaryKeyRelatedField(
@@ -130,6 +203,17 @@ class DeletedMessageSerializer(ModelSerializer):
             'embeds', 'deletion_context',
             'attachments'
         )
+        list_serializer_class = DeletedMessageListSerializer
+
+    def get_fields(self) -> dict:
+        """Leave checking that message IDs are unique to the list serializer, if there is one."""
+        fields = super().get_fields()
+        if isinstance(self.parent, DeletedMessageListSerializer):
+            fields['id'].validators = [
+                validator for validator in fields['id'].validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
 
 
 class MessageDeletionContextSerializer(ModelSerializer):
@@ -352,7 +436,7 @@ class FilterSerializer(ModelSerializer):
         }
 
         schema = {name: getattr(instance, name) for name in BASE_FILTER_FIELDS}
-        schema['filter_list'] = instance.filter_list.id
+        schema['filter_list'] = instance.filter_list_id
         schema['settings'] = settings
         return schema
 
@@ -434,9 +518,11 @@ class FilterListSerializer(ModelSerializer):
         into a sub-field called `settings`.
         """
         schema = {name: getattr(instance, name) for name in BASE_FILTERLIST_FIELDS}
+        # Uses the filters prefetched by the viewset, if available.
+        filter_serializer = FilterSerializer(many=False)
         schema['filters'] = [
-            FilterSerializer(many=False).to_representation(instance=item)
-            for item in Filter.objects.filter(filter_list=instance.id).prefetch_related('filter_list')
+            filter_serializer.to_representation(instance=item)
+            for item in instance.filters.all()
         ]
 
         settings = {name: getattr(instance, name) for name in BASE_SETTINGS_FIELDS}
@@ -593,9 +679,41 @@ class RoleSerializer(ModelSerializer):
         fields = ('id', 'name', 'colour', 'permissions', 'position')
 
 
+# Columns written by `UserListSerializer.sync`, starting with the conflict target.
+USER_SYNC_FIELDS = ('id', 'name', 'display_name', 'discriminator', 'roles', 'in_guild')
+
+# Number of users written per statement by `UserListSerializer.update`.
+USER_BULK_UPDATE_BATCH_SIZE = 1000
+
+
+def _existing_role_ids(role_ids: Iterable[int]) -> set[int]:
+    """Return which of the given role IDs exist, looked up with a single query."""
+    role_ids = set(role_ids)
+    if not role_ids:
+        return set()
+    return set(Role.objects.filter(id__in=role_ids).values_list('id', flat=True))
+
+
 class UserListSerializer(ListSerializer):
     """List serializer for User model to handle bulk updates."""
 
+    def to_internal_value(self, data: list) -> list:
+        """Look up the roles submitted for all users at once, before validating each user."""
+        submitted_role_ids = set()
+        if isinstance(data, list):
+            for user_dict in data:
+                roles = user_dict.get('roles') if isinstance(user_dict, dict) else None
+                if not isinstance(roles, list):
+                    continue
+                for role_id in roles:
+                    # Invalid IDs are rejected by the role field of each user.
+                    with contextlib.suppress(TypeError, ValueError):
+                        role_id = int(role_id)
+                        if 0 <= role_id <= models.BigIntegerField.MAX_BIGINT:
+                            submitted_role_ids.add(role_id)
+        self._existing_role_ids = _existing_role_ids(submitted_role_ids)
+        return super().to_internal_value(data)
+
     def create(self, validated_data: list) -> list:
         """Override create method to optimize django queries."""
         new_users = []
@@ -616,6 +734,9 @@ class UserListSerializer(ListSerializer):
         """
         Override update method to support bulk updates.
 
+        Only the users and fields whose given values differ from the stored ones are written.
+        The numbers of changed and skipped users are stored in `update_counts`.
+
         ref:https://www.django-rest-framework.org/api-guide/serializers/#customizing-multiple-update
         """
         object_ids = set()
@@ -641,16 +762,22 @@ class UserListSerializer(ListSerializer):
 
         updated = []
         fields_to_update = set()
+        # Changed users grouped by the fields changed on them, such that each group
+        # is written with an UPDATE of only those columns.
+        changed_users = defaultdict(list)
         for user_data in validated_data:
-            for key in user_data:
-                fields_to_update.add(key)
-
-                try:
-                    user = instance_mapping[user_data["id"]]
-                except KeyError:
-                    raise NotFound({"detail": f"User with id {user_data['id']} not found."})
+            try:
+                user = instance_mapping[user_data["id"]]
+            except KeyError:
+                raise NotFound({"detail": f"User with id {user_data['id']} not found."})
 
+            fields_to_update.update(user_data)
+            changed_fields = frozenset(
+                key for key, value in user_data.items() if getattr(user, key) != value
+            )
+            if changed_fields:
                 user.__dict__.update(user_data)
+                changed_users[changed_fields].append(user)
             updated.append(user)
 
         fields_to_update.remove("id")
@@ -661,9 +788,74 @@ class UserListSerializer(ListSerializer):
                 {api_settings.NON_FIELD_ERRORS_KEY: ["Insufficient data provided."]}
             )
 
-        User.objects.bulk_update(updated, fields_to_update)
+        for changed_fields, users in changed_users.items():
+            User.objects.bulk_update(users, changed_fields, batch_size=USER_BULK_UPDATE_BATCH_SIZE)
+
+        changed_count = sum(map(len, changed_users.values()))
+        self.update_counts = {'changed': changed_count, 'skipped': len(updated) - changed_count}
         return updated
 
+    def sync(self, validated_data: list) -> dict[str, int]:
+        """
+        Insert or update the given users with a single `INSERT ... ON CONFLICT` statement.
+
+        Every user is expected to be a full user object. Omitted optional fields are
+        reset to their model defaults. Rows whose stored values already match the
+        given ones are left untouched. Each user may only be given once, since a
+        single statement cannot write the same row twice.
+
+        Returns the number of inserted, updated and unchanged users.
+        """
+        seen = set()
+        params = []
+        for user_dict in validated_data:
+            if user_dict["id"] in seen:
+                raise ValidationError(
+                    {"id": [f"User with ID {user_dict['id']} given multiple times."]}
+                )
+            seen.add(user_dict["id"])
+            params.extend((
+                user_dict["id"],
+                user_dict["name"],
+                user_dict.get("display_name", ""),
+                user_dict["discriminator"],
+                user_dict.get("roles", []),
+                user_dict.get("in_guild", True),
+            ))
+
+        if not validated_data:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        columns = ", ".join(USER_SYNC_FIELDS)
+        values = ", ".join(
+            "(%s, %s, %s, %s, %s::bigint[], %s)" for _ in range(len(validated_data))
+        )
+        changes = ", ".join(f"{field} = EXCLUDED.{field}" for field in USER_SYNC_FIELDS[1:])
+        stored = ", ".join(f"stored.{field}" for field in USER_SYNC_FIELDS[1:])
+        excluded = ", ".join(f"EXCLUDED.{field}" for field in USER_SYNC_FIELDS[1:])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {User._meta.db_table} AS stored ({columns})
+                VALUES {values}
+                ON CONFLICT (id) DO UPDATE SET {changes}
+                WHERE ({stored}) IS DISTINCT FROM ({excluded})
+                RETURNING xmax = 0
+                """,  # noqa: S608 - only the placeholders depend on the input
+                params
+            )
+            # `xmax` is zero for freshly inserted rows. Rows skipped by the
+            # `WHERE` clause of the conflict handler are not returned at all.
+            written = [inserted for (inserted,) in cursor.fetchall()]
+
+        inserted = sum(written)
+        return {
+            "inserted": inserted,
+            "updated": len(written) - inserted,
+            "unchanged": len(validated_data) - len(written),
+        }
+
 
 class UserAltRelationshipSerializer(FrozenFieldsMixin, ModelSerializer):
     """A class providing (de-)serialization of `UserAltRelationship` instances."""
@@ -681,15 +873,15 @@ class UserAltRelationshipSerializer(FrozenFieldsMixin, ModelSerializer):
         depth = 1
 
     def to_representation(self, instance: UserAltRelationship) -> dict:
-        """Add the alts of the target to the representation."""
+        """
+        Add the alts of the target to the representation.
+
+        Prefetch `target__useraltrelationship_set` when serializing many relationships.
+        """
         representation = super().to_representation(instance)
         representation['alts'] = tuple(
-            user_id
-            for (user_id,) in (
-                UserAltRelationship.objects
-                .filter(source=instance.target)
-                .values_list('target_id')
-            )
+            relationship.target_id
+            for relationship in instance.target.useraltrelationship_set.all()
         )
         return representation
 
@@ -708,6 +900,33 @@ class UserSerializer(ModelSerializer):
         fields = ('id', 'name', 'display_name', 'discriminator', 'roles', 'in_guild')
         depth = 1
         list_serializer_class = UserListSerializer
+        extra_kwargs = {
+            # Replace the model's per-element role validator, which queries
+            # once for every role, with the bulk check in `validate_roles`.
+            'roles': {
+                'child': IntegerField(min_value=0, max_value=models.BigIntegerField.MAX_BIGINT)
+            }
+        }
+
+    def validate_roles(self, roles: list[int]) -> list[int]:
+        """
+        Validate that all of the given roles exist.
+
+        When validating many users, the roles submitted for all of them were looked up
+        with a single query by `UserListSerializer`. Otherwise, the given roles are looked up.
+        """
+        known_role_ids = getattr(self.root, '_existing_role_ids', None)
+        if known_role_ids is None:
+            known_role_ids = _existing_role_ids(roles)
+
+        errors = {
+            index: [f"Role with ID {role_id} does not exist"]
+            for index, role_id in enumerate(roles)
+            if role_id not in known_role_ids
+        }
+        if errors:
+            raise ValidationError(errors)
+        return roles
 
     def create(self, validated_data: dict) -> User:
         """Override create method to catch IntegrityError."""
@@ -730,11 +949,21 @@ class UserWithAltsSerializer(FrozenFieldsMixin, UserSerializer):
         frozen_fields = ('alts',)
 
     def get_alts(self, user: User) -> list[dict]:
-        """Retrieve the alts with all additional data on them."""
-        return [
-            UserAltRelationshipSerializer(alt).data
-            for alt in user.alts.through.objects.filter(source=user)
-        ]
+        """
+        Retrieve the alts with all additional data on them.
+
+        The alts prefetched by `User.objects.with_alts()` are used if present.
+        """
+        if 'useraltrelationship_set' in getattr(user, '_prefetched_objects_cache', {}):
+            relationships = user.useraltrelationship_set.all()
+        else:
+            relationships = (
+                UserAltRelationship.objects
+                .filter(source=user)
+                .select_related('target')
+                .prefetch_related('target__useraltrelationship_set')
+            )
+        return UserAltRelationshipSerializer(relationships, many=True).data
 
 
 class NominationEntrySerializer(ModelSerializer):
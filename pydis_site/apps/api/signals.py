@@ -1,12 +1,75 @@
-from django.db.models.signals import post_delete
+from django.db import transaction
+from django.db.models import F, Func, Value
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from pydis_site.apps.api.models.bot import Role, User
+from pydis_site.apps.api.models.bot import (
+    Filter,
+    FilterDeletion,
+    FilterList,
+    Infraction,
+    InfractionDeletion,
+    Role,
+    User
+)
+from pydis_site.apps.api.models.bot.filters import next_filter_version
+from pydis_site.apps.api.models.bot.infraction import next_infraction_version
 
 
 @receiver(signal=post_delete, sender=Role)
 def delete_role_from_user(sender: Role, instance: Role, **kwargs) -> None:
     """Unassigns the Role (instance) that is being deleted from every user that has it."""
-    for user in User.objects.filter(roles__contains=[instance.id]):
-        del user.roles[user.roles.index(instance.id)]
-        user.save()
+    User.objects.filter(roles__contains=[instance.id]).update(
+        roles=Func(F("roles"), Value(instance.id), function="array_remove")
+    )
+
+
+@receiver(signal=post_save, sender=Role)
+@receiver(signal=post_delete, sender=Role)
+def clear_role_cache(sender: Role, instance: Role, **kwargs) -> None:
+    """Clears the cached roles when a role (instance) is written, and again once it is committed."""
+    Role.clear_cache()
+    transaction.on_commit(Role.clear_cache)
+
+
+@receiver(signal=pre_save, sender=Filter)
+@receiver(signal=pre_save, sender=FilterList)
+def bump_filter_version(sender: type[Filter | FilterList], instance: Filter | FilterList, **kwargs) -> None:
+    """Stamps the filter or filter list (instance) that is being saved with a new filter version."""
+    instance.version = next_filter_version()
+
+
+@receiver(signal=post_delete, sender=Filter)
+@receiver(signal=post_delete, sender=FilterList)
+def record_filter_deletion(
+    sender: type[Filter | FilterList], instance: Filter | FilterList, **kwargs
+) -> None:
+    """Records the deletion of the filter or filter list (instance) under a new filter version."""
+    FilterDeletion.objects.create(
+        kind=FilterDeletion.Kind.FILTER if sender is Filter else FilterDeletion.Kind.FILTER_LIST,
+        object_id=instance.id,
+        version=next_filter_version(),
+    )
+
+
+@receiver(signal=pre_save, sender=Infraction)
+def bump_infraction_version(sender: type[Infraction], instance: Infraction, **kwargs) -> None:
+    """
+    Stamps the infraction (instance) that is being saved with a new infraction version.
+
+    If the save deactivates the infraction or clears its expiry while it was pending expiry,
+    the expiry is marked as cancelled at that version.
+    """
+    instance.version = next_infraction_version()
+    if (
+        not instance._state.adding
+        and not instance.is_expiring
+        and Infraction.objects.filter(pk=instance.pk, active=True, expires_at__isnull=False).exists()
+    ):
+        instance.expiry_cancelled_version = instance.version
+
+
+@receiver(signal=post_delete, sender=Infraction)
+def record_infraction_deletion(sender: type[Infraction], instance: Infraction, **kwargs) -> None:
+    """Records the deletion of the infraction (instance) under a new infraction version."""
+    InfractionDeletion.objects.create(infraction_id=instance.id, version=next_infraction_version())
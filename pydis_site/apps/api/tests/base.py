@@ -1,6 +1,12 @@
+import datetime
+
 from django.contrib.auth.models import User
+from django.db import connections
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
+from pydis_site.apps.api.models import Role
+
 
 test_user, _created = User.objects.get_or_create(
     username='test',
@@ -62,6 +68,67 @@ class AuthenticatedAPITestCase(APITestCase):
     """
 
     def setUp(self) -> None:
-        """Bootstrap the user and authenticate it."""
+        """Bootstrap the user and authenticate it, and forget roles cached by earlier tests."""
         super().setUp()
         self.client.force_authenticate(test_user)
+        Role.clear_cache()
+
+
+# The parts of the metricity schema which the site queries, as in `postgres/init.sql`.
+METRICITY_SCHEMA = """
+    CREATE TABLE users (
+        id varchar,
+        joined_at timestamp,
+        primary key(id)
+    );
+    CREATE TABLE channels (
+        id varchar,
+        name varchar,
+        primary key(id)
+    );
+    CREATE TABLE messages (
+        id varchar,
+        author_id varchar references users(id),
+        is_deleted boolean,
+        created_at timestamp,
+        channel_id varchar references channels(id),
+        primary key(id)
+    );
+"""
+
+CHANNELS = [
+    ("267659945086812160", "bot-commands"),
+    ("11", "help-apple"),
+    ("12", "help-cherry"),
+    ("21", "ot0-hello"),
+    ("31", "voice-chat-0"),
+    ("1234", "zebra"),
+]
+
+
+class MetricityTestCase(AuthenticatedAPITestCase):
+    """Runs the metricity queries against a real metricity schema in the test database."""
+
+    databases = {"default", "metricity"}
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the metricity tables, which are rolled back with the test data."""
+        cls.now = timezone.now().replace(microsecond=0)
+        with connections["metricity"].cursor() as cursor:
+            cursor.execute(METRICITY_SCHEMA)
+            cursor.executemany("INSERT INTO channels VALUES (%s, %s)", CHANNELS)
+
+    def add_user(self, user_id: str) -> None:
+        """Add a user to metricity, who joined now."""
+        with connections["metricity"].cursor() as cursor:
+            cursor.execute("INSERT INTO users VALUES (%s, %s)", [user_id, self.now])
+
+    def add_messages(self, *messages: tuple[str, str, datetime.datetime, str, bool]) -> None:
+        """Add messages given as `(id, author ID, sent at, channel ID, is deleted)` tuples."""
+        with connections["metricity"].cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO messages (id, author_id, created_at, channel_id, is_deleted) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                messages
+            )
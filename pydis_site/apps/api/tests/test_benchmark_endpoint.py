@@ -0,0 +1,54 @@
+from functools import partial
+from io import StringIO
+from unittest import mock
+
+import httpx
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from pydis_site.apps.api.management.commands import benchmark_endpoint
+
+METRICS = """\
+# HELP django_db_new_connections_total Counter of created connections by database and by vendor.
+# TYPE django_db_new_connections_total counter
+django_db_new_connections_total{{alias="default",vendor="postgresql"}} {default}
+django_db_new_connections_total{{alias="metricity",vendor="postgresql"}} {metricity}
+"""
+
+
+class BenchmarkEndpointCommandTests(SimpleTestCase):
+    def setUp(self):
+        self.requests = []
+        self.status_code = 200
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path == "/metrics":
+            # Each alias connects once per request, as without persistent connections.
+            requested = sum(request.url.path != "/metrics" for request in self.requests)
+            return httpx.Response(200, text=METRICS.format(default=2 + requested, metricity=requested))
+        return httpx.Response(self.status_code, json={})
+
+    def benchmark(self, *args, **options) -> str:
+        stdout = StringIO()
+        client = partial(httpx.Client, transport=httpx.MockTransport(self.handle))
+        with mock.patch.object(benchmark_endpoint.httpx, "Client", client):
+            call_command("benchmark_endpoint", *args, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_reports_latencies_and_new_connections_per_alias(self):
+        output = self.benchmark("http://site/bot/users/1/metricity_data?x=1", "--token", "key", requests=10)
+
+        self.assertRegex(output, r"^10 requests: p50 [\d.]+ms, p95 [\d.]+ms, max [\d.]+ms\n")
+        self.assertIn("New connections to default: 10\n", output)
+        self.assertIn("New connections to metricity: 10\n", output)
+        self.assertEqual(str(self.requests[0].url), "http://site/metrics")
+        self.assertEqual(len(self.requests), 12)
+        self.assertEqual(self.requests[1].headers["Authorization"], "Token key")
+
+    def test_fails_for_error_responses(self):
+        self.status_code = 404
+
+        with self.assertRaisesMessage(CommandError, "returned status 404"):
+            self.benchmark("http://site/bot/users/1/metricity_data")
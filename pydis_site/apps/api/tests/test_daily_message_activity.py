@@ -0,0 +1,142 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase
+
+from .base import MetricityTestCase
+from pydis_site.apps.api.models import DailyMessageActivity
+from pydis_site.apps.api.models.bot.metricity import Metricity
+
+
+class RolledUpActivityTests(TestCase):
+    def test_empty_rollup_counts_everything_live(self):
+        live_since, totals = Metricity.rolled_up_activity(["1"])
+
+        self.assertEqual(live_since, datetime.date.min)
+        self.assertEqual(totals, {})
+
+    def test_sums_days_and_counts_live_after_last_day(self):
+        DailyMessageActivity.objects.bulk_create([
+            DailyMessageActivity(
+                author_id=1, day=datetime.date(2024, 1, 1), total_messages=5, activity_blocks=2
+            ),
+            DailyMessageActivity(
+                author_id=1, day=datetime.date(2024, 1, 2), total_messages=3, activity_blocks=1
+            ),
+            DailyMessageActivity(
+                author_id=2, day=datetime.date(2024, 1, 3), total_messages=7, activity_blocks=4
+            ),
+        ])
+
+        live_since, totals = Metricity.rolled_up_activity(["1", "3"])
+
+        self.assertEqual(live_since, datetime.date(2024, 1, 4))
+        self.assertEqual(totals, {"1": (8, 3)})
+
+
+class RefreshMessageActivityCommandTests(MetricityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_user("1")
+        self.add_user("2")
+        self.old_day = (self.now - datetime.timedelta(days=40)).replace(hour=12, minute=0, second=0)
+        self.add_messages(
+            ("1", "1", self.old_day, "11", False),
+            ("2", "1", self.old_day + datetime.timedelta(minutes=30), "21", False),
+            ("3", "2", self.old_day, "11", False),
+            ("4", "1", self.now - datetime.timedelta(days=3), "11", False),
+            ("5", "1", self.now, "11", False),
+            ("6", "1", self.old_day, "267659945086812160", False),
+        )
+
+    def refresh(self, **options) -> str:
+        stdout = StringIO()
+        call_command("refresh_message_activity", stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def assert_totals_match_live(self):
+        """Assert that the totals of the users match the totals counted without the rollup."""
+        with Metricity() as metricity:
+            totals = metricity.user_activity(["1", "2"], top_channels=False)
+            rollup = list(DailyMessageActivity.objects.all())
+            DailyMessageActivity.objects.all().delete()
+            live_totals = metricity.user_activity(["1", "2"], top_channels=False)
+            DailyMessageActivity.objects.bulk_create(rollup)
+
+        self.assertEqual(totals, live_totals)
+
+    def test_rolls_up_from_first_message_if_empty(self):
+        output = self.refresh()
+
+        self.assertIn("Rolled up the message activity of 40 days", output)
+        self.assertEqual(
+            sorted(DailyMessageActivity.objects.values_list("author_id", "total_messages", "activity_blocks")),
+            [(1, 1, 1), (1, 2, 2), (2, 1, 1)]
+        )
+        self.assert_totals_match_live()
+
+    def test_does_not_roll_up_unchanged_days_again(self):
+        self.refresh()
+
+        output = self.refresh()
+
+        self.assertIn("Rolled up the message activity of 0 days", output)
+
+    def test_rolls_up_old_day_again_after_message_is_deleted(self):
+        self.refresh()
+        with connections["metricity"].cursor() as cursor:
+            cursor.execute("UPDATE messages SET is_deleted = true WHERE id = '2'")
+
+        output = self.refresh()
+
+        self.assertIn("Rolled up the message activity of 1 days", output)
+        self.assertEqual(
+            DailyMessageActivity.objects.get(author_id=1, day=self.old_day.date()).total_messages, 1
+        )
+        self.assert_totals_match_live()
+
+    def test_totals_exclude_messages_deleted_after_roll_up(self):
+        self.refresh()
+        with connections["metricity"].cursor() as cursor:
+            cursor.execute("UPDATE messages SET is_deleted = true WHERE id IN ('2', '3')")
+
+        with Metricity() as metricity:
+            totals = metricity.user_activity(["1", "2"], top_channels=False)
+
+        self.assertEqual(
+            {user_id: (data["total_messages"], data["activity_blocks"]) for user_id, data in totals.items()},
+            {"1": (3, 3), "2": (0, 0)}
+        )
+        self.assert_totals_match_live()
+
+    def test_rolls_up_old_day_again_after_message_is_backfilled(self):
+        self.refresh()
+        self.add_messages(
+            ("7", "1", self.old_day - datetime.timedelta(days=1), "11", False),
+            ("8", "2", self.old_day + datetime.timedelta(minutes=20), "21", False),
+        )
+
+        output = self.refresh()
+
+        self.assertIn("Rolled up the message activity of 2 days", output)
+        self.assert_totals_match_live()
+
+    def test_detects_replaced_message(self):
+        self.refresh()
+        with connections["metricity"].cursor() as cursor:
+            cursor.execute("UPDATE messages SET is_deleted = true WHERE id = '3'")
+        self.add_messages(("9", "2", self.old_day, "11", False))
+
+        output = self.refresh()
+
+        self.assertIn("Rolled up the message activity of 1 days", output)
+
+    def test_full_refresh_rolls_up_everything(self):
+        self.refresh()
+
+        output = self.refresh(full=True)
+
+        self.assertIn("Rolled up the message activity of 40 days", output)
+        self.assert_totals_match_live()
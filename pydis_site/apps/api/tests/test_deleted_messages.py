@@ -1,9 +1,14 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
+from io import StringIO
 
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from .base import AuthenticatedAPITestCase
-from pydis_site.apps.api.models import MessageDeletionContext, User
+from pydis_site.apps.api.models import DeletedMessage, MessageDeletionContext, User
+from pydis_site.apps.api.models.bot.message import snowflake_at
 
 
 class DeletedMessagesWithoutActorTests(AuthenticatedAPITestCase):
@@ -96,3 +101,273 @@ class DeletedMessagesLogURLTests(AuthenticatedAPITestCase):
         [context] = MessageDeletionContext.objects.all()
         expected_url = reverse('staff:logs', args=(context.id,))
         self.assertEqual(context.log_url, expected_url)
+
+
+class DeletedMessagesValidationTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            id=1402,
+            name='Ada Lovelace',
+            discriminator=1815,
+        )
+
+    def get_data(self, *messages: tuple[int, int]) -> dict:
+        return {
+            'actor': None,
+            'creation': datetime.now(tz=UTC).isoformat(),
+            'deletedmessage_set': [
+                {
+                    'author': author_id,
+                    'id': message_id,
+                    'channel_id': 1843,
+                    'content': "The Analytical Engine weaves algebraic patterns",
+                    'embeds': [],
+                    'attachments': []
+                }
+                for message_id, author_id in messages
+            ]
+        }
+
+    def test_returns_400_for_unknown_author(self):
+        url = reverse('api:bot:messagedeletioncontext-list')
+        response = self.client.post(url, data=self.get_data((1, self.author.id), (2, 999)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'deletedmessage_set': [{}, {'author': ['Invalid pk "999" - object does not exist.']}]
+        })
+        self.assertFalse(MessageDeletionContext.objects.exists())
+
+    def test_returns_400_for_duplicate_message_id(self):
+        url = reverse('api:bot:messagedeletioncontext-list')
+        response = self.client.post(
+            url, data=self.get_data((1, self.author.id), (1, self.author.id))
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'deletedmessage_set': [{}, {'id': ['Message with ID 1 given multiple times.']}]
+        })
+
+    def test_returns_400_for_existing_message_id(self):
+        url = reverse('api:bot:messagedeletioncontext-list')
+        response = self.client.post(url, data=self.get_data((1, self.author.id)))
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post(url, data=self.get_data((1, self.author.id)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'deletedmessage_set': [{'id': ['Deleted message with this ID already exists.']}]
+        })
+
+
+class DeletedMessagesIngestionQueryTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = User.objects.bulk_create(
+            User(id=user_id, name=f"user{user_id}", discriminator=1)
+            for user_id in range(1, 51)
+        )
+
+    def test_ingestion_runs_constant_number_of_queries(self):
+        url = reverse('api:bot:messagedeletioncontext-list')
+        next_message_id = 1
+
+        for message_count in (10, 100, 1_000, 10_000):
+            with self.subTest(message_count=message_count):
+                data = {
+                    'actor': self.authors[0].id,
+                    'creation': datetime.now(tz=UTC).isoformat(),
+                    'deletedmessage_set': [
+                        {
+                            'author': self.authors[message_id % len(self.authors)].id,
+                            'id': message_id,
+                            'channel_id': 1984,
+                            'content': f"Message {message_id}",
+                            'embeds': [],
+                            'attachments': []
+                        }
+                        for message_id in range(next_message_id, next_message_id + message_count)
+                    ]
+                }
+                next_message_id += message_count
+
+                # The actor, the authors and the taken message IDs are selected for validation,
+                # and the created messages for the response.
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.post(url, data=data)
+
+                self.assertEqual(response.status_code, 201)
+                select_queries = [
+                    query for query in queries.captured_queries
+                    if query['sql'].startswith('SELECT')
+                ]
+                self.assertEqual(len(select_queries), 4)
+
+
+class DeletedMessagePartitionTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(id=1, name='Grace Hopper', discriminator=1906)
+        cls.deletion_context = MessageDeletionContext.objects.create(
+            actor=None, creation=datetime.now(tz=UTC)
+        )
+
+    def create_message(self, sent_at: datetime) -> DeletedMessage:
+        return DeletedMessage.objects.create(
+            id=snowflake_at(sent_at) + 1,
+            author=self.author,
+            channel_id=1,
+            content="",
+            embeds=[],
+            attachments=[],
+            deletion_context=self.deletion_context,
+        )
+
+    @staticmethod
+    def get_partition(message: DeletedMessage) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM api_deletedmessage WHERE id = %s", [message.id]
+            )
+            return cursor.fetchone()[0]
+
+    def test_snowflake_at_matches_timestamp(self):
+        sent_at = datetime(2024, 3, 5, 12, 30, tzinfo=UTC)
+        message = self.create_message(sent_at)
+
+        self.assertEqual(message.timestamp, sent_at)
+
+    def test_sent_between_filters_by_id_range(self):
+        old = self.create_message(datetime(2023, 12, 31, tzinfo=UTC))
+        recent = self.create_message(datetime(2024, 1, 15, tzinfo=UTC))
+        new = self.create_message(datetime(2024, 2, 1, tzinfo=UTC))
+
+        messages = DeletedMessage.objects.sent_between(
+            after=datetime(2024, 1, 1, tzinfo=UTC), before=datetime(2024, 2, 1, tzinfo=UTC)
+        )
+
+        self.assertEqual(list(messages), [recent])
+        self.assertEqual(list(DeletedMessage.objects.sent_between(before=recent.timestamp)), [old])
+        self.assertEqual(list(DeletedMessage.objects.sent_between(after=new.timestamp)), [new])
+
+    def test_messages_are_stored_in_monthly_partitions(self):
+        DeletedMessage.create_partition(date(2024, 1, 1))
+        message = self.create_message(datetime(2024, 1, 15, tzinfo=UTC))
+
+        self.assertEqual(self.get_partition(message), "api_deletedmessage_y2024m01")
+
+    def test_create_partition_moves_messages_from_default_partition(self):
+        message = self.create_message(datetime(2040, 6, 15, tzinfo=UTC))
+        self.assertEqual(self.get_partition(message), "api_deletedmessage_default")
+
+        self.assertTrue(DeletedMessage.create_partition(date(2040, 6, 1)))
+        self.assertFalse(DeletedMessage.create_partition(date(2040, 6, 1)))
+
+        self.assertEqual(self.get_partition(message), "api_deletedmessage_y2040m06")
+        self.assertEqual(list(DeletedMessage.objects.all()), [message])
+
+    def test_create_partitions_command_is_idempotent(self):
+        first_stdout = StringIO()
+        call_command("create_deleted_message_partitions", months=12, stdout=first_stdout)
+        second_stdout = StringIO()
+        call_command("create_deleted_message_partitions", months=12, stdout=second_stdout)
+
+        self.assertIn("Created the partition", first_stdout.getvalue())
+        self.assertEqual(second_stdout.getvalue(), "")
+
+    def test_create_partitions_command_moves_old_messages(self):
+        old = self.create_message(datetime(2023, 11, 30, tzinfo=UTC))
+        older = self.create_message(datetime(2023, 10, 2, tzinfo=UTC))
+        self.assertEqual(self.get_partition(old), "api_deletedmessage_default")
+        self.assertEqual(DeletedMessage.oldest_unpartitioned_month(), date(2023, 10, 1))
+
+        call_command("create_deleted_message_partitions", months=0, stdout=StringIO())
+
+        self.assertEqual(self.get_partition(old), "api_deletedmessage_y2023m11")
+        self.assertEqual(self.get_partition(older), "api_deletedmessage_y2023m10")
+        self.assertIsNone(DeletedMessage.oldest_unpartitioned_month())
+
+    def test_sent_between_scans_only_the_partitions_in_range(self):
+        for month in (1, 2, 3):
+            DeletedMessage.create_partition(date(2024, month, 1))
+
+        plan = DeletedMessage.objects.sent_between(
+            after=datetime(2024, 2, 1, tzinfo=UTC), before=datetime(2024, 3, 1, tzinfo=UTC)
+        ).explain()
+
+        self.assertIn("api_deletedmessage_y2024m02", plan)
+        for partition in ("y2024m01", "y2024m03", "default"):
+            self.assertNotIn(f"api_deletedmessage_{partition}", plan)
+
+
+class DeletedMessageListTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(id=1, name='Ada Lovelace', discriminator=1815)
+        cls.actor = User.objects.create(id=2, name='Charles Babbage', discriminator=1791)
+        cls.deletion_context = MessageDeletionContext.objects.create(
+            actor=cls.actor, creation=datetime.now(tz=UTC)
+        )
+        cls.other_context = MessageDeletionContext.objects.create(
+            actor=None, creation=datetime.now(tz=UTC)
+        )
+        cls.messages = DeletedMessage.objects.bulk_create(
+            DeletedMessage(
+                id=snowflake_at(datetime(2024, 1, day, tzinfo=UTC)) + 1,
+                author=cls.author,
+                channel_id=day % 2,
+                content=f"Message {day}",
+                embeds=[],
+                attachments=[],
+                deletion_context=cls.other_context if day == 10 else cls.deletion_context,
+            )
+            for day in range(1, 15)
+        )
+        cls.url = reverse('api:bot:messagedeletioncontext-list')
+
+    def list_ids(self, **params) -> list[int]:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [message['id'] for message in response.json()]
+
+    def test_lists_messages_sent_between(self):
+        ids = self.list_ids(sent_after='2024-01-03T00:00:00', sent_before='2024-01-06T00:00:00')
+
+        self.assertEqual(ids, [message.id for message in reversed(self.messages[2:5])])
+
+    def test_filters_by_author_channel_and_actor(self):
+        ids = self.list_ids(
+            sent_after='2024-01-07', author__id=self.author.id, channel_id=0,
+            deletion_context__actor__id=self.actor.id,
+        )
+
+        self.assertEqual(ids, [self.messages[day - 1].id for day in (14, 12, 8)])
+
+    def test_lists_messages_in_constant_queries(self):
+        # The count of the messages and the page of messages.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'sent_after': '2024-01-01', 'limit': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 10)
+
+    def test_returns_400_for_invalid_times(self):
+        cases = (
+            ({'sent_after': 'yesterday'}, {'sent_after': ['failed to convert to datetime']}),
+            (
+                {'sent_after': '2024-01-02', 'sent_before': '2024-01-01'},
+                {
+                    'sent_after': ['cannot be after sent_before'],
+                    'sent_before': ['cannot be before sent_after'],
+                },
+            ),
+        )
+
+        for params, error in cases:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), error)
@@ -0,0 +1,148 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User as DjangoUser
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pydis_site.apps.api.models import (
+    DeletedMessage,
+    DeletionLogArchive,
+    MessageDeletionContext,
+    User,
+)
+
+
+class ArchiveDeletionLogsCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(id=1, name="Margaret Hamilton", discriminator=1936)
+        cls.old_context = MessageDeletionContext.objects.create(
+            actor=cls.author, creation=timezone.now() - datetime.timedelta(days=200)
+        )
+        cls.new_context = MessageDeletionContext.objects.create(
+            actor=cls.author, creation=timezone.now() - datetime.timedelta(days=10)
+        )
+        for message_id, context in ((1, cls.old_context), (2, cls.old_context), (3, cls.new_context)):
+            DeletedMessage.objects.create(
+                id=message_id,
+                author=cls.author,
+                channel_id=1969,
+                content=f"Message {message_id}",
+                embeds=[{"description": "Apollo"}] if message_id == 2 else [],
+                attachments=["https://http.cat/200"],
+                deletion_context=context,
+            )
+
+    def archive(self, **options) -> str:
+        stdout = StringIO()
+        call_command("archive_deletion_logs", stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_archives_only_old_contexts(self):
+        expected_messages = list(self.old_context.deletedmessage_set.order_by("id").values())
+
+        self.archive()
+
+        self.assertEqual(list(DeletedMessage.objects.values_list("id", flat=True)), [3])
+        archive = DeletionLogArchive.objects.get()
+        self.assertEqual(archive.deletion_context, self.old_context)
+        self.assertEqual(archive.message_count, 2)
+        self.assertEqual(
+            [
+                {field.attname: getattr(message, field.attname) for field in DeletedMessage._meta.fields}
+                for message in archive.messages()
+            ],
+            expected_messages
+        )
+
+    def test_archived_messages_keep_their_authors(self):
+        self.archive()
+
+        [first, second] = DeletionLogArchive.objects.get().messages()
+
+        self.assertEqual(first.author, self.author)
+        self.assertEqual(second.embeds, [{"description": "Apollo"}])
+
+    def test_age_is_configurable(self):
+        output = self.archive(days=5)
+
+        self.assertEqual(DeletionLogArchive.objects.count(), 2)
+        self.assertFalse(DeletedMessage.objects.exists())
+        self.assertIn("Archived 3 messages of 2 deletion contexts", output)
+
+    def test_archived_contexts_are_skipped(self):
+        self.archive()
+        output = self.archive()
+
+        self.assertEqual(DeletionLogArchive.objects.count(), 1)
+        self.assertIn("Archived 0 messages of 0 deletion contexts", output)
+
+    @mock.patch("pydis_site.apps.api.models.bot.deletion_log_archive.ARCHIVE_CHUNK_SIZE", 2)
+    def test_messages_are_read_from_the_needed_chunks_only(self):
+        DeletedMessage.objects.bulk_create(
+            DeletedMessage(
+                id=message_id,
+                author=self.author,
+                channel_id=1969,
+                content=f"Message {message_id}",
+                embeds=[],
+                attachments=[],
+                deletion_context=self.old_context,
+            )
+            for message_id in range(4, 10)
+        )
+        self.archive()
+        archive = DeletionLogArchive.objects.get()
+
+        self.assertEqual(
+            list(archive.chunks.order_by("first_message_id").values_list("first_message_id", "last_message_id")),
+            [(1, 2), (4, 5), (6, 7), (8, 9)],
+        )
+        self.assertEqual([message.id for message in archive.messages()], [1, 2, 4, 5, 6, 7, 8, 9])
+        with mock.patch.object(
+            type(archive.chunks.first()), "rows", autospec=True, side_effect=lambda chunk, after: []
+        ) as rows:
+            archive.messages(after=4, limit=2)
+        self.assertEqual([call.args[0].first_message_id for call in rows.call_args_list], [4, 6, 8])
+        self.assertEqual([message.id for message in archive.messages(after=4, limit=2)], [5, 6])
+
+
+class DeletedMessageAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.actor = User.objects.create(id=1, name="Margaret Hamilton", discriminator=1936)
+        cls.context = MessageDeletionContext.objects.create(actor=cls.actor, creation=timezone.now())
+        DeletedMessage.objects.create(
+            id=1,
+            author=cls.actor,
+            channel_id=1969,
+            content="Apollo",
+            embeds=[],
+            attachments=[],
+            deletion_context=cls.context,
+        )
+        DeletionLogArchive.create_from_messages(cls.context, cls.context.deletedmessage_set.all())
+        cls.context.deletedmessage_set.all().delete()
+        cls.staff = DjangoUser.objects.create_superuser("staff", "staff@example.com", "staffpass")
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_search_links_to_archived_logs(self):
+        url = reverse("admin:api_deletedmessage_changelist")
+
+        for term in ("hamilton", "1"):
+            with self.subTest(term=term):
+                response = self.client.get(url, {"q": term})
+
+                self.assertContains(response, self.context.log_url)
+                self.assertContains(response, "The 1 messages deleted by")
+
+    def test_no_links_for_other_actors(self):
+        response = self.client.get(reverse("admin:api_deletedmessage_changelist"), {"q": "lovelace"})
+
+        self.assertNotContains(response, self.context.log_url)
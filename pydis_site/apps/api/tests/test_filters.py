@@ -1,12 +1,16 @@
 import contextlib
 from dataclasses import dataclass
 from datetime import timedelta
+from io import StringIO
 from typing import Any
 
+from django.core.management import call_command
 from django.db.models import Model
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from pydis_site.apps.api.models.bot.filters import Filter, FilterList, FilterListType
+from pydis_site.apps.api.models.bot.filters import Filter, FilterDeletion, FilterList, FilterListType
 from pydis_site.apps.api.tests.base import AuthenticatedAPITestCase
 
 
@@ -230,7 +234,7 @@ class GenericFilterTests(AuthenticatedAPITestCase):
 
     def test_creation_missing_field(self) -> None:
         for name, sequence in get_test_sequences().items():
-            ignored_fields = sequence.ignored_fields + ("id", "additional_settings")
+            ignored_fields = sequence.ignored_fields + ("id", "additional_settings", "version")
             with self.subTest(name=name):
                 saved = sequence.model(**sequence.object)
                 save_nested_objects(saved)
@@ -395,3 +399,179 @@ class FilterCreationMissingOptionalFieldsTestCase(AuthenticatedAPITestCase):
         endpoint = reverse('api:bot:filter-list')
         response = self.client.post(endpoint, data=data)
         self.assertEqual(response.status_code, 201)
+
+
+class FilterListQueryCountTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        list_settings = get_test_sequences()["filter_list1"].object
+        filter_settings = get_test_sequences()["filter"].object
+        # Remove the filter lists created by migrations.
+        FilterList.objects.all().delete()
+        for list_number in range(3):
+            filter_list = FilterList.objects.create(
+                **(list_settings | {"name": f"list{list_number}"})
+            )
+            for filter_number in range(3):
+                Filter.objects.create(
+                    **(filter_settings | {"content": f"word{filter_number}", "filter_list": filter_list})
+                )
+
+    def test_list_runs_constant_number_of_queries(self) -> None:
+        url = reverse("api:bot:filterlist-list")
+
+        # One query for the filter version, one for the filter lists, and one for all of their filters.
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+        for filter_list in response.json():
+            self.assertEqual(len(filter_list["filters"]), 3)
+            self.assertEqual({filter_["filter_list"] for filter_ in filter_list["filters"]}, {filter_list["id"]})
+
+
+class FilterVersionTests(AuthenticatedAPITestCase):
+    def setUp(self):
+        super().setUp()
+        list_settings = get_test_sequences()["filter_list1"].object
+        self.filter_settings = get_test_sequences()["filter"].object
+        self.filter_list = FilterList.objects.create(**list_settings)
+        self.filter = Filter.objects.create(
+            **(self.filter_settings | {"filter_list": self.filter_list})
+        )
+
+    def get_version(self, url_name: str) -> str:
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_not_modified_if_version_is_current(self) -> None:
+        for url_name in ("api:bot:filterlist-list", "api:bot:filter-list"):
+            with self.subTest(url_name=url_name):
+                etag = self.get_version(url_name)
+
+                with self.assertNumQueries(1):
+                    response = self.client.get(reverse(url_name), headers={"If-None-Match": etag})
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+
+    def test_version_is_bumped_by_writes(self) -> None:
+        etag = self.get_version("api:bot:filter-list")
+
+        response = self.client.patch(
+            reverse("api:bot:filter-detail", args=(self.filter.id,)),
+            data={"description": "changed", "filter_list": self.filter_list.id},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse("api:bot:filter-list"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response["ETag"].strip('"')), int(etag.strip('"')))
+
+    def test_filters_since_version(self) -> None:
+        since = self.get_version("api:bot:filter-list").strip('"')
+        created = Filter.objects.create(
+            **(self.filter_settings | {"content": "new", "filter_list": self.filter_list})
+        )
+        deleted_id = self.filter.id
+        self.filter.delete()
+
+        response = self.client.get(reverse("api:bot:filter-list"), {"since": since})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(str(body["version"]), response["ETag"].strip('"'))
+        self.assertEqual([filter_["id"] for filter_ in body["filters"]], [created.id])
+        self.assertEqual(body["deleted_filters"], [deleted_id])
+
+    def test_filter_lists_since_version(self) -> None:
+        other_list = FilterList.objects.create(
+            **(get_test_sequences()["filter_list2"].object | {"name": "other"})
+        )
+        since = self.get_version("api:bot:filterlist-list").strip('"')
+        created = Filter.objects.create(
+            **(self.filter_settings | {"content": "new", "filter_list": self.filter_list})
+        )
+        other_list_id = other_list.id
+        other_list.delete()
+
+        response = self.client.get(reverse("api:bot:filterlist-list"), {"since": since})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([filter_list["id"] for filter_list in body["filter_lists"]], [self.filter_list.id])
+        self.assertEqual(
+            [filter_["id"] for filter_ in body["filter_lists"][0]["filters"]], [created.id]
+        )
+        self.assertEqual(body["deleted_filter_lists"], [other_list_id])
+        self.assertEqual(body["deleted_filters"], [])
+
+    def test_version_is_bumped_by_bulk_writes(self) -> None:
+        writes = {
+            "update": lambda: Filter.objects.filter(id=self.filter.id).update(description="changed"),
+            "bulk_create": lambda: Filter.objects.bulk_create([
+                Filter(**(self.filter_settings | {"content": "new", "filter_list": self.filter_list}))
+            ]),
+            "bulk_update": lambda: Filter.objects.bulk_update(
+                [Filter(id=self.filter.id, description="changed again")], ["description"]
+            ),
+            "filter list update": lambda: FilterList.objects.update(dm_content="changed"),
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name):
+                etag = self.get_version("api:bot:filterlist-list")
+
+                write()
+
+                response = self.client.get(
+                    reverse("api:bot:filterlist-list"), headers={"If-None-Match": etag}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(int(response["ETag"].strip('"')), int(etag.strip('"')))
+
+    def test_bulk_updated_filters_since_version(self) -> None:
+        since = self.get_version("api:bot:filter-list").strip('"')
+        Filter.objects.filter(id=self.filter.id).update(description="changed")
+
+        response = self.client.get(reverse("api:bot:filter-list"), {"since": since})
+
+        self.assertEqual([filter_["id"] for filter_ in response.json()["filters"]], [self.filter.id])
+
+    @override_settings(DELETION_RETENTION_DAYS=30)
+    def test_since_before_pruned_deletions_is_gone(self) -> None:
+        since = self.get_version("api:bot:filter-list").strip('"')
+        old_filters = Filter.objects.bulk_create(
+            Filter(**(self.filter_settings | {"content": content, "filter_list": self.filter_list}))
+            for content in ("old", "older")
+        )
+        for filter_ in old_filters:
+            filter_.delete()
+        FilterDeletion.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        deleted_id = self.filter.id
+        self.filter.delete()
+
+        stdout = StringIO()
+        call_command("prune_deletions", stdout=stdout)
+
+        self.assertIn("Pruned 1 records of deleted filters and filter lists.\n", stdout.getvalue())
+        horizon = FilterDeletion.objects.horizon()
+        self.assertEqual(FilterDeletion.objects.filter(version__lte=horizon).count(), 1)
+
+        response = self.client.get(reverse("api:bot:filter-list"), {"since": since})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(
+            response.json(),
+            {"since": ["Changes since this version are no longer kept, list all objects instead."]}
+        )
+
+        response = self.client.get(reverse("api:bot:filter-list"), {"since": horizon})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["deleted_filters"], [deleted_id])
+
+    def test_invalid_since(self) -> None:
+        response = self.client.get(reverse("api:bot:filter-list"), {"since": "-1"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"since": ["Must be a non-negative integer."]})
@@ -1,15 +1,22 @@
 import datetime
+import json
 from datetime import UTC, datetime as dt, timedelta
+from io import StringIO
 from unittest.mock import patch
 from urllib.parse import quote
 
-from django.db import transaction
+from django.contrib.postgres.search import SearchQuery
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.db.utils import IntegrityError
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 from .base import AuthenticatedAPITestCase
-from pydis_site.apps.api.models import Infraction, User
-from pydis_site.apps.api.serializers import InfractionSerializer
+from pydis_site.apps.api.models import Infraction, InfractionDeletion, User
+from pydis_site.apps.api.models.bot.infraction import REASON_SEARCH_CONFIG
+from pydis_site.apps.api.serializers import InfractionSerializer, UserSerializer
 
 
 class UnauthenticatedTests(AuthenticatedAPITestCase):
@@ -338,6 +345,440 @@ class InfractionTests(AuthenticatedAPITestCase):
         })
 
 
+class TextSearchTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=6, name='james', discriminator=1)
+        reasons = (
+            "Posted a crypto scam link.",
+            "Scamming members with crypto giveaways, crypto everywhere.",
+            "Spamming in #python-general.",
+            None,
+        )
+        cls.infractions = Infraction.objects.bulk_create(
+            Infraction(
+                user_id=cls.user.id,
+                actor_id=cls.user.id,
+                type='note',
+                reason=reason,
+                active=False,
+                inserted_at=dt(2020, 1, day, tzinfo=UTC),
+            )
+            for day, reason in enumerate(reasons, start=1)
+        )
+
+    def search(self, **params) -> list[int]:
+        response = self.client.get(reverse('api:bot:infraction-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [infraction['id'] for infraction in response.json()]
+
+    def test_finds_stemmed_words_by_relevance(self):
+        self.assertEqual(
+            self.search(text_search="crypto scam"),
+            [self.infractions[1].id, self.infractions[0].id]
+        )
+
+    def test_supports_web_search_syntax(self):
+        self.assertEqual(
+            self.search(text_search='"crypto scam" or spam'),
+            [self.infractions[0].id, self.infractions[2].id]
+        )
+        self.assertEqual(self.search(text_search="crypto -giveaway"), [self.infractions[0].id])
+
+    def test_regex_is_applied_to_text_search_results(self):
+        self.assertEqual(
+            self.search(text_search="crypto", search=r"^Posted"),
+            [self.infractions[0].id]
+        )
+
+    def test_ordering_overrides_relevance(self):
+        self.assertEqual(
+            self.search(text_search="crypto", ordering="inserted_at"),
+            [self.infractions[0].id, self.infractions[1].id]
+        )
+
+    def explain(self, **filters) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return Infraction.objects.filter(**filters).order_by().explain()
+
+    def test_text_search_uses_the_search_vector_index(self):
+        query = SearchQuery("crypto", search_type='websearch', config=REASON_SEARCH_CONFIG)
+
+        self.assertIn("api_infraction_reason_search", self.explain(reason_search=query))
+
+    def test_regex_search_uses_the_trigram_index(self):
+        self.assertIn("api_infraction_reason_trgm", self.explain(reason__iregex="crypto sc[ae]m"))
+
+
+class ExpirationTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=6, name='james', discriminator=1)
+        cls.other_user = User.objects.create(id=7, name='jimmy', discriminator=2)
+        cls.expires_later = Infraction.objects.create(
+            user=cls.user, actor=cls.user, type='ban', active=True,
+            expires_at=dt(2030, 1, 2, tzinfo=UTC),
+        )
+        cls.expires_soon = Infraction.objects.create(
+            user=cls.user, actor=cls.user, type='timeout', active=True,
+            expires_at=dt(2030, 1, 1, tzinfo=UTC),
+        )
+        cls.permanent = Infraction.objects.create(
+            user=cls.user, actor=cls.user, type='voice_ban', active=True,
+        )
+        cls.inactive = Infraction.objects.create(
+            user=cls.user, actor=cls.user, type='warning', active=False,
+            expires_at=dt(2029, 1, 1, tzinfo=UTC),
+        )
+        cls.url = reverse('api:bot:infraction-expirations')
+
+    def get_expirations(self, **params) -> dict:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_returns_active_expiring_infractions_due_first(self):
+        body = self.get_expirations()
+
+        self.assertEqual(body['version'], Infraction.current_version())
+        self.assertEqual(
+            [infraction['id'] for infraction in body['expirations']],
+            [self.expires_soon.id, self.expires_later.id]
+        )
+        self.assertNotIn('cancelled', body)
+
+    def test_returns_infractions_expiring_until(self):
+        body = self.get_expirations(until='2030-01-01T12:00:00')
+
+        self.assertEqual([infraction['id'] for infraction in body['expirations']], [self.expires_soon.id])
+
+    def test_returns_changes_since_version(self):
+        version = self.get_expirations()['version']
+        self.assertEqual(self.get_expirations(since=version)['expirations'], [])
+
+        url = reverse('api:bot:infraction-detail', args=(self.expires_soon.id,))
+        self.client.patch(url, {'active': False})
+        new = Infraction.objects.create(
+            user=self.other_user, actor=self.user, type='timeout', active=True,
+            expires_at=dt(2030, 1, 3, tzinfo=UTC),
+        )
+
+        body = self.get_expirations(since=version)
+        self.assertGreater(body['version'], version)
+        self.assertEqual([infraction['id'] for infraction in body['expirations']], [new.id])
+        self.assertEqual(body['cancelled'], [self.expires_soon.id])
+        self.assertEqual(self.get_expirations(since=body['version'])['expirations'], [])
+
+    def test_returns_deletions_since_version(self):
+        version = self.get_expirations()['version']
+
+        response = self.client.delete(reverse('api:bot:infraction-detail', args=(self.expires_soon.id,)))
+        self.assertEqual(response.status_code, 204)
+
+        body = self.get_expirations(since=version)
+        self.assertGreater(body['version'], version)
+        self.assertEqual(body['expirations'], [])
+        self.assertEqual(body['deleted'], [self.expires_soon.id])
+        self.assertEqual(self.get_expirations(since=body['version'])['deleted'], [])
+
+    @override_settings(DELETION_RETENTION_DAYS=30)
+    def test_since_before_pruned_deletions_is_gone(self):
+        version = self.get_expirations()['version']
+        self.expires_soon.delete()
+        self.inactive.delete()
+        InfractionDeletion.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+
+        call_command("prune_deletions", stdout=StringIO())
+
+        horizon = InfractionDeletion.objects.horizon()
+        self.assertEqual(list(InfractionDeletion.objects.values_list('version', flat=True)), [horizon])
+
+        response = self.client.get(self.url, {'since': version})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(
+            response.json(),
+            {'since': ['changes since this version are no longer kept, fetch all expirations instead']}
+        )
+        self.assertEqual(self.get_expirations(since=horizon)['deleted'], [])
+
+    def test_does_not_cancel_infractions_with_changed_notes(self):
+        version = self.get_expirations()['version']
+
+        for infraction in (self.expires_later, self.permanent, self.inactive):
+            url = reverse('api:bot:infraction-detail', args=(infraction.id,))
+            self.client.patch(url, {'reason': 'Changed note'})
+
+        body = self.get_expirations(since=version)
+        self.assertEqual(
+            [infraction['id'] for infraction in body['expirations']],
+            [self.expires_later.id]
+        )
+        self.assertEqual(body['cancelled'], [])
+
+    def test_cancels_infractions_with_cleared_expiry(self):
+        version = self.get_expirations()['version']
+
+        url = reverse('api:bot:infraction-detail', args=(self.expires_later.id,))
+        self.client.patch(url, {'expires_at': None}, format='json')
+
+        body = self.get_expirations(since=version)
+        self.assertEqual(body['expirations'], [])
+        self.assertEqual(body['cancelled'], [self.expires_later.id])
+
+    def test_queryset_update_stamps_versions(self):
+        version = self.get_expirations()['version']
+
+        Infraction.objects.filter(id=self.expires_soon.id).update(active=False)
+        Infraction.objects.filter(id=self.permanent.id).update(reason='Changed note')
+
+        body = self.get_expirations(since=version)
+        self.assertEqual(body['expirations'], [])
+        self.assertEqual(body['cancelled'], [self.expires_soon.id])
+        self.assertGreater(body['version'], version)
+
+    def test_bulk_create_stamps_versions(self):
+        version = self.get_expirations()['version']
+
+        created = Infraction.objects.bulk_create([
+            Infraction(
+                user=self.other_user, actor=self.user, type='timeout', active=True,
+                expires_at=dt(2030, 1, 3, tzinfo=UTC),
+            ),
+        ])
+
+        body = self.get_expirations(since=version)
+        self.assertGreater(created[0].version, version)
+        self.assertEqual([infraction['id'] for infraction in body['expirations']], [created[0].id])
+
+    def test_returns_400_for_invalid_parameters(self):
+        cases = (
+            ({'until': 'soon'}, {'until': ['failed to convert to datetime']}),
+            ({'since': '-1'}, {'since': ['must be a non-negative integer']}),
+        )
+
+        for params, error in cases:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), error)
+
+
+class CursorPaginationTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=6, name='james', discriminator=1)
+        cls.other_user = User.objects.create(id=7, name='jimmy', discriminator=2)
+        # Pairs of infractions share their insertion time, to paginate across ties.
+        cls.infractions = Infraction.objects.bulk_create(
+            Infraction(
+                user=cls.user if number % 3 else cls.other_user,
+                actor=cls.other_user,
+                type='note',
+                reason=f"Note {number}",
+                active=False,
+                inserted_at=dt(2020, 1, 1, tzinfo=UTC) + timedelta(days=number // 2),
+            )
+            for number in range(10)
+        )
+        cls.newest_first = sorted(
+            cls.infractions, key=lambda infraction: (infraction.inserted_at, infraction.id), reverse=True
+        )
+
+    def get_pages(self, **params) -> list[list[int]]:
+        url = reverse('api:bot:infraction-list')
+        pages = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(url, {**params, 'after': cursor})
+            self.assertEqual(response.status_code, 200)
+            pages.append([infraction['id'] for infraction in response.json()['results']])
+            cursor = response.json()['next_cursor']
+        return pages
+
+    def test_pages_through_all_infractions_newest_first(self):
+        ids = [infraction.id for infraction in self.newest_first]
+
+        self.assertEqual(self.get_pages(limit=3), [ids[0:3], ids[3:6], ids[6:9], ids[9:]])
+        self.assertEqual(self.get_pages(limit=5), [ids[0:5], ids[5:]])
+
+    def test_pages_through_filtered_infractions(self):
+        ids = [infraction.id for infraction in self.newest_first if infraction.user == self.user]
+
+        self.assertEqual(self.get_pages(limit=4, user__id=self.user.id), [ids[0:4], ids[4:]])
+
+    def test_returns_400_for_invalid_cursor(self):
+        url = reverse('api:bot:infraction-list')
+
+        for cursor in ('nope', '1_2_3', f'{10**30}_1'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {'after': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    response.json(), {'after': ["This query parameter must be a `next_cursor`."]}
+                )
+
+    def test_streams_all_infractions_as_ndjson(self):
+        url = reverse('api:bot:infraction-list')
+        response = self.client.get(url, {'stream': 'true', 'user__id': self.user.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        listed = self.client.get(url, {'user__id': self.user.id, 'limit': 100}).json()
+        self.assertCountEqual([json.loads(line) for line in lines], listed)
+
+    def test_streams_expanded_infractions_in_constant_queries(self):
+        url = reverse('api:bot:infraction-list-expanded')
+
+        # The infractions, their actors, their users, and the alt relationships of the users.
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'stream': 'true'})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(len(lines), len(self.infractions))
+        self.assertEqual(json.loads(lines[0])['user'], {
+            **UserSerializer(self.newest_first[0].user).data, 'alts': []
+        })
+
+
+class SummaryTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=6, name='james', discriminator=1)
+        cls.other_user = User.objects.create(id=7, name='jimmy', discriminator=2)
+        cls.clean_user = User.objects.create(id=8, name='jenny', discriminator=3)
+
+        def create(user: User, type: str, day: int, **kwargs) -> Infraction:
+            return Infraction.objects.create(
+                user=user, actor=cls.other_user, type=type,
+                inserted_at=dt(2020, 1, day, tzinfo=UTC), **kwargs
+            )
+
+        cls.old_note = create(cls.user, 'note', 1, active=False)
+        cls.new_note = create(cls.user, 'note', 4, active=False)
+        cls.ban = create(cls.user, 'ban', 3, active=True, expires_at=dt(2030, 2, 1, tzinfo=UTC))
+        cls.timeout = create(
+            cls.user, 'timeout', 2, active=True, expires_at=dt(2030, 1, 1, 0, 0, 0, 123456, tzinfo=UTC)
+        )
+        cls.other_ban = create(cls.other_user, 'ban', 5, active=True)
+
+    def get_summary(self, **params) -> dict:
+        response = self.client.get(reverse('api:bot:infraction-summary'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_summarises_infractions_of_user(self):
+        with self.assertNumQueries(1):
+            summary = self.get_summary(user__id=self.user.id)
+
+        self.assertEqual(summary, {
+            '6': {
+                'total': 4,
+                'active': 2,
+                'types': {
+                    'note': {'total': 2, 'active': 0},
+                    'ban': {'total': 1, 'active': 1},
+                    'timeout': {'total': 1, 'active': 1},
+                },
+                'latest': {'id': self.new_note.id, 'type': 'note', 'inserted_at': '2020-01-04T00:00:00Z'},
+                'next_expiry': {
+                    'id': self.timeout.id, 'type': 'timeout', 'expires_at': '2030-01-01T00:00:00.123456Z'
+                },
+            }
+        })
+
+    def test_summarises_infractions_of_many_users(self):
+        summary = self.get_summary(users=f'{self.other_user.id},{self.clean_user.id}')
+
+        self.assertEqual(summary, {
+            '7': {
+                'total': 1,
+                'active': 1,
+                'types': {'ban': {'total': 1, 'active': 1}},
+                'latest': {'id': self.other_ban.id, 'type': 'ban', 'inserted_at': '2020-01-05T00:00:00Z'},
+                'next_expiry': None,
+            },
+            '8': {'total': 0, 'active': 0, 'types': {}, 'latest': None, 'next_expiry': None},
+        })
+
+    def test_returns_400_for_invalid_users(self):
+        cases = (
+            ({}, 'users'),
+            ({'user__id': 6, 'users': '7'}, 'users'),
+            ({'user__id': 'james'}, 'user__id'),
+            ({'users': '6,,7'}, 'users'),
+            ({'users': ','.join(['6'] * 1001)}, 'users'),
+        )
+
+        for params, field in cases:
+            with self.subTest(params=str(params)[:30]):
+                response = self.client.get(reverse('api:bot:infraction-summary'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [field])
+
+
+class ActiveLookupTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            User(id=user_id, name=f"user {user_id}", discriminator=1) for user_id in range(10, 15)
+        )
+        cls.ban = Infraction.objects.create(
+            user=cls.users[0], actor=cls.users[4], type='ban', active=True
+        )
+        cls.voice_ban = Infraction.objects.create(
+            user=cls.users[0], actor=cls.users[4], type='voice_ban', active=True,
+            expires_at=dt(2030, 1, 1, tzinfo=UTC),
+        )
+        cls.timeout = Infraction.objects.create(
+            user=cls.users[1], actor=cls.users[4], type='timeout', active=True,
+            expires_at=dt(2030, 1, 2, tzinfo=UTC),
+        )
+        Infraction.objects.create(user=cls.users[2], actor=cls.users[4], type='ban', active=False)
+        Infraction.objects.create(user=cls.users[4], actor=cls.users[4], type='ban', active=True)
+        cls.url = reverse('api:bot:infraction-active')
+
+    def test_returns_active_infractions_of_users(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, [10, 11, 12, 13, 99])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            '10': [
+                {'id': self.ban.id, 'type': 'ban', 'expires_at': None},
+                {'id': self.voice_ban.id, 'type': 'voice_ban', 'expires_at': '2030-01-01T00:00:00Z'},
+            ],
+            '11': [{'id': self.timeout.id, 'type': 'timeout', 'expires_at': '2030-01-02T00:00:00Z'}],
+        })
+
+    def test_returns_active_infractions_of_types(self):
+        response = self.client.post(f'{self.url}?types=voice_ban,timeout', [10, 11, 12])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {user_id: [infraction['id'] for infraction in infractions]
+             for user_id, infractions in response.json().items()},
+            {'10': [self.voice_ban.id], '11': [self.timeout.id]}
+        )
+
+    def test_returns_400_for_invalid_request(self):
+        cases = (
+            ('', []),
+            ('', {'users': [10]}),
+            ('', list(range(1001))),
+            ('?types=ban,mute', [10]),
+        )
+
+        for query, body in cases:
+            with self.subTest(query=query, body=str(body)[:20]):
+                response = self.client.post(f'{self.url}{query}', body)
+                self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(f'{self.url}?types=ban,mute', [10])
+        self.assertEqual(response.json(), {'types': ['unknown infraction type "mute"']})
+
+
 class CreationTests(AuthenticatedAPITestCase):
     @classmethod
     def setUpTestData(cls):
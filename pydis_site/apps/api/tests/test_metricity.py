@@ -0,0 +1,86 @@
+import datetime
+
+from django.urls import reverse
+
+from .base import MetricityTestCase
+from pydis_site.apps.api.models import Infraction, User
+from pydis_site.apps.api.models.bot.metricity import Metricity
+
+
+class UserActivityTests(MetricityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_user("1")
+        self.add_user("2")
+        self.add_messages(
+            ("1", "1", self.now, "11", False),
+            ("2", "1", self.now, "12", False),
+            ("3", "1", self.now - datetime.timedelta(minutes=20), "11", False),
+            ("4", "1", self.now, "21", False),
+            ("5", "1", self.now, "21", False),
+            # Excluded from the totals, but not from the channel activity.
+            ("6", "1", self.now, "267659945086812160", False),
+            ("7", "1", self.now, "31", True),
+        )
+
+    def test_counts_messages_and_channels_of_users(self):
+        with Metricity() as metricity:
+            activity = metricity.user_activity(["1", "2", "3"])
+
+        self.assertEqual(activity, {
+            "1": {
+                "joined_at": self.now.replace(tzinfo=None),
+                "total_messages": 5,
+                "activity_blocks": 2,
+                "top_channel_activity": [
+                    ["the help channels", 3],
+                    ["off-topic", 2],
+                    ["bot-commands", 1],
+                ],
+            },
+            "2": {
+                "joined_at": self.now.replace(tzinfo=None),
+                "total_messages": 0,
+                "activity_blocks": 0,
+                "top_channel_activity": [],
+            },
+        })
+
+    def test_metricity_bulk_data(self):
+        User.objects.create(id=1, name="Test user", discriminator=1)
+        Infraction.objects.create(user_id=1, actor_id=1, type="voice_ban", active=True)
+
+        url = reverse("api:bot:user-metricity-bulk-data")
+        response = self.client.post(url, data=[1, 2, 3])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json().keys(), {"1", "2"})
+        self.assertEqual(response.json()["1"]["total_messages"], 5)
+        self.assertTrue(response.json()["1"]["voice_gate_blocked"])
+        self.assertFalse(response.json()["2"]["voice_gate_blocked"])
+
+
+class MessageHistogramTests(MetricityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_user("1")
+        self.add_messages(
+            ("1", "1", self.now - datetime.timedelta(hours=1), "11", False),
+            ("2", "1", self.now - datetime.timedelta(days=1, hours=1), "11", False),
+            ("3", "1", self.now - datetime.timedelta(days=9), "21", False),
+            ("4", "1", self.now - datetime.timedelta(days=2), "11", True),
+            ("5", "1", self.now + datetime.timedelta(minutes=10), "11", False),
+        )
+
+    def test_counts_messages_per_bucket(self):
+        with Metricity() as metricity:
+            histograms = metricity.message_histogram(["1", "2"], 10, 2)
+
+        self.assertEqual(histograms, {"1": [3, 0, 0, 0, 1], "2": [0, 0, 0, 0, 0]})
+
+    def test_metricity_activity_data(self):
+        url = reverse("api:bot:user-metricity-activity-data")
+        response = self.client.post(url, data=[1, 2], QUERY_STRING="days=1,10")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"1": {"1": 2, "10": 4}, "2": {"1": 0, "10": 0}})
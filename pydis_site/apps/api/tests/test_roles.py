@@ -209,3 +209,51 @@ class CreationTests(AuthenticatedAPITestCase):
             response = getattr(self.client, method)(url)
             self.assertEqual(response.status_code, 404)
             self.assertJSONEqual(response.content, '{"detail": "Not found."}')
+
+
+class RoleMembersTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = Role.objects.create(id=1, name="Helpers", colour=1, permissions=1, position=1)
+        cls.other_role = Role.objects.create(
+            id=2, name="Admins", colour=2, permissions=2, position=2
+        )
+        User.objects.bulk_create([
+            User(id=10, name="helper", discriminator=1, roles=[cls.role.id]),
+            User(id=20, name="admin", discriminator=2, roles=[cls.other_role.id]),
+            User(id=30, name="both", discriminator=3, roles=[cls.other_role.id, cls.role.id]),
+            User(id=40, name="nobody", discriminator=4, roles=[]),
+        ])
+
+    def test_returns_members_of_role(self):
+        url = reverse('api:bot:role-members', args=(self.role.id,))
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual([user['id'] for user in response.json()['results']], [10, 30])
+
+    def test_returns_members_of_role_by_cursor(self):
+        url = reverse('api:bot:role-members', args=(self.role.id,))
+        response = self.client.get(url, {'after': 0, 'page_size': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['next_cursor'], 10)
+        self.assertEqual([user['id'] for user in response.json()['results']], [10])
+
+        response = self.client.get(url, {'after': 10, 'page_size': 1})
+        self.assertIsNone(response.json()['next_cursor'])
+        self.assertEqual([user['id'] for user in response.json()['results']], [30])
+
+    def test_returns_404_for_unknown_role(self):
+        response = self.client.get(reverse('api:bot:role-members', args=(3,)))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_role_deletion_unassigns_only_that_role(self):
+        self.role.delete()
+
+        self.assertEqual(
+            dict(User.objects.values_list('id', 'roles')),
+            {10: [], 20: [self.other_role.id], 30: [self.other_role.id], 40: []}
+        )
@@ -1,12 +1,16 @@
+import json
 import random
 from unittest.mock import Mock, patch
 
+from django.contrib.auth.models import User as DjangoUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from .base import AuthenticatedAPITestCase
 from pydis_site.apps.api.models import Infraction, Role, User, UserAltRelationship
-from pydis_site.apps.api.models.bot.metricity import NotFoundError
-from pydis_site.apps.api.viewsets.bot.user import UserListPagination
+from pydis_site.apps.api.serializers import UserSerializer
+from pydis_site.apps.api.viewsets.bot.user import USER_BULK_MAX_IDS, USER_SYNC_CHUNK_SIZE, UserListPagination
 
 
 class UnauthedUserAPITests(AuthenticatedAPITestCase):
@@ -121,6 +125,31 @@ class CreationTests(AuthenticatedAPITestCase):
         response = self.client.post(url, data=data)
         self.assertEqual(response.status_code, 400)
 
+    def test_returns_400_for_unknown_role_id_in_multi_creation(self):
+        url = reverse('api:bot:user-list')
+        data = [
+            {
+                'id': 5,
+                'name': "test man",
+                'discriminator': 42,
+                'roles': [self.role.id]
+            },
+            {
+                'id': 6,
+                'name': "test woman",
+                'discriminator': 43,
+                'roles': [self.role.id, 190810291]
+            }
+        ]
+
+        response = self.client.post(url, data=data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [
+            {},
+            {'roles': {'1': ["Role with ID 190810291 does not exist"]}}
+        ])
+        self.assertFalse(User.objects.filter(id__in=(5, 6)).exists())
+
     def test_returns_400_for_bad_data(self):
         url = reverse('api:bot:user-list')
         data = {
@@ -176,6 +205,226 @@ class CreationTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, 400)
 
 
+class BulkRoleValidationQueryTests(AuthenticatedAPITestCase):
+    """Role validation on bulk user creation must not scale with the payload size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.roles = Role.objects.bulk_create(
+            Role(id=i, name=f"Role {i}", colour=0, permissions=0, position=i)
+            for i in range(1, 11)
+        )
+
+    def make_users(self, count: int, id_offset: int) -> list[dict]:
+        return [
+            {
+                'id': id_offset + i,
+                'name': f"user{i}",
+                'discriminator': 1,
+                'roles': [role.id for role in self.roles],
+                'in_guild': True
+            }
+            for i in range(count)
+        ]
+
+    def test_query_count_is_constant_in_payload_size(self):
+        url = reverse('api:bot:user-list')
+        query_counts = {}
+
+        for id_offset, count in enumerate((10, 100, 1000), start=1):
+            Role.clear_cache()
+            with self.subTest(count=count), CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, data=self.make_users(count, id_offset * 10_000))
+                self.assertEqual(response.status_code, 201)
+            query_counts[count] = len(queries)
+
+        self.assertEqual(len(set(query_counts.values())), 1, query_counts)
+        self.assertEqual(User.objects.count(), 1110)
+
+    def test_roles_are_looked_up_once_per_request(self):
+        url = reverse('api:bot:user-list')
+        Role.cached()
+        new_role = Role(id=11, name="Role 11", colour=0, permissions=0, position=11)
+        Role.objects.bulk_create([new_role])
+        users = self.make_users(100, 10_000)
+        users[-1]['roles'].append(new_role.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data=users)
+
+        self.assertEqual(response.status_code, 201)
+        role_queries = [query for query in queries if '"api_role"' in query['sql']]
+        self.assertEqual(len(role_queries), 1, role_queries)
+
+
+class SyncTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = Role.objects.create(
+            id=5,
+            name="Sync role",
+            colour=2,
+            permissions=0,
+            position=1
+        )
+        cls.unchanged = User.objects.create(
+            id=1,
+            name="unchanged",
+            display_name="Unchanged",
+            discriminator=1,
+            roles=[cls.role.id],
+            in_guild=True
+        )
+        cls.changed = User.objects.create(
+            id=2,
+            name="changed",
+            discriminator=2,
+            in_guild=True
+        )
+
+    def post_ndjson(self, users: list[dict]):
+        url = reverse('api:bot:user-sync')
+        body = "\n".join(json.dumps(user) for user in users)
+        return self.client.post(url, data=body, content_type='application/x-ndjson')
+
+    def test_reports_inserted_updated_and_unchanged_users(self):
+        users = [
+            {
+                'id': 1,
+                'name': "unchanged",
+                'display_name': "Unchanged",
+                'discriminator': 1,
+                'roles': [self.role.id],
+                'in_guild': True
+            },
+            {'id': 2, 'name': "changed", 'discriminator': 2, 'in_guild': False},
+            {'id': 3, 'name': "new", 'discriminator': 3, 'roles': [self.role.id]},
+        ]
+
+        response = self.post_ndjson(users)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'inserted': 1, 'updated': 1, 'unchanged': 1})
+        self.assertFalse(User.objects.get(id=2).in_guild)
+        new_user = User.objects.get(id=3)
+        self.assertEqual(new_user.roles, [self.role.id])
+        self.assertEqual(new_user.display_name, "")
+        self.assertTrue(new_user.in_guild)
+
+    def test_syncs_users_across_multiple_chunks(self):
+        users = [
+            {'id': i, 'name': f"user{i}", 'discriminator': 1}
+            for i in range(10, 10 + USER_SYNC_CHUNK_SIZE * 2 + 1)
+        ]
+
+        response = self.post_ndjson(users)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['inserted'], len(users))
+        self.assertEqual(User.objects.count(), len(users) + 2)
+
+    def test_empty_body_changes_nothing(self):
+        url = reverse('api:bot:user-sync')
+        response = self.client.post(
+            url, data='', content_type='application/x-ndjson', CONTENT_LENGTH='0'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'inserted': 0, 'updated': 0, 'unchanged': 0})
+
+    def test_returns_400_with_line_number_for_invalid_user(self):
+        users = [
+            {'id': 3, 'name': "new", 'discriminator': 3},
+            {'id': 4, 'name': "bad role", 'discriminator': 3, 'roles': [1234]},
+        ]
+
+        response = self.post_ndjson(users)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {'line 2': {'roles': {'0': ["Role with ID 1234 does not exist"]}}}
+        )
+        self.assertFalse(User.objects.filter(id=3).exists())
+
+    def test_returns_400_for_invalid_json(self):
+        url = reverse('api:bot:user-sync')
+        body = '{"id": 3, "name": "new", "discriminator": 3}\n[1, 2]\n'
+        response = self.client.post(url, data=body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'line 2': ["Expected a JSON object."]})
+        self.assertFalse(User.objects.filter(id=3).exists())
+
+    def test_returns_400_for_duplicate_users(self):
+        users = [
+            {'id': 3, 'name': "new", 'discriminator': 3},
+            {'id': 3, 'name': "new again", 'discriminator': 3},
+        ]
+
+        response = self.post_ndjson(users)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'id': ["User with ID 3 given multiple times."]})
+
+    def test_accepts_users_given_again_in_later_chunks(self):
+        users = [
+            {'id': i, 'name': f"user{i}", 'discriminator': 1}
+            for i in range(10, 10 + USER_SYNC_CHUNK_SIZE)
+        ]
+        users.append({'id': 10, 'name': "user10 again", 'discriminator': 1})
+
+        response = self.post_ndjson(users)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {'inserted': USER_SYNC_CHUNK_SIZE, 'updated': 1, 'unchanged': 0}
+        )
+        self.assertEqual(User.objects.get(id=10).name, "user10 again")
+
+    def test_keeps_earlier_chunks_written_for_invalid_later_chunk(self):
+        users = [
+            {'id': i, 'name': f"user{i}", 'discriminator': 1}
+            for i in range(10, 10 + USER_SYNC_CHUNK_SIZE)
+        ]
+        users.append({'id': 3, 'name': "bad role", 'discriminator': 3, 'roles': [1234]})
+
+        response = self.post_ndjson(users)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {f'line {USER_SYNC_CHUNK_SIZE + 1}': {'roles': {'0': ["Role with ID 1234 does not exist"]}}}
+        )
+        self.assertEqual(User.objects.filter(id__gte=10).count(), USER_SYNC_CHUNK_SIZE)
+        self.assertFalse(User.objects.filter(id=3).exists())
+
+    def test_syncs_chunked_body_without_length(self):
+        url = reverse('api:bot:user-sync')
+        body = json.dumps({'id': 3, 'name': "new", 'discriminator': 3})
+        response = self.client.post(
+            url,
+            data=body,
+            content_type='application/x-ndjson',
+            CONTENT_LENGTH='',
+            HTTP_TRANSFER_ENCODING='chunked'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'inserted': 1, 'updated': 0, 'unchanged': 0})
+        self.assertTrue(User.objects.filter(id=3).exists())
+
+    def test_returns_411_for_body_without_length(self):
+        url = reverse('api:bot:user-sync')
+        body = json.dumps({'id': 3, 'name': "new", 'discriminator': 3})
+        response = self.client.post(
+            url, data=body, content_type='application/x-ndjson', CONTENT_LENGTH=''
+        )
+
+        self.assertEqual(response.status_code, 411)
+        self.assertFalse(User.objects.filter(id=3).exists())
+
+
 class MultiPatchTests(AuthenticatedAPITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -302,6 +551,46 @@ class MultiPatchTests(AuthenticatedAPITestCase):
         response = self.client.patch(url, data=data)
         self.assertEqual(response.status_code, 400)
 
+    def test_only_changed_users_and_fields_are_written(self):
+        url = reverse("api:bot:user-bulk-patch")
+        data = [
+            {"id": 1, "name": "Patch test user 1.", "in_guild": True},
+            {"id": 2, "name": "User 2 patched!", "in_guild": True},
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, data=data)
+
+        self.assertEqual(response.status_code, 200)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"name"', updates[0])
+        self.assertNotIn('"in_guild"', updates[0])
+        self.assertEqual(User.objects.get(id=2).name, "User 2 patched!")
+
+    def test_unchanged_users_are_not_written(self):
+        url = reverse("api:bot:user-bulk-patch")
+        data = [{"id": 1, "name": "Patch test user 1."}, {"id": 2, "discriminator": 2222}]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+    def test_returns_counts_of_changed_and_skipped_users(self):
+        url = reverse("api:bot:user-bulk-patch")
+        data = [
+            {"id": 1, "name": "Patch test user 1.", "roles": [self.role_developer.id]},
+            {"id": 2, "name": "Patch test user 2."},
+        ]
+
+        response = self.client.patch(f"{url}?counts=true", data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'changed': 1, 'skipped': 1})
+        self.assertEqual(User.objects.get(id=1).roles, [self.role_developer.id])
+
 
 class UserModelTests(AuthenticatedAPITestCase):
     @classmethod
@@ -358,6 +647,49 @@ class UserModelTests(AuthenticatedAPITestCase):
         """Tests the username property with both name and discriminator formatted together."""
         self.assertEqual(self.user_with_roles.username, "Test User with two roles#0001")
 
+    def test_top_roles_are_resolved_from_cached_roles(self):
+        """Tests that top roles of many users are resolved without queries once cached."""
+        Role.cached()
+        users = [self.user_with_roles, self.user_without_roles] * 50
+
+        with self.assertNumQueries(0):
+            top_roles = User.resolve_top_roles(users)
+
+        self.assertEqual(top_roles, {1: self.role_top, 2: self.developers_role})
+
+    def test_cached_roles_are_reloaded_after_role_writes(self):
+        """Tests that saving or deleting a role clears the cached roles."""
+        Role.cached()
+        self.role_bottom.position = 20
+        self.role_bottom.save()
+
+        self.assertEqual(self.user_with_roles.top_role.id, self.role_bottom.id)
+
+        self.role_bottom.delete()
+        self.assertNotIn(888, Role.cached())
+
+    def test_cached_roles_are_reloaded_for_unknown_roles(self):
+        """Tests that the roles are reloaded for users with a role missing from the cache."""
+        Role.cached()
+        new_role = Role(id=999, name="New role", colour=2, permissions=0, position=30)
+        Role.objects.bulk_create([new_role])
+        user = User(id=3, name="New role user", discriminator=3, roles=[new_role.id])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.top_role.id, new_role.id)
+
+    def test_missing_roles_are_not_reloaded_until_cache_is_cleared(self):
+        """Tests that the roles are only reloaded once for users with roles that do not exist."""
+        user = User(id=3, name="Missing role user", discriminator=3, roles=[404])
+
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                self.assertEqual(user.top_role.id, self.developers_role.id)
+
+        new_role = Role.objects.create(id=404, name="Found role", colour=2, permissions=0, position=30)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.top_role.id, new_role.id)
+
 
 class UserPaginatorTests(AuthenticatedAPITestCase):
     @classmethod
@@ -403,6 +735,53 @@ class UserPaginatorTests(AuthenticatedAPITestCase):
         self.assertEqual(1, response["previous_page_no"])
 
 
+class UserCursorPaginatorTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            User(id=i, name=f"user{i}", discriminator=1111, in_guild=True)
+            for i in range(1, 6)
+        )
+
+    def test_walks_all_users_by_cursor(self):
+        url = reverse("api:bot:user-list")
+        seen = []
+        cursor = 0
+        while cursor is not None:
+            response = self.client.get(url, {"after": cursor, "page_size": 2}).json()
+            self.assertIsNone(response["count"])
+            seen.extend(user["id"] for user in response["results"])
+            cursor = response["next_cursor"]
+
+        self.assertEqual(seen, [1, 2, 3, 4, 5])
+
+    def test_does_not_count_table(self):
+        url = reverse("api:bot:user-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"after": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user["id"] for user in response.json()["results"]], [3, 4, 5])
+        self.assertIsNone(response.json()["next_cursor"])
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+
+    def test_returns_approximate_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE api_user")
+
+        url = reverse("api:bot:user-list")
+        response = self.client.get(url, {"after": 0, "approximate_count": "true"})
+
+        self.assertEqual(response.json()["count"], 5)
+
+    def test_returns_400_for_invalid_cursor(self):
+        url = reverse("api:bot:user-list")
+        response = self.client.get(url, {"after": "soon"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"after": ["This query parameter must be an integer."]})
+
+
 class UserMetricityTests(AuthenticatedAPITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -506,6 +885,79 @@ class UserMetricityTests(AuthenticatedAPITestCase):
             "total_messages": total_messages
         })
 
+    def test_metricity_review_data_without_messages(self):
+        # Given
+        self.mock_metricity_user("foo", 0, 0, [])
+
+        # When
+        url = reverse('api:bot:user-metricity-review-data', args=[0])
+        response = self.client.get(url)
+
+        # Then
+        self.assertEqual(response.status_code, 404)
+
+    def test_metricity_data_uses_single_metricity_query(self):
+        # Given
+        self.mock_metricity_user("foo", 1, 1, [["bar", 1]])
+
+        # When
+        for route in ('api:bot:user-metricity-data', 'api:bot:user-metricity-review-data'):
+            self.client.get(reverse(route, args=[0]))
+
+        # Then
+        self.assertEqual(self.metricity.method_calls, [
+            ('user_activity', (["0"],), {'top_channels': False}),
+            ('user_activity', (["0"],), {}),
+        ])
+
+    def test_metricity_bulk_data(self):
+        # Given
+        Infraction.objects.create(user_id=0, actor_id=0, type="voice_ban", active=True)
+        self.mock_metricity_user("foo", 2, 1, [["bar", 2]])
+
+        # When
+        url = reverse('api:bot:user-metricity-bulk-data')
+        response = self.client.post(url, data=[0, 1])
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.metricity.user_activity.assert_called_once_with(["0", "1"])
+        expected = {
+            "joined_at": "foo",
+            "total_messages": 2,
+            "activity_blocks": 1,
+            "top_channel_activity": [["bar", 2]],
+        }
+        self.assertEqual(response.json(), {
+            "0": expected | {"voice_gate_blocked": True},
+            "1": expected | {"voice_gate_blocked": False},
+        })
+
+    def test_metricity_bulk_data_invalid_users(self):
+        # Given
+        self.mock_no_metricity_user()
+
+        # When
+        url = reverse('api:bot:user-metricity-bulk-data')
+        response = self.client.post(url, data=[123, 'username'])
+
+        # Then
+        self.assertEqual(response.status_code, 400)
+        self.metricity.user_activity.assert_not_called()
+        self.assertEqual(response.json(), {'1': ['A valid integer is required.']})
+
+    def test_metricity_bulk_data_too_many_users(self):
+        # Given
+        self.mock_no_metricity_user()
+
+        # When
+        url = reverse('api:bot:user-metricity-bulk-data')
+        response = self.client.post(url, data=list(range(USER_BULK_MAX_IDS + 1)))
+
+        # Then
+        self.assertEqual(response.status_code, 400)
+        self.metricity.user_activity.assert_not_called()
+
     def test_metricity_activity_data(self):
         # Given
         self.mock_no_metricity_user()  # Other functions shouldn't be used.
@@ -524,6 +976,64 @@ class UserMetricityTests(AuthenticatedAPITestCase):
         self.metricity.total_messages_in_past_n_days.assert_called_once_with(["0", "1"], 10)
         self.assertEqual(response.json(), {"0": 10, "1": 0})
 
+    def test_metricity_activity_data_multiple_windows(self):
+        # Given
+        self.mock_no_metricity_user()
+        self.metricity.message_histogram.return_value = {
+            "0": [1, 2, 3, 4, 5, 6, 7, 8],
+            "1": [0] * 8,
+        }
+
+        # When
+        url = reverse("api:bot:user-metricity-activity-data")
+        response = self.client.post(
+            url,
+            data=[0, 1],
+            QUERY_STRING="days=1,3&days=8",
+        )
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.metricity.message_histogram.assert_called_once_with(["0", "1"], 8, 1)
+        self.metricity.total_messages_in_past_n_days.assert_not_called()
+        self.assertEqual(response.json(), {
+            "0": {"1": 1, "3": 6, "8": 36},
+            "1": {"1": 0, "3": 0, "8": 0},
+        })
+
+    def test_metricity_activity_data_histogram(self):
+        # Given
+        self.mock_no_metricity_user()
+        self.metricity.message_histogram.return_value = {"0": [3, 0, 1, 2], "1": [0, 0, 0, 0]}
+
+        # When
+        url = reverse("api:bot:user-metricity-activity-data")
+        response = self.client.post(
+            url,
+            data=[0, 1],
+            QUERY_STRING="days=28&bucket_days=7",
+        )
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.metricity.message_histogram.assert_called_once_with(["0", "1"], 28, 7)
+        self.assertEqual(response.json(), {"0": [3, 0, 1, 2], "1": [0, 0, 0, 0]})
+
+    def test_metricity_activity_data_invalid_bucket_days(self):
+        # Given
+        self.mock_no_metricity_user()
+
+        for query_string in ("days=28&bucket_days=0", "days=7,28&bucket_days=7", "days=28&bucket_days=a"):
+            with self.subTest(query_string=query_string):
+                # When
+                url = reverse("api:bot:user-metricity-activity-data")
+                response = self.client.post(url, data=[0, 1], QUERY_STRING=query_string)
+
+                # Then
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("bucket_days", response.json())
+                self.metricity.message_histogram.assert_not_called()
+
     def test_metricity_activity_data_invalid_days(self):
         # Given
         self.mock_no_metricity_user()  # Other functions shouldn't be used.
@@ -541,6 +1051,53 @@ class UserMetricityTests(AuthenticatedAPITestCase):
         self.metricity.total_messages_in_past_n_days.assert_not_called()
         self.assertEqual(response.json(), {"days": ["This query parameter must be an integer."]})
 
+    def test_metricity_activity_data_too_long_periods(self):
+        # Given
+        self.mock_no_metricity_user()  # Other functions shouldn't be used.
+
+        for query_string, key in (
+            ("days=3651&bucket_days=100", "days"),
+            ("days=7,367", "days"),
+            ("days=367&bucket_days=1", "bucket_days"),
+        ):
+            with self.subTest(query_string=query_string):
+                # When
+                url = reverse("api:bot:user-metricity-activity-data")
+                response = self.client.post(url, data=[0, 1], QUERY_STRING=query_string)
+
+                # Then
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json().keys(), {key})
+                self.metricity.total_messages_in_past_n_days.assert_not_called()
+                self.metricity.message_histogram.assert_not_called()
+
+    def test_metricity_activity_data_long_single_period(self):
+        # Given
+        self.mock_no_metricity_user()
+        self.metricity.total_messages_in_past_n_days.return_value = [("0", 5)]
+
+        # When
+        url = reverse("api:bot:user-metricity-activity-data")
+        response = self.client.post(url, data=[0], QUERY_STRING="days=10000")
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"0": 5})
+        self.metricity.total_messages_in_past_n_days.assert_called_once_with(["0"], 10000)
+
+    def test_metricity_activity_data_longest_histogram(self):
+        # Given
+        self.mock_no_metricity_user()
+        self.metricity.message_histogram.return_value = {"0": [0] * 366}
+
+        # When
+        url = reverse("api:bot:user-metricity-activity-data")
+        response = self.client.post(url, data=[0], QUERY_STRING="days=3650&bucket_days=10")
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.metricity.message_histogram.assert_called_once_with(["0"], 3650, 10)
+
     def test_metricity_activity_data_no_days(self):
         # Given
         self.mock_no_metricity_user()  # Other functions shouldn't be used.
@@ -590,25 +1147,59 @@ class UserMetricityTests(AuthenticatedAPITestCase):
         self.metricity.total_messages_in_past_n_days.assert_not_called()
         self.assertEqual(response.json(), {'1': ['A valid integer is required.']})
 
+    def test_metricity_activity_data_too_many_users(self):
+        # Given
+        self.mock_no_metricity_user()  # Other functions shouldn't be used.
+
+        for query_string in ("days=10,30", "days=28&bucket_days=7"):
+            with self.subTest(query_string=query_string):
+                # When
+                url = reverse('api:bot:user-metricity-activity-data')
+                response = self.client.post(
+                    url,
+                    data=list(range(USER_BULK_MAX_IDS + 1)),
+                    QUERY_STRING=query_string,
+                )
+
+                # Then
+                self.assertEqual(response.status_code, 400)
+                self.metricity.message_histogram.assert_not_called()
+
+    def test_metricity_activity_data_many_users_in_single_period(self):
+        # Given
+        self.mock_no_metricity_user()
+        self.metricity.total_messages_in_past_n_days.return_value = []
+        user_ids = list(range(USER_BULK_MAX_IDS + 1))
+
+        # When
+        url = reverse('api:bot:user-metricity-activity-data')
+        response = self.client.post(url, data=user_ids, QUERY_STRING="days=10")
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(user_ids))
+
     def mock_metricity_user(self, joined_at, total_messages, total_blocks, top_channel_activity):
         patcher = patch("pydis_site.apps.api.viewsets.bot.user.Metricity")
         self.metricity = patcher.start()
         self.addCleanup(patcher.stop)
         self.metricity = self.metricity.return_value.__enter__.return_value
-        self.metricity.user.return_value = dict(joined_at=joined_at)
-        self.metricity.total_messages.return_value = total_messages
-        self.metricity.total_message_blocks.return_value = total_blocks
-        self.metricity.top_channel_activity.return_value = top_channel_activity
+        self.metricity.user_activity.side_effect = lambda user_ids, **_kwargs: {
+            user_id: dict(
+                joined_at=joined_at,
+                total_messages=total_messages,
+                activity_blocks=total_blocks,
+                top_channel_activity=top_channel_activity,
+            )
+            for user_id in user_ids
+        }
 
     def mock_no_metricity_user(self):
         patcher = patch("pydis_site.apps.api.viewsets.bot.user.Metricity")
         self.metricity = patcher.start()
         self.addCleanup(patcher.stop)
         self.metricity = self.metricity.return_value.__enter__.return_value
-        self.metricity.user.side_effect = NotFoundError()
-        self.metricity.total_messages.side_effect = NotFoundError()
-        self.metricity.total_message_blocks.side_effect = NotFoundError()
-        self.metricity.top_channel_activity.side_effect = NotFoundError()
+        self.metricity.user_activity.return_value = {}
 
 
 class UserViewSetTests(AuthenticatedAPITestCase):
@@ -1095,3 +1686,235 @@ class UserAltUpdateWithExistingTransitiveAltsTests(AuthenticatedAPITestCase):
                     self.assertEqual(len(set(alt['alts'])), len(subalts))
                     self.assertEqual(set(alt['alts']), subalts)
                     self.assertEqual(alt['source'], source)
+
+
+class UserAltClusterTests(AuthenticatedAPITestCase):
+    """
+    Test the alt cluster of users linked in a chain.
+
+    Users 0 to 5 are each linked to the next one, and user 6 is not linked to anyone.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            User(id=user_id, name=f"Test user {user_id}", discriminator=user_id)
+            for user_id in range(100, 107)
+        )
+        UserAltRelationship.objects.bulk_create(
+            UserAltRelationship(source=source, target=target, context="Chained", actor=cls.users[0])
+            for first, second in zip(cls.users[:5], cls.users[1:6], strict=True)
+            for source, target in ((first, second), (second, first))
+        )
+
+    def get_cluster(self, user: User, **params) -> dict:
+        url = reverse('api:bot:user-alt-cluster', args=(user.id,))
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_returns_connected_users_by_distance(self):
+        body = self.get_cluster(self.users[2])
+
+        self.assertEqual(body['id'], self.users[2].id)
+        self.assertFalse(body['truncated'])
+        self.assertEqual(
+            [(user['id'], user['distance']) for user in body['users']],
+            [(102, 0), (101, 1), (103, 1), (100, 2), (104, 2), (105, 3)]
+        )
+        self.assertEqual(
+            [(link['source'], link['target']) for link in body['links']],
+            [(100, 101), (101, 102), (102, 103), (103, 104), (104, 105)]
+        )
+
+    def test_depth_limits_cluster(self):
+        body = self.get_cluster(self.users[0], depth=2)
+
+        self.assertEqual(body['depth'], 2)
+        self.assertTrue(body['truncated'])
+        self.assertEqual([user['id'] for user in body['users']], [100, 101, 102])
+        self.assertEqual(
+            [(link['source'], link['target']) for link in body['links']],
+            [(100, 101), (101, 102)]
+        )
+
+    def test_depth_equal_to_cluster_size_is_not_truncated(self):
+        body = self.get_cluster(self.users[0], depth=5)
+
+        self.assertFalse(body['truncated'])
+        self.assertEqual(len(body['users']), 6)
+
+    def test_user_without_alts_is_alone(self):
+        body = self.get_cluster(self.users[6])
+
+        self.assertEqual([user['id'] for user in body['users']], [106])
+        self.assertEqual(body['links'], [])
+
+    def test_runs_constant_number_of_queries(self):
+        url = reverse('api:bot:user-alt-cluster', args=(self.users[0].id,))
+
+        # The user, the cluster, the links with their targets, and the alts of the targets.
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'depth': 10})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_returns_400_for_invalid_depth(self):
+        url = reverse('api:bot:user-alt-cluster', args=(self.users[0].id,))
+        for depth in ('0', '11', 'deep'):
+            with self.subTest(depth=depth):
+                response = self.client.get(url, {'depth': depth})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'depth': ["Must be an integer between 1 and 10."]})
+
+    def test_returns_404_for_unknown_user(self):
+        url = reverse('api:bot:user-alt-cluster', args=(1,))
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_retrieve_runs_constant_number_of_queries(self):
+        url = reverse('api:bot:user-detail', args=(self.users[1].id,))
+
+        # The user, their relationships with their targets, and the alts of the targets.
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted((alt['target'], tuple(sorted(alt['alts']))) for alt in response.json()['alts']),
+            [(100, (101,)), (102, (101, 103))]
+        )
+
+
+class UserBatchGetTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create(
+            User(id=user_id, name=f"Test user {user_id}", discriminator=user_id)
+            for user_id in range(200, 210)
+        )
+        UserAltRelationship.objects.bulk_create(
+            UserAltRelationship(source=source, target=target, context="Linked", actor=cls.users[0])
+            for first, second in zip(cls.users[:9], cls.users[1:], strict=True)
+            for source, target in ((first, second), (second, first))
+        )
+        cls.url = reverse('api:bot:user-batch-get')
+
+    def test_returns_users_in_requested_order(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, [205, 1, 201, 205])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [UserSerializer(self.users[5]).data, UserSerializer(self.users[1]).data]
+        )
+
+    def test_returns_alts_in_constant_queries(self):
+        user_ids = [user.id for user in self.users]
+
+        # The users, their relationships with the targets, and the relationships of the targets.
+        with self.assertNumQueries(3):
+            response = self.client.post(f"{self.url}?alts=true", user_ids)
+
+        self.assertEqual(response.status_code, 200)
+        expected = [
+            self.client.get(reverse('api:bot:user-detail', args=(user_id,))).json()
+            for user_id in user_ids
+        ]
+        self.assertEqual(response.json(), expected)
+
+    def test_returns_400_for_invalid_body(self):
+        cases = ([], ["user"], {'ids': [200]}, list(range(USER_BULK_MAX_IDS + 1)))
+
+        for body in cases:
+            with self.subTest(body=str(body)[:20]):
+                response = self.client.post(self.url, body)
+                self.assertEqual(response.status_code, 400)
+
+
+class UserSearchTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(id=1, name="python", display_name="Monty", discriminator=1),
+            User(id=2, name="pythonista", display_name="", discriminator=2),
+            User(id=3, name="ilovepython", display_name="", discriminator=3),
+            User(id=4, name="someone", display_name="Monty Python", discriminator=4),
+            User(id=5, name="lemon", display_name="Lemon", discriminator=5),
+        ])
+
+    def search(self, **params) -> list[int]:
+        response = self.client.get(reverse('api:bot:user-search'), params)
+        self.assertEqual(response.status_code, 200)
+        return [user['id'] for user in response.json()]
+
+    def test_ranks_exact_then_prefix_then_contained_matches(self):
+        self.assertEqual(self.search(q="Python"), [1, 2, 4, 3])
+
+    def test_matches_similar_words(self):
+        self.assertEqual(self.search(q="pythn"), [1, 2, 4])
+
+    def test_matches_display_name(self):
+        self.assertEqual(self.search(q="monty"), [1, 4])
+
+    def test_limits_results(self):
+        self.assertEqual(self.search(q="python", limit=2), [1, 2])
+
+    def test_matches_prefix_of_one_character(self):
+        self.assertEqual(self.search(q="l"), [5])
+
+    def test_ignores_dissimilar_names_containing_the_query(self):
+        self.assertEqual(self.search(q="on"), [])
+
+    def test_uses_the_trigram_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = User.objects.matching("python").explain()
+
+        self.assertIn("api_user_name_trgm", plan)
+        self.assertIn("api_user_display_name_trgm", plan)
+
+    def test_returns_400_for_missing_query(self):
+        response = self.client.get(reverse('api:bot:user-search'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'q': ["This query parameter is required."]})
+
+    def test_returns_400_for_invalid_limit(self):
+        response = self.client.get(reverse('api:bot:user-search'), {'q': "python", 'limit': 101})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'limit': ["Must be an integer between 1 and 100."]})
+
+
+class UserAdminSearchTests(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = Role.objects.create(
+            id=42, name="Helpers", colour=1, permissions=0, position=1
+        )
+        User.objects.bulk_create([
+            User(id=1, name="python", discriminator=1),
+            User(id=1337, name="leet", discriminator=2),
+            User(id=3, name="1337", discriminator=3),
+            User(id=4, name="helper", discriminator=4, roles=[cls.role.id]),
+        ])
+        cls.staff = DjangoUser.objects.create_superuser("staff", "staff@example.com", "staffpass")
+
+    def search(self, term: str) -> list[int]:
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('admin:api_user_changelist'), {'q': term})
+        self.assertEqual(response.status_code, 200)
+        return sorted(user.id for user in response.context['cl'].result_list)
+
+    def test_searches_names(self):
+        self.assertEqual(self.search("pythn"), [1])
+
+    def test_searches_numbers_as_ids_and_names(self):
+        self.assertEqual(self.search("1337"), [3, 1337])
+
+    def test_searches_numbers_as_role_ids(self):
+        self.assertEqual(self.search("42"), [4])
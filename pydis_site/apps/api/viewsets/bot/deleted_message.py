@@ -1,15 +1,55 @@
-from rest_framework.mixins import CreateModelMixin
+import datetime
+
+from django.db.models import QuerySet
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import ValidationError
+from rest_framework.mixins import CreateModelMixin, ListModelMixin
+from rest_framework.serializers import BaseSerializer
 from rest_framework.viewsets import GenericViewSet
 
+from pydis_site.apps.api.models.bot.deleted_message import DeletedMessage
 from pydis_site.apps.api.models.bot.message_deletion_context import MessageDeletionContext
-from pydis_site.apps.api.serializers import MessageDeletionContextSerializer
+from pydis_site.apps.api.pagination import LimitOffsetPaginationExtended
+from pydis_site.apps.api.serializers import DeletedMessageSerializer, MessageDeletionContextSerializer
 
 
-class DeletedMessageViewSet(CreateModelMixin, GenericViewSet):
+class DeletedMessageViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
     """
     View providing support for posting bulk deletion logs generated by the bot.
 
     ## Routes
+    ### GET /bot/deleted-messages
+    Retrieve deleted messages, newest first.
+
+    #### Query parameters
+    - **sent_after** `isodatetime`: only include messages sent at or after this time
+    - **sent_before** `isodatetime`: only include messages sent before this time
+    - **author__id** `int`: snowflake of the user who sent the messages
+    - **channel_id** `int`: snowflake of the channel the messages were sent in
+    - **deletion_context__actor__id** `int`: snowflake of the user who deleted the messages
+    - **limit** `int`: number of results per page, defaults to 100
+    - **offset** `int`: number of results to skip
+
+    The `sent_after` and `sent_before` times are turned into a range of message IDs,
+    such that only the partitions holding messages sent between them are scanned.
+
+    #### Response format
+    >>> [
+    ...     {
+    ...         'id': 1149020211298205726,
+    ...         'author': 172395097705414656,
+    ...         'channel_id': 267659945086812160,
+    ...         'content': "Hello!",
+    ...         'embeds': [],
+    ...         'deletion_context': 4,
+    ...         'attachments': []
+    ...     }
+    ... ]
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if a time is not a datetime, or `sent_after` is after `sent_before`
+
     ### POST /bot/deleted-messages
     Post messages from bulk deletion logs.
 
@@ -38,3 +78,36 @@ class DeletedMessageViewSet(CreateModelMixin, GenericViewSet):
 
     queryset = MessageDeletionContext.objects.all()
     serializer_class = MessageDeletionContextSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_fields = ('author__id', 'channel_id', 'deletion_context__actor__id')
+    pagination_class = LimitOffsetPaginationExtended
+
+    def get_queryset(self) -> QuerySet:
+        """Return the deleted messages sent in the requested time when listing them."""
+        if self.action != 'list':
+            return super().get_queryset()
+
+        sent_after = self._get_time_param('sent_after')
+        sent_before = self._get_time_param('sent_before')
+        if sent_after is not None and sent_before is not None and sent_after > sent_before:
+            raise ValidationError({
+                'sent_after': ['cannot be after sent_before'],
+                'sent_before': ['cannot be before sent_after'],
+            })
+        return DeletedMessage.objects.sent_between(after=sent_after, before=sent_before)
+
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        """Serialize the deleted messages themselves when listing them."""
+        if self.action == 'list':
+            return DeletedMessageSerializer
+        return super().get_serializer_class()
+
+    def _get_time_param(self, name: str) -> datetime.datetime | None:
+        """Return the datetime given in the query parameter `name`, assumed to be in UTC."""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.UTC)
+        except ValueError:
+            raise ValidationError({name: ['failed to convert to datetime']})
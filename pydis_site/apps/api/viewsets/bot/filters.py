@@ -1,8 +1,18 @@
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.status import HTTP_304_NOT_MODIFIED, HTTP_410_GONE
 from rest_framework.viewsets import ModelViewSet
 
 from pydis_site.apps.api.models.bot.filters import (  # - Preserving the filter order
     FilterList,
-    Filter
+    Filter,
+    FilterDeletion,
+    current_filter_version,
 )
 from pydis_site.apps.api.serializers import (  # - Preserving the filter order
     FilterListSerializer,
@@ -10,7 +20,68 @@ from pydis_site.apps.api.serializers import (  # - Preserving the filter order
 )
 
 
-class FilterListViewSet(ModelViewSet):
+class FilterVersionMixin:
+    """
+    Serve conditional and incremental listings based on the current filter version.
+
+    Writes are made atomically, such that filter versions become visible in order.
+    Viewsets using this define `get_changes`, which returns the objects changed after
+    the version given as `since`.
+    """
+
+    def perform_create(self, serializer: BaseSerializer) -> None:
+        """Create the object in a transaction."""
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer: BaseSerializer) -> None:
+        """Update the object in a transaction."""
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance: Filter | FilterList) -> None:
+        """Delete the object in a transaction."""
+        with transaction.atomic():
+            super().perform_destroy(instance)
+
+    @staticmethod
+    def get_deleted_ids(kind: FilterDeletion.Kind, since: int) -> list[int]:
+        """Return the IDs of the objects of the given kind which were deleted after the given version."""
+        return list(
+            FilterDeletion.objects
+            .filter(kind=kind, version__gt=since)
+            .order_by('version')
+            .values_list('object_id', flat=True)
+        )
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """List all objects, only the changes after `since`, or nothing if unchanged."""
+        # Read the version first, so that it never claims changes which are not in the response.
+        version = current_filter_version()
+        etag = quote_etag(str(version))
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=HTTP_304_NOT_MODIFIED)
+        elif 'since' in request.query_params:
+            since = request.query_params['since']
+            if not since.isdigit():
+                raise ParseError(detail={'since': ["Must be a non-negative integer."]})
+            if int(since) < FilterDeletion.objects.horizon():
+                # Deletions after the version may have been pruned, so the changes could be incomplete.
+                response = Response(
+                    {'since': ["Changes since this version are no longer kept, list all objects instead."]},
+                    status=HTTP_410_GONE,
+                )
+            else:
+                response = Response({'version': version, **self.get_changes(int(since))})
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        return response
+
+
+class FilterListViewSet(FilterVersionMixin, ModelViewSet):
     """
     View providing GET/DELETE on lists of items allowed or denied by our bot.
 
@@ -18,6 +89,10 @@ class FilterListViewSet(ModelViewSet):
     ### GET /bot/filter/filter_lists
     Returns all FilterList items in the database.
 
+    The response carries the current filter version as its `ETag`. The filter version is
+    bumped by every write to a filter or filter list. If the version given in the
+    `If-None-Match` header is still current, an empty response with status 304 is returned.
+
     #### Response format
     >>> [
     ...     {
@@ -100,8 +175,37 @@ class FilterListViewSet(ModelViewSet):
 
     #### Status codes
     - 200: returned on success
+    - 304: returned if the filter version in `If-None-Match` is current
     - 401: returned if unauthenticated
 
+    ### GET /bot/filter/filter_lists?since=<version:int>
+    Returns the changes made after the given filter version, taken from the `ETag` of an
+    earlier response. Only the filter lists which were changed themselves or which contain
+    changed filters are returned, and their `filters` only contain the changed filters.
+
+    #### Response format
+    >>> {
+    ...     "version": 42,
+    ...     "filter_lists": [
+    ...         {
+    ...             "id": 1,
+    ...             "name": "invite",
+    ...             "list_type": 1,
+    ...             "filters": [...],
+    ...             "settings": {...}
+    ...         }
+    ...     ],
+    ...     "deleted_filter_lists": [3],
+    ...     "deleted_filters": [7, 8]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 304: returned if the filter version in `If-None-Match` is current
+    - 400: if `since` is not a non-negative integer
+    - 410: if `since` is older than the deletions kept for `DELETION_RETENTION_DAYS`, in which
+      case all objects must be listed again
+
     ### GET /bot/filter/filter_lists/<id:int>
     Returns a specific FilterList item from the database.
 
@@ -315,10 +419,26 @@ class FilterListViewSet(ModelViewSet):
     """
 
     serializer_class = FilterListSerializer
-    queryset = FilterList.objects.all()
-
-
-class FilterViewSet(ModelViewSet):
+    queryset = FilterList.objects.prefetch_related('filters')
+
+    def get_changes(self, since: int) -> dict:
+        """Return the changed filter lists, with only their changed filters, and the deletions."""
+        filter_lists = (
+            FilterList.objects
+            .filter(Q(version__gt=since) | Q(filters__version__gt=since))
+            .distinct()
+            .prefetch_related(
+                Prefetch('filters', queryset=Filter.objects.filter(version__gt=since))
+            )
+        )
+        return {
+            'filter_lists': self.get_serializer(filter_lists, many=True).data,
+            'deleted_filter_lists': self.get_deleted_ids(FilterDeletion.Kind.FILTER_LIST, since),
+            'deleted_filters': self.get_deleted_ids(FilterDeletion.Kind.FILTER, since),
+        }
+
+
+class FilterViewSet(FilterVersionMixin, ModelViewSet):
     """
     View providing CRUD operations on items allowed or denied by our bot.
 
@@ -326,6 +446,10 @@ class FilterViewSet(ModelViewSet):
     ### GET /bot/filter/filters
     Returns all Filter items in the database.
 
+    The response carries the current filter version as its `ETag`. The filter version is
+    bumped by every write to a filter or filter list. If the version given in the
+    `If-None-Match` header is still current, an empty response with status 304 is returned.
+
     #### Response format
     >>> [
     ...         {
@@ -367,8 +491,33 @@ class FilterViewSet(ModelViewSet):
 
     #### Status codes
     - 200: returned on success
+    - 304: returned if the filter version in `If-None-Match` is current
     - 401: returned if unauthenticated
 
+    ### GET /bot/filter/filters?since=<version:int>
+    Returns the filters created, updated or deleted after the given filter version,
+    taken from the `ETag` of an earlier response.
+
+    #### Response format
+    >>> {
+    ...     "version": 42,
+    ...     "filters": [
+    ...         {
+    ...             "id": 1,
+    ...             "content": "267624335836053506",
+    ...             ...
+    ...         }
+    ...     ],
+    ...     "deleted_filters": [7, 8]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 304: returned if the filter version in `If-None-Match` is current
+    - 400: if `since` is not a non-negative integer
+    - 410: if `since` is older than the deletions kept for `DELETION_RETENTION_DAYS`, in which
+      case all objects must be listed again
+
     ### GET /bot/filter/filters/<id:int>
     Returns a specific Filter item from the database.
 
@@ -497,3 +646,10 @@ class FilterViewSet(ModelViewSet):
 
     serializer_class = FilterSerializer
     queryset = Filter.objects.all()
+
+    def get_changes(self, since: int) -> dict:
+        """Return the created or updated filters and the deleted ones."""
+        return {
+            'filters': self.get_serializer(self.queryset.filter(version__gt=since), many=True).data,
+            'deleted_filters': self.get_deleted_ids(FilterDeletion.Kind.FILTER, since),
+        }
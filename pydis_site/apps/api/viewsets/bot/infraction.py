@@ -1,11 +1,20 @@
 import datetime
-
-from django.db import IntegrityError
-from django.db.models import QuerySet
+import json
+from collections import OrderedDict
+from collections.abc import Iterator
+from itertools import islice
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, F, Func, Max, Min, Prefetch, Q, QuerySet
+from django.http import StreamingHttpResponse
 from django.http.request import HttpRequest
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import fields
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.fields import DateTimeField
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.mixins import (
     CreateModelMixin,
@@ -13,16 +22,94 @@ from rest_framework.mixins import (
     ListModelMixin,
     RetrieveModelMixin
 )
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.status import HTTP_410_GONE
 from rest_framework.viewsets import GenericViewSet
 
-from pydis_site.apps.api.models.bot.infraction import Infraction
+from pydis_site.apps.api.models.bot.infraction import Infraction, InfractionDeletion, REASON_SEARCH_CONFIG
+from pydis_site.apps.api.models.bot.user import User
 from pydis_site.apps.api.pagination import LimitOffsetPaginationExtended
 from pydis_site.apps.api.serializers import (
     ExpandedInfractionSerializer,
     InfractionSerializer
 )
 
+# Number of infractions loaded and serialized at once when streaming them.
+INFRACTION_STREAM_CHUNK_SIZE = 1000
+
+# Maximum number of users whose infractions can be summarised at once.
+INFRACTION_SUMMARY_MAX_USERS = 1000
+
+# Maximum number of users whose active infractions can be looked up at once.
+ACTIVE_INFRACTIONS_MAX_USERS = 1000
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+
+
+class InfractionPagination(LimitOffsetPaginationExtended):
+    """
+    Custom pagination class for the Infraction Model.
+
+    Passing the `after` query parameter switches to keyset pagination on the insertion
+    time and ID of infractions, which does not scan over the skipped rows of an `OFFSET`.
+    """
+
+    cursor_query_param = "after"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: GenericViewSet | None = None
+    ) -> list | None:
+        """Paginate by limit and offset, or by insertion time and ID if a cursor was given."""
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset = queryset.order_by("-inserted_at", "-id")
+        if self.cursor:
+            inserted_at, infraction_id = self.decode_cursor(self.cursor)
+            # The bound on `inserted_at` alone allows scanning the index from the cursor on.
+            queryset = queryset.filter(
+                Q(inserted_at__lt=inserted_at) | Q(id__lt=infraction_id),
+                inserted_at__lte=inserted_at,
+            )
+
+        limit = self.get_limit(request)
+        # Fetch one additional infraction to find out whether there is a next page.
+        infractions = list(queryset[:limit + 1])
+        self.has_next = len(infractions) > limit
+        self.page_infractions = infractions[:limit]
+        return self.page_infractions
+
+    def decode_cursor(self, cursor: str) -> tuple[datetime.datetime, int]:
+        """Return the insertion time and ID of the infraction the given cursor points at."""
+        try:
+            micros, infraction_id = map(int, cursor.split("_"))
+            return EPOCH + datetime.timedelta(microseconds=micros), infraction_id
+        except (ValueError, OverflowError):
+            raise ParseError(detail={
+                self.cursor_query_param: ["This query parameter must be a `next_cursor`."]
+            })
+
+    def get_next_cursor(self) -> str | None:
+        """Get the cursor pointing at the last infraction of the page, if there is a next page."""
+        if not self.has_next:
+            return None
+        infraction = self.page_infractions[-1]
+        micros = (infraction.inserted_at - EPOCH) // datetime.timedelta(microseconds=1)
+        return f"{micros}_{infraction.id}"
+
+    def get_paginated_response(self, data: list) -> Response:
+        """Add the cursor of the next page to the response when paginating by cursor."""
+        if self.cursor is None:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('next_cursor', self.get_next_cursor()),
+            ('results', data)
+        ]))
+
 
 class InfractionViewSet(
     CreateModelMixin,
@@ -46,6 +133,9 @@ class InfractionViewSet(
     - **limit** `int`: number of results return per page (default 100)
     - **offset** `int`: the initial index from which to return the results (default 0)
     - **search** `str`: regular expression applied to the infraction's reason
+    - **text_search** `str`: words to search for in the infraction's reason, in the syntax of
+      web search engines: `"quoted phrases"`, `or` and `-excluded` words are supported. Results
+      are ordered by relevance, unless `ordering` is given
     - **type** `str`: the type of the infraction
     - **types** `str`: comma separated sequence of types to filter for
     - **user__id** `int`: snowflake of the user to which the infraction was applied
@@ -54,7 +144,16 @@ class InfractionViewSet(
     - **expires_after** `isodatetime`: the earliest expires_at time to return infractions for
     - **expires_before** `isodatetime`: the latest expires_at time to return infractions for
 
+    - **after** `str`: switches to keyset pagination, returning `limit` infractions inserted before
+      the cursor, newest first. Pass an empty value for the first page, and the `next_cursor` of
+      the response for every following page. `offset` and `ordering` are ignored
+    - **stream** `bool`: set to `true` to stream all matching infractions at once as
+      newline-delimited JSON (`application/x-ndjson`), one infraction per line. Pagination is
+      ignored
+
     Invalid query parameters are ignored.
+    `text_search` uses an index, and is much faster than `search` for finding words. Both may
+    be combined, in which case `search` is only applied to the infractions matching `text_search`.
     Only one of `type` and `types` may be provided. If both `expires_before` and `expires_after`
     are provided, `expires_after` must come after `expires_before`.
     If `permanent` is provided and true, `expires_before` and `expires_after` must not be provided.
@@ -77,8 +176,103 @@ class InfractionViewSet(
     ...     }
     ... ]
 
+    #### Response format with `after`
+    >>> {
+    ...     'next_cursor': '1542871446132307_5',
+    ...     'results': [...]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if `after` is not a cursor returned by an earlier response
+
+    ### GET /bot/infractions/expirations
+    Retrieve the active infractions which will expire, due first, for scheduling their expiry.
+
+    #### Query parameters
+    - **until** `isodatetime`: the latest expires_at time to return infractions for
+    - **since** `int`: the `version` of an earlier response. Only infractions written after it
+      are returned, those whose pending expiry was cancelled after it, by deactivating them or
+      clearing their `expires_at`, are listed in `cancelled`, and those deleted after it are
+      listed in `deleted`
+
+    `version` identifies the latest write to or deletion of any infraction included in the
+    response.
+
+    #### Response format
+    >>> {
+    ...     'version': 1302,
+    ...     'expirations': [
+    ...         {
+    ...             'id': 5,
+    ...             'inserted_at': '2018-11-22T07:24:06.132307Z',
+    ...             'expires_at': '2018-11-23T07:24:06.132307Z',
+    ...             'active': True,
+    ...             # ... as in `GET /bot/infractions`
+    ...         }
+    ...     ],
+    ...     # Only returned with `since`.
+    ...     'cancelled': [7, 12],
+    ...     'deleted': [9]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if `until` is not a datetime or `since` is not a non-negative integer
+    - 410: if `since` is older than the deletions kept for `DELETION_RETENTION_DAYS`, in which
+      case all expirations must be fetched again
+
+    ### GET /bot/infractions/summary
+    Summarise the infractions of one or more users, without listing them.
+
+    #### Query parameters
+    - **user__id** `int`: snowflake of the user to summarise the infractions of
+    - **users** `str`: comma separated sequence of up to 1000 user snowflakes, instead of `user__id`
+
+    #### Response format
+    Every requested user is included, even if they have no infractions. `latest` is the most
+    recently inserted infraction, and `next_expiry` the active infraction expiring first.
+    >>> {
+    ...     '172395097705414656': {
+    ...         'total': 3,
+    ...         'active': 1,
+    ...         'types': {
+    ...             'ban': {'total': 1, 'active': 1},
+    ...             'note': {'total': 2, 'active': 0}
+    ...         },
+    ...         'latest': {'id': 12, 'type': 'ban', 'inserted_at': '2018-11-22T07:24:06.132307Z'},
+    ...         'next_expiry': {'id': 12, 'type': 'ban', 'expires_at': '5018-11-20T15:52:00Z'}
+    ...     }
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if neither or both of `user__id` and `users` are given, or they are not user IDs
+
+    ### POST /bot/infractions/active
+    Look up the active infractions of up to 1000 users at once.
+
+    #### Query parameters
+    - **types** `str`: comma separated sequence of types to look up, instead of all types
+
+    #### Request body
+    >>> [
+    ...     172395097705414656,
+    ...     125435062127820800
+    ... ]
+
+    #### Response format
+    Only users with active infractions of the given types are included.
+    >>> {
+    ...     '172395097705414656': [
+    ...         {'id': 12, 'type': 'ban', 'expires_at': None},
+    ...         {'id': 15, 'type': 'voice_ban', 'expires_at': '2018-11-23T07:24:06.132307Z'}
+    ...     ]
+    ... }
+
     #### Status codes
     - 200: returned on success
+    - 400: if the request body was not a list of 1 to 1000 user IDs, or a type is unknown
 
     ### GET /bot/infractions/<id:int>
     Retrieve a single infraction by ID.
@@ -153,17 +347,32 @@ class InfractionViewSet(
 
     serializer_class = InfractionSerializer
     queryset = Infraction.objects.all()
-    pagination_class = LimitOffsetPaginationExtended
+    pagination_class = InfractionPagination
     filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
     filterset_fields = ('user__id', 'actor__id', 'active', 'hidden', 'type')
     search_fields = ('$reason',)
 
+    def perform_create(self, serializer: BaseSerializer) -> None:
+        """Create the infraction atomically, such that its version is taken in its transaction."""
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_update(self, serializer: BaseSerializer) -> None:
+        """Update the infraction atomically, such that its version is taken in its transaction."""
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance: Infraction) -> None:
+        """Delete the infraction atomically, such that its deletion is recorded in its transaction."""
+        with transaction.atomic():
+            instance.delete()
+
     def partial_update(self, request: HttpRequest, *_args, **_kwargs) -> Response:
         """Method that handles the nuts and bolts of updating an Infraction."""
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        self.perform_update(serializer)
 
         return Response(serializer.data)
 
@@ -171,7 +380,7 @@ class InfractionViewSet(
         """
         Called to fetch the initial queryset, used to implement some of the more complex filters.
 
-        This provides the `permanent` and the `expires_gte` and `expires_lte` options.
+        This provides the `permanent`, `expires_gte`, `expires_lte` and `text_search` options.
         """
         filter_permanent = self.request.query_params.get('permanent')
         additional_filters = {}
@@ -231,11 +440,208 @@ class InfractionViewSet(
             additional_filters['type__in'] = [i.strip() for i in filter_types.split(",")]
 
         qs = self.queryset.filter(**additional_filters)
+
+        text_search = self.request.query_params.get('text_search')
+        if text_search:
+            query = SearchQuery(text_search, search_type='websearch', config=REASON_SEARCH_CONFIG)
+            qs = (
+                qs.filter(reason_search=query)
+                .annotate(search_rank=SearchRank(F('reason_search'), query))
+                .order_by('-search_rank', '-inserted_at')
+            )
+
         if self.serializer_class is ExpandedInfractionSerializer:
-            return qs.prefetch_related('actor', 'user')
+            return qs.prefetch_related('actor', Prefetch('user', queryset=User.objects.with_alts()))
 
         return qs
 
+    @action(detail=False, methods=['POST'])
+    def active(self, request: Request) -> Response:
+        """Return the active infractions of the given users, looked up with a single query."""
+        user_ids = fields.ListField(
+            child=fields.IntegerField(min_value=0),
+            allow_empty=False,
+            max_length=ACTIVE_INFRACTIONS_MAX_USERS
+        ).run_validation(request.data)
+
+        # The unique constraint on the active infractions of every user doubles as an index.
+        infractions = Infraction.objects.filter(active=True, user_id__in=user_ids)
+        filter_types = request.query_params.get('types')
+        if filter_types:
+            types = [i.strip() for i in filter_types.split(",")]
+            known_types = {choice for choice, _name in Infraction.TYPE_CHOICES}
+            if unknown_types := [
+                infraction_type for infraction_type in types if infraction_type not in known_types
+            ]:
+                raise ValidationError({'types': [f'unknown infraction type "{unknown_types[0]}"']})
+            infractions = infractions.filter(type__in=types)
+
+        datetime_field = DateTimeField()
+        active = {}
+        for user_id, infraction_id, infraction_type, expires_at in (
+            infractions.order_by('user_id', 'type').values_list('user_id', 'id', 'type', 'expires_at')
+        ):
+            active.setdefault(str(user_id), []).append({
+                'id': infraction_id,
+                'type': infraction_type,
+                'expires_at': datetime_field.to_representation(expires_at) if expires_at else None,
+            })
+        return Response(active)
+
+    @staticmethod
+    def _get_summary_user_ids(request: Request) -> list[int]:
+        """Return the IDs of the users to summarise the infractions of, given as query parameters."""
+        user_id = request.query_params.get('user__id')
+        users = request.query_params.get('users')
+        if (user_id is None) == (users is None):
+            raise ValidationError({'users': ['you must provide exactly one of "user__id" or "users"']})
+
+        param, values = ('user__id', [user_id]) if user_id is not None else ('users', users.split(','))
+        values = [value.strip() for value in values]
+        if not all(value.isdigit() for value in values):
+            raise ValidationError({param: ['must be a comma separated sequence of user IDs']})
+        if len(values) > INFRACTION_SUMMARY_MAX_USERS:
+            raise ValidationError({param: [f'must not contain more than {INFRACTION_SUMMARY_MAX_USERS} IDs']})
+        return list(dict.fromkeys(map(int, values)))
+
+    def list(self, request: Request, *args, **kwargs) -> Response | StreamingHttpResponse:
+        """List infractions in pages, or stream all of them if requested."""
+        if request.query_params.get('stream', '').lower() != 'true':
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_ndjson(queryset), content_type='application/x-ndjson'
+        )
+
+    def stream_ndjson(self, queryset: QuerySet) -> Iterator[str]:
+        """Serialize the infractions as newline-delimited JSON, loading them in chunks."""
+        infractions = queryset.iterator(chunk_size=INFRACTION_STREAM_CHUNK_SIZE)
+        while chunk := list(islice(infractions, INFRACTION_STREAM_CHUNK_SIZE)):
+            yield ''.join(
+                json.dumps(infraction) + '\n'
+                for infraction in self.get_serializer(chunk, many=True).data
+            )
+
+    @action(detail=False)
+    def expirations(self, request: Request) -> Response:
+        """Return the active infractions which will expire, or those changed since a version."""
+        until = request.query_params.get('until')
+        if until:
+            try:
+                until = datetime.datetime.fromisoformat(until).replace(tzinfo=datetime.UTC)
+            except ValueError:
+                raise ValidationError({'until': ['failed to convert to datetime']})
+
+        since = request.query_params.get('since')
+        if since is not None:
+            if not since.isdigit():
+                raise ValidationError({'since': ['must be a non-negative integer']})
+            since = int(since)
+            if since < InfractionDeletion.objects.horizon():
+                # Deletions after the version may have been pruned, so the changes could be incomplete.
+                return Response(
+                    {'since': ['changes since this version are no longer kept, fetch all expirations instead']},
+                    status=HTTP_410_GONE,
+                )
+
+        # Take the version first, so that no write older than it can be missed.
+        data = {'version': Infraction.current_version()}
+
+        if since is None:
+            expiring = Infraction.objects.filter(active=True, expires_at__isnull=False)
+            if until:
+                expiring = expiring.filter(expires_at__lte=until)
+            data['expirations'] = InfractionSerializer(expiring.order_by('expires_at'), many=True).data
+            return Response(data)
+
+        changed = Infraction.objects.filter(version__gt=since).order_by('expires_at')
+        expiring = [
+            infraction for infraction in changed
+            if infraction.active and infraction.expires_at
+            and (not until or infraction.expires_at <= until)
+        ]
+        expiring_ids = {infraction.id for infraction in expiring}
+        data['expirations'] = InfractionSerializer(expiring, many=True).data
+        # Only report infractions which had a pending expiry that was cancelled since then,
+        # rather than every other changed infraction, such as those with an edited reason.
+        data['cancelled'] = [
+            infraction.id for infraction in changed
+            if infraction.id not in expiring_ids
+            and not infraction.is_expiring
+            and infraction.expiry_cancelled_version > since
+        ]
+        data['deleted'] = list(
+            InfractionDeletion.objects
+            .filter(version__gt=since)
+            .order_by('version')
+            .values_list('infraction_id', flat=True)
+        )
+        return Response(data)
+
+    @action(detail=False)
+    def summary(self, request: Request) -> Response:
+        """Return the infraction counts, latest infraction and next expiry of the given users."""
+        user_ids = self._get_summary_user_ids(request)
+
+        # Aggregate by user and type. There is at most one active infraction per group, thanks
+        # to the unique constraint, so the ID of the active expiring infraction is its maximum.
+        groups = (
+            Infraction.objects
+            .filter(user_id__in=user_ids)
+            .values('user_id', 'type')
+            .annotate(
+                total=Count('id'),
+                active_count=Count('id', filter=Q(active=True)),
+                latest_id=Func(
+                    ArrayAgg('id', ordering=('-inserted_at', '-id')),
+                    template='(%(expressions)s)[1]',
+                    output_field=BigIntegerField(),
+                ),
+                latest_at=Max('inserted_at'),
+                expiring_id=Max('id', filter=Q(active=True, expires_at__isnull=False)),
+                expires_at=Min('expires_at', filter=Q(active=True)),
+            )
+            .order_by()
+        )
+
+        datetime_field = DateTimeField()
+        summaries = {
+            user_id: {'total': 0, 'active': 0, 'types': {}, 'latest': None, 'next_expiry': None}
+            for user_id in user_ids
+        }
+        # The latest insertion and earliest expiry seen so far for every user.
+        latest_at = {}
+        expires_at = {}
+        for group in groups:
+            summary = summaries[group['user_id']]
+            summary['total'] += group['total']
+            summary['active'] += group['active_count']
+            summary['types'][group['type']] = {
+                'total': group['total'], 'active': group['active_count']
+            }
+
+            latest_key = (group['latest_at'], group['latest_id'])
+            if group['user_id'] not in latest_at or latest_key > latest_at[group['user_id']]:
+                latest_at[group['user_id']] = latest_key
+                summary['latest'] = {
+                    'id': group['latest_id'],
+                    'type': group['type'],
+                    'inserted_at': datetime_field.to_representation(group['latest_at']),
+                }
+
+            if group['expiring_id'] and (
+                group['user_id'] not in expires_at or group['expires_at'] < expires_at[group['user_id']]
+            ):
+                expires_at[group['user_id']] = group['expires_at']
+                summary['next_expiry'] = {
+                    'id': group['expiring_id'],
+                    'type': group['type'],
+                    'expires_at': datetime_field.to_representation(group['expires_at']),
+                }
+
+        return Response({str(user_id): summary for user_id, summary in summaries.items()})
+
     @action(url_path='expanded', detail=False)
     def list_expanded(self, *args, **kwargs) -> Response:
         """
@@ -1,7 +1,12 @@
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from pydis_site.apps.api.models.bot.role import Role
-from pydis_site.apps.api.serializers import RoleSerializer
+from pydis_site.apps.api.models.bot.user import User
+from pydis_site.apps.api.serializers import RoleSerializer, UserSerializer
+from pydis_site.apps.api.viewsets.bot.user import UserListPagination
 
 
 class RoleViewSet(ModelViewSet):
@@ -44,6 +49,39 @@ class RoleViewSet(ModelViewSet):
     - 200: returned on success
     - 404: if a role with the given `snowflake` could not be found
 
+    ### GET /bot/roles/<snowflake:int>/members
+    Returns the users who have the role with the given `snowflake`, paginated
+    like `GET /bot/users`.
+
+    #### Optional Query Parameters
+    - page_size: number of users in one page, defaults to 2,500
+    - page: page number
+    - after: switches to keyset pagination, returning the users with an ID
+      greater than the given one. Pass `0` to fetch the first page, and the
+      `next_cursor` of the response for every following page.
+
+    #### Response format
+    >>> {
+    ...     'count': 1,
+    ...     'next_page_no': None,
+    ...     'previous_page_no': None,
+    ...     'results': [
+    ...         {
+    ...             'id': 409107086526644234,
+    ...             'name': "python",
+    ...             'display_name': "Python",
+    ...             'discriminator': 4329,
+    ...             'roles': [267628507062992896],
+    ...             'in_guild': True
+    ...         }
+    ...     ]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if `after` is not an integer
+    - 404: if a role with the given `snowflake` could not be found
+
     ### POST /bot/roles
     Adds a single new role.
 
@@ -105,3 +143,13 @@ class RoleViewSet(ModelViewSet):
 
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
+
+    @action(detail=True)
+    def members(self, request: Request, pk: str | None = None) -> Response:
+        """Return the users who have the role, using the index on the roles of users."""
+        role = self.get_object()
+        members = User.objects.filter(roles__contains=[role.id]).order_by("id")
+
+        paginator = UserListPagination()
+        page = paginator.paginate_queryset(members, request, view=self)
+        return paginator.get_paginated_response(UserSerializer(page, many=True).data)
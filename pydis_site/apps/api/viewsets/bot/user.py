@@ -1,12 +1,16 @@
-from collections import ChainMap, OrderedDict
+import json
+from collections import ChainMap, Counter, OrderedDict
+from collections.abc import Iterator
+from itertools import islice
+from typing import IO
 
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import IntegrityError, transaction
-from django.db.models import Q
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q, QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import fields, status
 from rest_framework.decorators import action
-from rest_framework.exceptions import ParseError
+from rest_framework.exceptions import APIException, ParseError, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -14,7 +18,7 @@ from rest_framework.serializers import ModelSerializer
 from rest_framework.viewsets import ModelViewSet
 
 from pydis_site.apps.api.models.bot.infraction import Infraction
-from pydis_site.apps.api.models.bot.metricity import Metricity, NotFoundError
+from pydis_site.apps.api.models.bot.metricity import Metricity
 from pydis_site.apps.api.models.bot.user import User, UserAltRelationship
 from pydis_site.apps.api.serializers import (
     UserSerializer,
@@ -23,11 +27,138 @@ from pydis_site.apps.api.serializers import (
 )
 
 
+# Number of users validated and written at once by the sync endpoint.
+USER_SYNC_CHUNK_SIZE = 1000
+
+# Default and maximum number of users returned by the search endpoint.
+USER_SEARCH_DEFAULT_LIMIT = 25
+USER_SEARCH_MAX_LIMIT = 100
+
+# Maximum number of user IDs which can be given at once to the bulk user endpoints.
+USER_BULK_MAX_IDS = 1000
+
+# Default and maximum number of relationships followed from a user to find their alt cluster.
+ALT_CLUSTER_DEFAULT_DEPTH = 5
+ALT_CLUSTER_MAX_DEPTH = 10
+
+# Maximum length of a histogram, and number of its buckets, in the metricity activity endpoint.
+METRICITY_ACTIVITY_MAX_DAYS = 3650
+METRICITY_ACTIVITY_MAX_BUCKETS = 366
+
+
+class LengthRequired(APIException):
+    """Raised for request bodies which are neither sized nor chunked."""
+
+    status_code = status.HTTP_411_LENGTH_REQUIRED
+    default_detail = "A `Content-Length` or a chunked `Transfer-Encoding` is required."
+    default_code = "length_required"
+
+
+def _get_body_stream(request: Request) -> IO[bytes] | None:
+    """
+    Return a stream of the request body, or `None` if the body is empty.
+
+    DRF only provides a stream for bodies with a `Content-Length`. Chunked bodies are
+    read from the WSGI input instead, which the server has already de-chunked.
+    """
+    if request.stream is not None:
+        return request.stream
+    if request.META.get("HTTP_TRANSFER_ENCODING", "").lower() == "chunked":
+        return request.META["wsgi.input"]
+    if request.META.get("CONTENT_LENGTH"):
+        # An explicit length of zero.
+        return None
+    raise LengthRequired
+
+
+def _read_ndjson_chunks(stream: IO[bytes] | None) -> Iterator[list[tuple[int, dict]]]:
+    """
+    Lazily read `(line number, object)` pairs from a stream of newline-delimited JSON.
+
+    Blank lines are skipped. Objects are yielded in lists of at most
+    `USER_SYNC_CHUNK_SIZE` items, so only a single chunk is held in memory.
+    """
+    if stream is None:
+        return
+
+    lines = enumerate(iter(stream.readline, b''), start=1)
+    objects = (
+        (line_number, _parse_ndjson_line(line_number, line))
+        for line_number, line in lines
+        if line.strip()
+    )
+    while chunk := list(islice(objects, USER_SYNC_CHUNK_SIZE)):
+        yield chunk
+
+
+def _parse_ndjson_line(line_number: int, line: bytes) -> dict:
+    """Parse a single line of an NDJSON request body into a JSON object."""
+    try:
+        obj = json.loads(line)
+    except ValueError as e:
+        raise ParseError(detail={f"line {line_number}": [f"Invalid JSON: {e}"]})
+
+    if not isinstance(obj, dict):
+        raise ParseError(detail={f"line {line_number}": ["Expected a JSON object."]})
+    return obj
+
+
 class UserListPagination(PageNumberPagination):
-    """Custom pagination class for the User Model."""
+    """
+    Custom pagination class for the User Model.
+
+    Pages are numbered by default. Passing the `after` query parameter switches
+    to keyset pagination on the user ID, which neither counts the whole table
+    nor scans over the skipped rows of an `OFFSET`.
+    """
 
     page_size = 2500
     page_size_query_param = "page_size"
+    cursor_query_param = "after"
+    approximate_count_query_param = "approximate_count"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: ModelViewSet | None = None
+    ) -> list | None:
+        """Paginate by page number, or by user ID if a cursor was given."""
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        try:
+            self.cursor = int(self.cursor)
+        except ValueError:
+            raise ParseError(detail={
+                self.cursor_query_param: ["This query parameter must be an integer."]
+            })
+
+        page_size = self.get_page_size(request)
+        # Fetch one additional user to find out whether there is a next page.
+        users = list(queryset.filter(id__gt=self.cursor).order_by("id")[:page_size + 1])
+        self.has_next = len(users) > page_size
+        self.page_users = users[:page_size]
+
+        self.approximate_count = None
+        if request.query_params.get(self.approximate_count_query_param, "").lower() == "true":
+            self.approximate_count = self.get_approximate_count(queryset)
+
+        return self.page_users
+
+    @staticmethod
+    def get_approximate_count(queryset: QuerySet) -> int | None:
+        """
+        Return the planner's estimate of the number of rows in the queryset's table.
+
+        The estimate ignores any filters applied to the queryset. `None` is
+        returned if the table was never analysed.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            (count,) = cursor.fetchone()
+        return count if count >= 0 else None
 
     def get_next_page_number(self) -> int | None:
         """Get the next page number."""
@@ -44,8 +175,21 @@ class UserListPagination(PageNumberPagination):
         page_number = self.page.previous_page_number()
         return page_number
 
+    def get_next_cursor(self) -> int | None:
+        """Get the user ID to pass as the cursor for the next page."""
+        if not self.has_next:
+            return None
+        return self.page_users[-1].id
+
     def get_paginated_response(self, data: list) -> Response:
         """Override method to send modified response."""
+        if self.cursor is not None:
+            return Response(OrderedDict([
+                ('count', self.approximate_count),
+                ('next_cursor', self.get_next_cursor()),
+                ('results', data)
+            ]))
+
         return Response(OrderedDict([
             ('count', self.page.paginator.count),
             ('next_page_no', self.get_next_page_number()),
@@ -88,11 +232,80 @@ class UserViewSet(ModelViewSet):
     - username: username to search for
     - display_name: display name to search for
     - discriminator: discriminator to search for
-    - page_size: number of Users in one page, defaults to 10,000
+    - page_size: number of Users in one page, defaults to 2,500
     - page: page number
+    - after: switches to keyset pagination, returning the users with an ID
+      greater than the given one. Pass `0` to fetch the first page, and the
+      `next_cursor` of the response for every following page.
+    - approximate_count: with `after`, set to `true` to include the estimated
+      total number of users in `count`. The estimate ignores other filters.
+
+    #### Response format with `after`
+    >>> {
+    ...     'count': None,
+    ...     'next_cursor': 409107086526644234,
+    ...     'results': [...]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+
+    ### GET /bot/users/search?q=<query:str>
+    Returns the users whose name or display name is or starts with the query,
+    or contains a word similar to it, ignoring case. Words are similar when their trigram
+    word similarity is at least 0.6. Users whose name or display name is the
+    query come first, followed by those starting with it, and then by
+    similarity.
+
+    #### Optional query parameters
+    - limit: the maximum number of users to return, between 1 and 100,
+      defaulting to 25.
+
+    #### Response format
+    >>> [
+    ...     {
+    ...         'id': 409107086526644234,
+    ...         'name': "python",
+    ...         'display_name': "Python",
+    ...         'discriminator': 4329,
+    ...         'roles': [352427296948486144],
+    ...         'in_guild': True
+    ...     }
+    ... ]
 
     #### Status codes
     - 200: returned on success
+    - 400: if `q` is missing, or `limit` is not an integer between 1 and 100
+
+    ### POST /bot/users/batch-get
+    Gets up to 1,000 users by ID in a single request. The users are returned
+    in the order of the given IDs. Unknown IDs are omitted from the response.
+
+    #### Request Format
+    >>> [
+    ...     409107086526644234,
+    ...     493839819168808962
+    ... ]
+
+    #### Optional Query Parameters
+    - alts: set to `true` to include the `alts` of every user, like the
+      single user route below does.
+
+    #### Response format
+    >>> [
+    ...     {
+    ...         'id': 409107086526644234,
+    ...         'name': "python",
+    ...         'display_name': "Python",
+    ...         'discriminator': 4329,
+    ...         'roles': [352427296948486144],
+    ...         'in_guild': True
+    ...     }
+    ... ]
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if the request body was not a list of 1 to 1,000 user IDs
 
     ### GET /bot/users/<snowflake:int>
     Gets a single user by ID.
@@ -127,6 +340,53 @@ class UserViewSet(ModelViewSet):
     - 200: returned on success
     - 404: if a user with the given `snowflake` could not be found
 
+    ### GET /bot/users/<snowflake:int>/alt-cluster
+    Gets every user connected to the given user through alternate account
+    relationships, following relationships transitively. The users are
+    ordered by their `distance`, the number of relationships between them and
+    the given user. `links` contains every relationship between users of the
+    cluster once, from the user with the lower ID.
+
+    #### Optional query parameters
+    - depth: the maximum number of relationships to follow, between 1 and 10,
+      defaulting to 5. `truncated` tells whether the cluster reaches further.
+
+    #### Response format
+    >>> {
+    ...     'id': 409107086526644234,
+    ...     'depth': 5,
+    ...     'truncated': False,
+    ...     'users': [
+    ...         {
+    ...             'id': 409107086526644234,
+    ...             'name': "python",
+    ...             'display_name': "Python",
+    ...             'discriminator': 4329,
+    ...             'roles': [352427296948486144],
+    ...             'in_guild': True,
+    ...             'distance': 0
+    ...         },
+    ...         # ...
+    ...     ],
+    ...     'links': [
+    ...         {
+    ...             'actor': 1234,
+    ...             'alts': [409107086526644234],
+    ...             'context': "Testing account",
+    ...             'source': 128025,
+    ...             'target': 409107086526644234,
+    ...             'created_at': "2023-01-27T21:26:34.027293Z",
+    ...             'updated_at': "2023-01-27T21:26:34.027308Z"
+    ...         },
+    ...         # ...
+    ...     ]
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if `depth` is not an integer between 1 and 10
+    - 404: if a user with the given `snowflake` could not be found
+
     ### GET /bot/users/<snowflake:int>/metricity_data
     Gets metricity data for a single user by ID.
 
@@ -158,6 +418,32 @@ class UserViewSet(ModelViewSet):
     - 200: returned on success
     - 404: if a user with the given `snowflake` could not be found
 
+    ### POST /bot/users/metricity_bulk_data
+    Returns the data of both metricity endpoints above for each of the given
+    user IDs, fetched in a single metricity query. Users that could not be
+    found in metricity are omitted from the response.
+
+    #### Request Format
+    >>> [
+    ...     409107086526644234,
+    ...     493839819168808962
+    ... ]
+
+    #### Response format
+    >>> {
+    ...     "409107086526644234": {
+    ...         "joined_at": "2020-10-06T21:54:23.540766",
+    ...         "total_messages": 2,
+    ...         "activity_blocks": 1,
+    ...         "top_channel_activity": [["off-topic", 2]],
+    ...         "voice_gate_blocked": False
+    ...     }
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if the request body was not a list of 1 to 1,000 user IDs
+
     ### POST /bot/users/metricity_activity_data
     Returns a mapping of user ID to message count in a given period for
     the given user IDs.
@@ -165,6 +451,18 @@ class UserViewSet(ModelViewSet):
     #### Required Query Parameters
     - days: how many days into the past to count message from.
 
+    #### Optional Query Parameters
+    - bucket_days: instead of a single count, return a histogram of the
+      message counts in buckets of this many days, starting with the most
+      recent bucket.
+
+    Multiple periods may be requested at once by passing a comma separated
+    list, or multiple values, for `days`. All data is fetched in a single
+    metricity query.
+
+    Periods can be at most 366 days long when requesting multiple periods.
+    Histograms can cover at most 3650 days, in at most 366 buckets.
+
     #### Request Format
     >>> [
     ...     409107086526644234,
@@ -177,9 +475,22 @@ class UserViewSet(ModelViewSet):
     ...     "493839819168808962": 0
     ... }
 
+    #### Response format with `days=7,30`
+    >>> {
+    ...     "409107086526644234": {"7": 12, "30": 54},
+    ...     "493839819168808962": {"7": 0, "30": 0}
+    ... }
+
+    #### Response format with `days=28&bucket_days=7`
+    >>> {
+    ...     "409107086526644234": [12, 20, 0, 22],
+    ...     "493839819168808962": [0, 0, 0, 0]
+    ... }
+
     #### Status codes
     - 200: returned on success
-    - 400: if request body or query parameters were missing or invalid
+    - 400: if request body or query parameters were missing or invalid, or
+      more than 1,000 user IDs were given with multiple periods or `bucket_days`
 
     ### POST /bot/users
     Adds a single or multiple new users.
@@ -205,6 +516,40 @@ class UserViewSet(ModelViewSet):
     - 400: if one of the given roles does not exist, or one of the given fields is invalid
     - 400: if multiple user objects with the same id are given
 
+    ### POST /bot/users/sync
+    Inserts or updates users streamed as newline-delimited JSON
+    (`Content-Type: application/x-ndjson`), one full user object per line.
+    Users are validated and written in fixed-size chunks, so memory usage
+    does not depend on the size of the request. Omitted optional fields are
+    reset to their defaults. Users whose stored data already matches the
+    given data are not written. Each chunk is written in a transaction of
+    its own, such that locks on written users are only held briefly. If a
+    line is invalid, the chunks before it stay written. Since syncing is
+    idempotent, the corrected body can simply be sent again. A user may be
+    given again in a later chunk, which then overwrites the earlier data.
+    The body may be sent with a `Content-Length`, or chunked.
+
+    #### Request body
+    ```
+    {"id": int, "name": str, "display_name": str, "discriminator": int, "roles": List[int], "in_guild": bool}
+    {"id": int, "name": str, "display_name": str, "discriminator": int, "roles": List[int], "in_guild": bool}
+    ```
+
+    #### Response format
+    >>> {
+    ...     'inserted': 12,
+    ...     'updated': 130,
+    ...     'unchanged': 94858
+    ... }
+
+    #### Status codes
+    - 200: returned on success
+    - 400: if a line is not a valid JSON object, or a user in it is invalid,
+      with errors keyed by line number
+    - 400: if multiple user objects with the same id are given in one chunk
+    - 411: if the body has neither a `Content-Length` nor a chunked
+      `Transfer-Encoding`
+
     ### PUT /bot/users/<snowflake:int>
     Update the user with the given `snowflake`.
     All fields in the request body are required.
@@ -298,7 +643,12 @@ class UserViewSet(ModelViewSet):
     ### BULK PATCH /bot/users/bulk_patch
     Update users with the given `ids` and `details`. `id` field and at least
     one other field is mandatory. Note that editing the `'alts'` field is not
-    possible using this endpoint.
+    possible using this endpoint. Only users whose stored details differ from
+    the given ones are written.
+
+    #### Optional Query Parameters
+    - counts: set to `true` to return the number of changed and skipped users
+      instead of the users.
 
     #### Request body
     >>> [
@@ -320,6 +670,12 @@ class UserViewSet(ModelViewSet):
     ...     },
     ... ]
 
+    #### Response format with `counts`
+    >>> {
+    ...     'changed': 3,
+    ...     'skipped': 997
+    ... }
+
     #### Status codes
     - 200: returned on success
     - 400: if the request body was invalid, see response body for details
@@ -365,8 +721,33 @@ class UserViewSet(ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
+        if request.query_params.get("counts", "").lower() == "true":
+            return Response(serializer.update_counts, status=status.HTTP_200_OK)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["POST"], name='user-sync')
+    def sync(self, request: Request) -> Response:
+        """Insert or update users streamed as NDJSON in constant memory."""
+        counts = Counter(inserted=0, updated=0, unchanged=0)
+
+        for chunk in _read_ndjson_chunks(_get_body_stream(request)):
+            line_numbers, users = zip(*chunk, strict=True)
+            serializer = self.get_serializer(data=list(users), many=True)
+
+            if not serializer.is_valid():
+                raise ValidationError({
+                    f"line {line_number}": errors
+                    for line_number, errors in zip(line_numbers, serializer.errors, strict=True)
+                    if errors
+                })
+
+            # Commit every chunk on its own, such that locks on the written users are not held
+            # while the rest of the body is read.
+            with transaction.atomic():
+                counts.update(serializer.sync(serializer.validated_data))
+
+        return Response(dict(counts), status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['POST'], name="Add alternate account",
             url_name='alts', url_path='alts')
     def add_alt(self, request: Request, pk: str) -> Response:
@@ -459,6 +840,68 @@ class UserViewSet(ModelViewSet):
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False)
+    def search(self, request: Request) -> Response:
+        """Return the users whose names best match the query."""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ParseError(detail={'q': ["This query parameter is required."]})
+
+        limit = request.query_params.get('limit', str(USER_SEARCH_DEFAULT_LIMIT))
+        if not limit.isdigit() or not 1 <= int(limit) <= USER_SEARCH_MAX_LIMIT:
+            raise ParseError(detail={
+                'limit': [f"Must be an integer between 1 and {USER_SEARCH_MAX_LIMIT}."]
+            })
+
+        users = User.objects.search(query)[:int(limit)]
+        return Response(UserSerializer(users, many=True).data)
+
+    @action(detail=False, methods=["POST"], url_path='batch-get')
+    def batch_get(self, request: Request) -> Response:
+        """Return the given users, optionally with their alts, in a constant number of queries."""
+        user_ids = self._validate_user_id_list(request.data, max_length=USER_BULK_MAX_IDS)
+
+        queryset = User.objects.all()
+        serializer_class = UserSerializer
+        if request.query_params.get("alts", "").lower() == "true":
+            queryset = queryset.with_alts()
+            serializer_class = UserWithAltsSerializer
+
+        users = queryset.in_bulk(user_ids)
+        found = [users[user_id] for user_id in dict.fromkeys(user_ids) if user_id in users]
+        return Response(serializer_class(found, many=True).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, url_path='alt-cluster')
+    def alt_cluster(self, request: Request, pk: str | None = None) -> Response:
+        """Return all users connected to the user through alt relationships, up to a depth."""
+        depth = request.query_params.get('depth', str(ALT_CLUSTER_DEFAULT_DEPTH))
+        if not depth.isdigit() or not 1 <= int(depth) <= ALT_CLUSTER_MAX_DEPTH:
+            raise ParseError(detail={
+                'depth': [f"Must be an integer between 1 and {ALT_CLUSTER_MAX_DEPTH}."]
+            })
+
+        user = self.get_object()
+        users, truncated = user.alt_cluster(int(depth))
+        user_ids = [cluster_user.id for cluster_user in users]
+        links = (
+            UserAltRelationship.objects
+            .filter(source__in=user_ids, target__in=user_ids, source__lt=F('target'))
+            .select_related('target')
+            .prefetch_related('target__useraltrelationship_set')
+            .order_by('source', 'target')
+        )
+
+        return Response({
+            'id': user.id,
+            'depth': int(depth),
+            'truncated': truncated,
+            'users': [
+                {**UserSerializer(cluster_user).data, 'distance': cluster_user.distance}
+                for cluster_user in users
+            ],
+            'links': UserAltRelationshipSerializer(links, many=True).data,
+        })
+
     @action(detail=True)
     def metricity_data(self, request: Request, pk: str | None = None) -> Response:
         """Request handler for metricity_data endpoint."""
@@ -470,17 +913,18 @@ class UserViewSet(ModelViewSet):
         ).exists()
 
         with Metricity() as metricity:
-            try:
-                data = metricity.user(user.id)
+            activity = metricity.user_activity([str(user.id)], top_channels=False)
 
-                data["total_messages"] = metricity.total_messages(user.id)
-                data["activity_blocks"] = metricity.total_message_blocks(user.id)
+        if str(user.id) not in activity:
+            return Response(dict(detail="User not found in metricity"),
+                            status=status.HTTP_404_NOT_FOUND)
 
-                data["voice_gate_blocked"] = has_voice_infraction
-                return Response(data, status=status.HTTP_200_OK)
-            except NotFoundError:
-                return Response(dict(detail="User not found in metricity"),
-                                status=status.HTTP_404_NOT_FOUND)
+        data = {
+            key: activity[str(user.id)][key]
+            for key in ("joined_at", "total_messages", "activity_blocks")
+        }
+        data["voice_gate_blocked"] = has_voice_infraction
+        return Response(data, status=status.HTTP_200_OK)
 
     @action(detail=True)
     def metricity_review_data(self, request: Request, pk: str | None = None) -> Response:
@@ -488,42 +932,124 @@ class UserViewSet(ModelViewSet):
         user = self.get_object()
 
         with Metricity() as metricity:
-            try:
-                data = metricity.user(user.id)
-                data["total_messages"] = metricity.total_messages(user.id)
-                data["top_channel_activity"] = metricity.top_channel_activity(user.id)
-                return Response(data, status=status.HTTP_200_OK)
-            except NotFoundError:
-                return Response(dict(detail="User not found in metricity"),
-                                status=status.HTTP_404_NOT_FOUND)
+            activity = metricity.user_activity([str(user.id)])
+
+        # Users without any messages have no channel activity to review.
+        if not activity.get(str(user.id), {}).get("top_channel_activity"):
+            return Response(dict(detail="User not found in metricity"),
+                            status=status.HTTP_404_NOT_FOUND)
+
+        data = {
+            key: activity[str(user.id)][key]
+            for key in ("joined_at", "total_messages", "top_channel_activity")
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["POST"])
+    def metricity_bulk_data(self, request: Request) -> Response:
+        """Request handler for metricity_bulk_data endpoint."""
+        user_ids = self._validate_user_id_list(request.data, max_length=USER_BULK_MAX_IDS)
+
+        voice_gate_blocked = set(
+            Infraction.objects.filter(
+                Q(user__id__in=user_ids, active=True),
+                Q(type="voice_ban") | Q(type="voice_mute")
+            ).values_list("user__id", flat=True)
+        )
+
+        with Metricity() as metricity:
+            activity = metricity.user_activity([str(user_id) for user_id in user_ids])
+
+        for user_id, data in activity.items():
+            data["voice_gate_blocked"] = int(user_id) in voice_gate_blocked
+        return Response(activity, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _validate_user_id_list(data: object, max_length: int | None = None) -> list[int]:
+        """Validate that the given request data is a non-empty list of at most `max_length` user IDs."""
+        user_id_list_validator = fields.ListField(
+            child=fields.IntegerField(min_value=0),
+            allow_empty=False,
+            max_length=max_length
+        )
+        return user_id_list_validator.run_validation(data)
 
     @action(detail=False, methods=["POST"])
     def metricity_activity_data(self, request: Request) -> Response:
         """Request handler for metricity_activity_data endpoint."""
-        if "days" in request.query_params:
+        if "days" not in request.query_params:
+            raise ParseError(detail={
+                "days": ["This query parameter is required."]
+            })
+
+        try:
+            windows = [
+                int(days)
+                for param in request.query_params.getlist("days")
+                for days in param.split(",")
+            ]
+        except ValueError:
+            raise ParseError(detail={
+                "days": ["This query parameter must be an integer."]
+            })
+
+        if len(windows) > 1 and min(windows) < 1:
+            raise ParseError(detail={
+                "days": ["All periods must be positive when requesting multiple periods."]
+            })
+
+        if len(windows) > 1 and max(windows) > METRICITY_ACTIVITY_MAX_BUCKETS:
+            raise ParseError(detail={
+                "days": [
+                    f"Periods must be at most {METRICITY_ACTIVITY_MAX_BUCKETS} days long "
+                    "when requesting multiple periods."
+                ]
+            })
+
+        bucket_days = None
+        if "bucket_days" in request.query_params:
             try:
-                days = int(request.query_params["days"])
+                bucket_days = int(request.query_params["bucket_days"])
             except ValueError:
+                bucket_days = 0
+            if bucket_days < 1 or len(windows) > 1 or windows[0] < 1:
                 raise ParseError(detail={
-                    "days": ["This query parameter must be an integer."]
+                    "bucket_days": ["This query parameter must be a positive integer, given with a single `days`."]
+                })
+            if windows[0] > METRICITY_ACTIVITY_MAX_DAYS:
+                raise ParseError(detail={
+                    "days": [f"Histograms can cover at most {METRICITY_ACTIVITY_MAX_DAYS} days."]
+                })
+            if -(-windows[0] // bucket_days) > METRICITY_ACTIVITY_MAX_BUCKETS:
+                raise ParseError(detail={
+                    "bucket_days": [f"At most {METRICITY_ACTIVITY_MAX_BUCKETS} buckets can be requested."]
                 })
-        else:
-            raise ParseError(detail={
-                "days": ["This query parameter is required."]
-            })
 
-        user_id_list_validator = fields.ListField(
-            child=fields.IntegerField(min_value=0),
-            allow_empty=False
-        )
+        # Only the multiple period and histogram modes are bounded, as they return more data per user.
+        single_window = bucket_days is None and len(windows) == 1
         user_ids = [
-            str(user_id) for user_id in
-            user_id_list_validator.run_validation(request.data)
+            str(user_id)
+            for user_id in self._validate_user_id_list(
+                request.data, max_length=None if single_window else USER_BULK_MAX_IDS
+            )
         ]
 
+        if single_window:
+            with Metricity() as metricity:
+                data = metricity.total_messages_in_past_n_days(user_ids, windows[0])
+
+            default_data = {user_id: 0 for user_id in user_ids}
+            response_data = default_data | dict(data)
+            return Response(response_data, status=status.HTTP_200_OK)
+
         with Metricity() as metricity:
-            data = metricity.total_messages_in_past_n_days(user_ids, days)
+            histograms = metricity.message_histogram(user_ids, max(windows), bucket_days or 1)
+
+        if bucket_days is not None:
+            return Response(histograms, status=status.HTTP_200_OK)
 
-        default_data = {user_id: 0 for user_id in user_ids}
-        response_data = default_data | dict(data)
+        response_data = {
+            user_id: {str(days): sum(histogram[:days]) for days in windows}
+            for user_id, histogram in histograms.items()
+        }
         return Response(response_data, status=status.HTTP_200_OK)
@@ -1,9 +1,16 @@
+import re
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 
 from pydis_site.apps.api.models.bot import DeletedMessage, MessageDeletionContext, Role, User
 from pydis_site.apps.staff.templatetags.deletedmessage_filters import hex_colour
+from pydis_site.apps.staff.views import LogView
 
 
 class TestLogsView(TestCase):
@@ -115,6 +122,10 @@ class TestLogsView(TestCase):
             deletion_context=cls.deletion_context,
         )
 
+    def setUp(self):
+        # Rendered logs are cached by deletion context.
+        cache.clear()
+
     def test_logs_returns_200_for_existing_logs_pk(self):
         url = reverse('staff:logs', args=(self.deletion_context.id,))
         response = self.client.get(url)
@@ -180,3 +191,148 @@ class TestLogsView(TestCase):
         self.assertInHTML(unescaped_content, html_response, count=0)
         escaped_content = "&lt;em&gt;I think my tape has run out...&lt;/em&gt;"
         self.assertInHTML(escaped_content, html_response, count=1)
+
+
+class TestLogsViewQueries(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.developers_role = Role.objects.create(
+            id=12345678, name="Developers", colour=16777215, permissions=0, position=1,
+        )
+        cls.roles = Role.objects.bulk_create(
+            Role(id=role_id, name=f"Role {role_id}", colour=role_id, permissions=0, position=role_id)
+            for role_id in range(2, 7)
+        )
+        cls.authors = User.objects.bulk_create(
+            User(id=user_id, name=f"user{user_id}", discriminator=1, roles=[user_id % 7])
+            for user_id in range(20)
+        )
+        cls.deletion_context = MessageDeletionContext.objects.create(
+            actor=cls.authors[0], creation=timezone.now()
+        )
+        DeletedMessage.objects.bulk_create(
+            DeletedMessage(
+                id=message_id,
+                author=cls.authors[message_id % 20],
+                channel_id=1984,
+                content=f"message {message_id}",
+                embeds=[],
+                attachments=[],
+                deletion_context=cls.deletion_context,
+            )
+            for message_id in range(1, 201)
+        )
+
+    def setUp(self):
+        cache.clear()
+        Role.clear_cache()
+
+    def test_queries_do_not_scale_with_messages(self):
+        url = reverse('staff:logs', args=(self.deletion_context.id,))
+
+        # The deletion context with its actor, the roles for the cache key, the messages with
+        # their authors, and the roles again, once, as roles 0 and 1 of some authors do not exist.
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        html_response = response.content.decode()
+        for author in self.authors:
+            # Roles 0 and 1 do not exist, and users with them fall back to the Developers role.
+            role = self.developers_role if author.roles[0] < 2 else self.roles[author.roles[0] - 2]
+            html_needle = (
+                f'<span class="discord-username" style="color: {hex_colour(role.colour)}">'
+                f'{author}</span>'
+            )
+            self.assertInHTML(html_needle, html_response, count=10)
+
+    def test_archived_log_is_rendered_like_before(self):
+        url = reverse('staff:logs', args=(self.deletion_context.id,))
+        response = self.client.get(url)
+        cache.clear()
+
+        call_command('archive_deletion_logs', days=0, stdout=StringIO())
+
+        # The deletion context with its actor, the archived messages, and their authors.
+        # The roles are still cached, including that roles 0 and 1 do not exist.
+        with self.assertNumQueries(3):
+            archived_response = self.client.get(url)
+        self.assertEqual(response.content, archived_response.content)
+
+    def test_rendered_log_is_cached(self):
+        url = reverse('staff:logs', args=(self.deletion_context.id,))
+        first_response = self.client.get(url)
+
+        # Only the deletion context is loaded.
+        with self.assertNumQueries(1):
+            second_response = self.client.get(url)
+
+        self.assertEqual(first_response.content, second_response.content)
+
+    def test_cached_log_shows_changed_role_colours(self):
+        url = reverse('staff:logs', args=(self.deletion_context.id,))
+        self.client.get(url)
+
+        self.roles[0].colour = 0xABCDEF
+        self.roles[0].save()
+        response = self.client.get(url)
+
+        self.assertIn(hex_colour(0xABCDEF), response.content.decode())
+
+
+@patch.object(LogView, "page_size", 70)
+class TestLogsViewPages(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Role.objects.create(id=1, name="Developers", colour=0, permissions=0, position=1)
+        cls.author = User.objects.create(id=1, name="Barbara Liskov", discriminator=1939)
+        cls.deletion_context = MessageDeletionContext.objects.create(
+            actor=cls.author, creation=timezone.now()
+        )
+        DeletedMessage.objects.bulk_create(
+            DeletedMessage(
+                id=message_id,
+                author=cls.author,
+                channel_id=1974,
+                content=f"message {message_id}",
+                embeds=[],
+                attachments=[],
+                deletion_context=cls.deletion_context,
+            )
+            for message_id in range(1, 201)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_pages(self) -> list[list[int]]:
+        """Follow the links to the next messages, returning the message IDs on every page."""
+        url = reverse('staff:logs', args=(self.deletion_context.id,))
+        pages = []
+        query = ""
+        while query is not None:
+            response = self.client.get(url + query)
+            self.assertEqual(response.status_code, 200)
+            html_response = response.content.decode()
+            pages.append([int(message_id) for message_id in re.findall(r"message (\d+)", html_response)])
+            next_link = re.search(r'href="(\?after=\d+)"', html_response)
+            query = next_link.group(1) if next_link else None
+        return pages
+
+    def test_messages_are_paginated_by_id(self):
+        pages = self.get_pages()
+
+        self.assertEqual(pages, [list(range(1, 71)), list(range(71, 141)), list(range(141, 201))])
+
+    def test_archived_messages_are_paginated_by_id(self):
+        call_command('archive_deletion_logs', days=0, stdout=StringIO())
+
+        pages = self.get_pages()
+
+        self.assertEqual(pages, [list(range(1, 71)), list(range(71, 141)), list(range(141, 201))])
+
+    def test_invalid_page_returns_404(self):
+        url = reverse('staff:logs', args=(self.deletion_context.id,))
+        response = self.client.get(url, {"after": "latest"})
+
+        self.assertEqual(response.status_code, 404)
@@ -1,11 +1,81 @@
+from django.http import Http404
 from django.views.generic.detail import DetailView
 
+from pydis_site.apps.api.models.bot import DeletionLogArchive, Role, User
 from pydis_site.apps.api.models.bot.message_deletion_context import MessageDeletionContext
 
 
 class LogView(DetailView):
-    """The default view for the Deleted Messages logs."""
+    """
+    The default view for the Deleted Messages logs.
+
+    Logs are shown in pages of `page_size` messages, navigated by the ID of the last message
+    on the previous page, given as `after`. This keeps loading and rendering each page fast,
+    even for logs of tens of thousands of messages.
+
+    As deletion logs never change after their creation, the template caches each rendered page,
+    and only loads its messages when it is not cached yet. The messages of old logs are
+    loaded from their archive. Pages are cached by the colours and positions of all roles,
+    such that role changes show up immediately. Changes to the names of users show up once
+    the page expired after `cache_timeout` seconds.
+    """
+
+    page_size = 1000
+    cache_timeout = 60 * 60
 
     model = MessageDeletionContext
+    queryset = MessageDeletionContext.objects.select_related("actor", "archive")
     context_object_name = "deletion_context"
     template_name = "staff/logs.html"
+
+    def get_context_data(self, **kwargs) -> dict:
+        """Add the deletion log, which the template only loads on a cache miss."""
+        after = self.request.GET.get("after", "0")
+        if not after.isdigit():
+            raise Http404("The given message ID is invalid.")
+
+        context = super().get_context_data(**kwargs)
+        context["after"] = int(after)
+        context["deletion_log"] = self.get_deletion_log
+        context["cache_timeout"] = self.cache_timeout
+        context["roles_key"] = self.get_roles_key()
+        return context
+
+    @staticmethod
+    def get_roles_key() -> int:
+        """Return a key which changes whenever the colour or position of any role changes."""
+        return hash(tuple((role.id, role.colour, role.position) for role in Role.cached().values()))
+
+    def get_deletion_log(self) -> dict:
+        """
+        Return a page of deleted messages, oldest first, and the top roles of everyone involved.
+
+        The ID of the last message is included as `next_after` if there are more messages.
+        """
+        after = int(self.request.GET.get("after", 0))
+        try:
+            messages = self.object.archive.messages(after=after, limit=self.page_size + 1)
+        except DeletionLogArchive.DoesNotExist:
+            messages = list(
+                self.object.deletedmessage_set
+                .select_related("author")
+                .filter(id__gt=after)
+                .order_by("id")[:self.page_size + 1]
+            )
+        has_more = len(messages) > self.page_size
+        messages = messages[:self.page_size]
+
+        actor = self.object.actor
+        users = [message.author for message in messages]
+        if actor is not None:
+            users.append(actor)
+
+        top_roles = User.resolve_top_roles(users)
+        for message in messages:
+            message.author_top_role = top_roles[message.author_id]
+
+        return {
+            "actor_top_role": top_roles.get(actor.id) if actor is not None else None,
+            "messages": messages,
+            "next_after": messages[-1].id if has_more else None,
+        }
@@ -0,0 +1,8 @@
+class MetricityRouter:
+    """Keep the site's migrations out of the metricity database, whose schema the site does not manage."""
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool | None:
+        """Disallow migrating the metricity database, and leave all other databases to the default."""
+        if db == 'metricity':
+            return False
+        return None
@@ -30,6 +30,8 @@ env = environ.Env(
     STATIC_BUILD=(bool, False),
     GIT_SHA=(str, 'development'),
     TIMEOUT_PERIOD=(int, 5),
+    DATABASE_CONN_MAX_AGE=(int, 60),
+    DELETION_RETENTION_DAYS=(int, 30),
     GITHUB_TOKEN=(str, None),
     GITHUB_APP_ID=(str, None),
     GITHUB_APP_KEY=(str, None),
@@ -128,6 +130,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.sites',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'django_filters',
     'django_simple_bulma',
@@ -188,10 +191,33 @@ WSGI_APPLICATION = 'pydis_site.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# Connections are kept open between requests for `DATABASE_CONN_MAX_AGE` seconds,
+# so that each gunicorn worker reuses one connection per database instead of
+# connecting anew for every request. Health checks make sure that a connection
+# which broke while idle is replaced before it is used. Connection counts per
+# database are exported as `django_db_new_connections_total` by Prometheus, and
+# the `benchmark_endpoint` management command reports them along with latencies.
+DATABASE_OPTIONS = {
+    'CONN_MAX_AGE': env('DATABASE_CONN_MAX_AGE'),
+    'CONN_HEALTH_CHECKS': True,
+}
+
 DATABASES = {
-    'default': env.db(engine="django_prometheus.db.backends.postgresql"),
-    'metricity': env.db('METRICITY_DB_URL', engine="django_prometheus.db.backends.postgresql"),
+    'default': {
+        **env.db(engine="django_prometheus.db.backends.postgresql"),
+        **DATABASE_OPTIONS,
+    },
+    'metricity': {
+        **env.db('METRICITY_DB_URL', engine="django_prometheus.db.backends.postgresql"),
+        **DATABASE_OPTIONS,
+    },
 } if not STATIC_BUILD else {}
+DATABASE_ROUTERS = ['pydis_site.database_routers.MetricityRouter']
+
+# The cache is local to each process unless `CACHE_URL` points to a shared cache, such as Redis.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -399,6 +425,9 @@ REDIRECTIONS_PATH = Path(BASE_DIR, "pydis_site", "apps", "redirect", "redirects.
 # How long to wait for synchronous requests before timing out
 TIMEOUT_PERIOD = env("TIMEOUT_PERIOD")
 
+# How many days records of deleted objects are kept for incremental syncs
+DELETION_RETENTION_DAYS = env("DELETION_RETENTION_DAYS")
+
 # Source files url for 'Edit on GitHub' link on content articles
 CONTENT_SRC_URL = (
     "https://github.com/python-discord/site/tree/main/pydis_site/apps/content/resources/"